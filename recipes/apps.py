@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        # Connects the signal receivers that keep the search and similarity
+        # indexes, feed inboxes, dietary flags and caches in sync
+        from recipes import dietary, feed, page_cache, search, tag_names
+        from recipes.similarity import content
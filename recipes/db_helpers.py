@@ -0,0 +1,28 @@
+"""
+Helpers for code that queries or caches database rows.
+"""
+
+from django.db import transaction
+
+# Values per `__in` lookup or bulk INSERT, below SQLite's limit on query
+# parameters (999 before SQLite 3.32)
+QUERY_BATCH_SIZE = 500
+
+
+def chunks(items, size=QUERY_BATCH_SIZE):
+    """Yield consecutive slices of `items` holding at most `size` values."""
+
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def now_and_on_commit(invalidate):
+    """
+    Call `invalidate` now and again once the current transaction commits.
+
+    Cached values computed from the old rows while the transaction was
+    open are dropped by the second call.
+    """
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,267 @@
+"""
+Dietary flags derived from a recipe's ingredients and tags.
+
+Each recipe stores a bitmask (Recipe.dietary_flags) of the diets it suits,
+worked out once when its ingredients or tags change rather than by scanning
+ingredient text on every request. Ingredient names are matched word by word
+against keyword lists, so 'eggplant' is not an egg. A word matches as
+written or in any of its possible singular forms ('eggs', 'tomatoes',
+'anchovies'), so plurals are found without breaking 'couscous'.
+A plant word in front of an animal one ('peanut butter', 'almond milk',
+'rice flour') or a plant name after it ('butter beans') cancels it, and so
+do 'free' qualifiers ('gluten free flour', 'egg free'). Meat only suits a
+halal diet when the ingredient says so ('halal chicken') or the recipe is
+tagged #halal. A tag such as #vegan or #glutenfree always sets its flag.
+
+Recipes without ingredients cannot be classified. They are marked
+UNCLASSIFIED and every diet filter keeps them.
+
+Bitwise tests cannot use an index, so dietary_filter() matches the small set
+of bitmasks that suit a diet with an IN lookup on the indexed column.
+"""
+
+import re
+from django.db import models
+from django.db.models import Q
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+from recipes.models import Recipe, RecipeIngredient, User
+
+VEGETARIAN = 1
+VEGAN = 2
+HALAL = 4
+GLUTEN_FREE = 8
+
+ALL_FLAGS = VEGETARIAN | VEGAN | HALAL | GLUTEN_FREE
+# No ingredients to go by yet; not a diet
+UNCLASSIFIED = 16
+
+# Keys match User.DIETARY_STYLES; 'none' has no flag
+DIETARY_FLAGS = {
+    'vegetarian': VEGETARIAN,
+    'vegan': VEGAN,
+    'halal': HALAL,
+    'gluten_free': GLUTEN_FREE,
+}
+DIET_LABELS = dict(User.DIETARY_STYLES)
+
+MEAT = {
+    'beef', 'pork', 'chicken', 'lamb', 'mutton', 'veal', 'turkey', 'duck', 'goose', 'bacon', 'ham',
+    'sausage', 'salami', 'pepperoni', 'prosciutto', 'pancetta', 'chorizo', 'mince', 'steak', 'venison',
+    'rabbit', 'gelatin', 'gelatine', 'lard', 'meat', 'meatball', 'burger',
+}
+SEAFOOD = {
+    'fish', 'anchovy', 'salmon', 'tuna', 'cod', 'haddock', 'trout', 'sardine', 'mackerel', 'prawn',
+    'shrimp', 'crab', 'lobster', 'mussel', 'clam', 'oyster', 'scallop', 'squid', 'octopus',
+}
+ANIMAL_PRODUCTS = {
+    'milk', 'butter', 'cheese', 'cream', 'yogurt', 'yoghurt', 'egg', 'honey', 'ghee', 'mayonnaise',
+    'parmesan', 'mozzarella', 'cheddar', 'feta', 'ricotta', 'mascarpone', 'buttermilk', 'whey', 'custard',
+}
+NOT_HALAL = {
+    'pork', 'bacon', 'ham', 'lard', 'prosciutto', 'pancetta', 'chorizo', 'salami', 'pepperoni',
+    'gelatin', 'gelatine', 'wine', 'beer', 'rum', 'brandy', 'vodka', 'whisky', 'whiskey', 'sherry',
+    'liqueur', 'bourbon', 'gin', 'sake', 'mirin',
+}
+GLUTEN = {
+    'wheat', 'flour', 'bread', 'breadcrumb', 'pasta', 'spaghetti', 'noodle', 'couscous', 'barley',
+    'rye', 'semolina', 'bulgur', 'spelt', 'seitan', 'tortilla', 'pastry', 'cracker', 'biscuit', 'beer',
+    'macaroni', 'lasagne', 'lasagna', 'penne', 'fusilli', 'tagliatelle', 'farro', 'malt',
+}
+
+# Words that make a following animal product or gluten word plant based
+PLANT_BASED = {
+    'peanut', 'almond', 'coconut', 'oat', 'soy', 'soya', 'cashew', 'vegan', 'rice', 'cocoa', 'shea',
+    'apple', 'plant', 'nut',
+}
+# Plant names starting with an animal product word ('butter beans', 'egg plant')
+PLANT_NAMES = {'bean', 'lettuce', 'plant', 'squash'}
+# What '<word> free' in front of a keyword leaves out ('dairy free cheese', not 'fat free milk')
+ANIMAL_FREE = {'dairy', 'lactose', 'egg', 'milk', 'animal', 'vegan'}
+GLUTEN_FREE_WORDS = {
+    'rice', 'almond', 'coconut', 'corn', 'chickpea', 'tapioca', 'potato', 'gram', 'buckwheat', 'gluten',
+    'glutenfree',
+}
+GLUTEN_FREE_QUALIFIERS = {'gluten', 'wheat'}
+# Ingredient words certifying its meat as halal
+HALAL_WORDS = {'halal', 'zabiha', 'zabihah'}
+
+TAG_FLAGS = {
+    'vegan': VEGAN | VEGETARIAN,
+    'vegetarian': VEGETARIAN,
+    'halal': HALAL,
+    'glutenfree': GLUTEN_FREE,
+}
+
+
+def _words(name):
+    return re.sub(r'[^\w\s]', ' ', name.lower()).split()
+
+
+def _singulars(word):
+    """`word` and the words it could be the plural of: 'anchovies' -> 'anchovy', 'tomatoes' -> 'tomato'."""
+
+    forms = {word}
+    if len(word) > 3 and word.endswith('s'):
+        forms.add(word[:-1])
+        if word.endswith('es'):
+            forms.add(word[:-2])
+        if word.endswith('ies'):
+            forms.add(word[:-3] + 'y')
+    return forms
+
+
+def _is_one_of(word, keywords):
+    """Whether `word` or a singular form of it is in `keywords`."""
+
+    return not _singulars(word).isdisjoint(keywords)
+
+
+def _mentions(words, keywords, before=(), after=(), free_of=()):
+    """
+    Whether a keyword appears without a word from `before` right in front
+    of it, a word from `after` right behind it, or a 'free' qualifier:
+    '<keyword> free' or '<word from free_of> free <keyword>'.
+    """
+
+    for position, word in enumerate(words):
+        if not _is_one_of(word, keywords):
+            continue
+        previous = words[position - 1] if position else ''
+        following = words[position + 1] if position + 1 < len(words) else ''
+        if following == 'free' or _is_one_of(previous, before) or _is_one_of(following, after):
+            continue
+        if previous == 'free' and position > 1 and _is_one_of(words[position - 2], free_of):
+            continue
+        return True
+    return False
+
+
+def classify(ingredient_names, tag_names=()):
+    """Return the dietary flags of a recipe with the given ingredients and tags."""
+
+    flags = 0
+    for tag in tag_names:
+        flags |= TAG_FLAGS.get(re.sub(r'[\W_]', '', tag.lower()), 0)
+
+    ingredients = [_words(name) for name in ingredient_names]
+    ingredients = [words for words in ingredients if words]
+    if not ingredients:
+        return flags | UNCLASSIFIED
+
+    meat = any(_mentions(words, MEAT) for words in ingredients)
+    seafood = any(_mentions(words, SEAFOOD) for words in ingredients)
+    animal = any(
+        _mentions(words, ANIMAL_PRODUCTS, PLANT_BASED, PLANT_NAMES, ANIMAL_FREE) for words in ingredients
+    )
+    gluten = any(
+        _mentions(words, GLUTEN, GLUTEN_FREE_WORDS, free_of=GLUTEN_FREE_QUALIFIERS) for words in ingredients
+    )
+    uncertified = [words for words in ingredients if not HALAL_WORDS.intersection(words)]
+    not_halal = any(_mentions(words, MEAT) or _mentions(words, NOT_HALAL) for words in uncertified)
+
+    if not (meat or seafood):
+        flags |= VEGETARIAN
+        if not animal:
+            flags |= VEGAN
+    if not not_halal:
+        flags |= HALAL
+    if not gluten:
+        flags |= GLUTEN_FREE
+    return flags
+
+
+def suits(flags, flag):
+    """Whether a recipe with `flags` is kept when filtering for `flag`."""
+
+    return flags & flag == flag or bool(flags & UNCLASSIFIED)
+
+
+def masks_with(flag):
+    """Every bitmask value kept when filtering for `flag`."""
+
+    return [mask for mask in range((ALL_FLAGS | UNCLASSIFIED) + 1) if suits(mask, flag)]
+
+
+def dietary_filter(style, field='dietary_flags'):
+    """
+    Q object keeping recipes that suit a User.dietary_style.
+
+    `field` is the path to the flags column, e.g. 'recipe__dietary_flags'.
+    Styles without a flag ('none', blank, unknown) keep everything.
+    """
+
+    flag = DIETARY_FLAGS.get(style)
+    if not flag:
+        return Q()
+    return Q(**{f'{field}__in': masks_with(flag)})
+
+
+def requested_diet(request):
+    """
+    The dietary style to filter a listing by, from ?diet=. Filtering is
+    opt in: the user's own dietary_style is only offered as a toggle.
+    Returns None when nothing should be filtered.
+    """
+
+    diet = request.GET.get('diet')
+    return diet if diet in DIETARY_FLAGS else None
+
+
+def _recipe_tags(recipe_ids):
+    tags = {}
+    tagged = (
+        TaggedItem.objects
+        .filter(content_type__app_label='recipes', content_type__model='recipe', object_id__in=recipe_ids)
+        .values_list('object_id', 'tag__name')
+    )
+    for recipe_id, name in tagged:
+        tags.setdefault(recipe_id, []).append(name)
+    return tags
+
+
+def update_recipe_flags(recipe_id):
+    """Recompute and store the flags of one recipe."""
+
+    names = RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list('name', flat=True)
+    flags = classify(names, _recipe_tags([recipe_id]).get(recipe_id, ()))
+    Recipe.objects.filter(pk=recipe_id).exclude(dietary_flags=flags).update(dietary_flags=flags)
+
+
+def classify_recipes(batch_size=500):
+    """Recompute the flags of every recipe in batches; returns how many changed."""
+
+    changed = 0
+    last_pk = 0
+    while True:
+        recipes = list(Recipe.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'dietary_flags')[:batch_size])
+        if not recipes:
+            return changed
+        last_pk = recipes[-1].pk
+
+        ids = [recipe.pk for recipe in recipes]
+        ingredients = {}
+        for recipe_id, name in RecipeIngredient.objects.filter(recipe_id__in=ids).values_list('recipe_id', 'name'):
+            ingredients.setdefault(recipe_id, []).append(name)
+        tags = _recipe_tags(ids)
+
+        stale = []
+        for recipe in recipes:
+            flags = classify(ingredients.get(recipe.pk, ()), tags.get(recipe.pk, ()))
+            if flags != recipe.dietary_flags:
+                recipe.dietary_flags = flags
+                stale.append(recipe)
+        Recipe.objects.bulk_update(stale, ['dietary_flags'])
+        changed += len(stale)
+
+
+@receiver(models.signals.post_save, sender=RecipeIngredient)
+@receiver(models.signals.post_delete, sender=RecipeIngredient)
+def ingredients_changed(sender, instance, **kwargs):
+    update_recipe_flags(instance.recipe_id)
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def tags_changed(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        update_recipe_flags(instance.pk)
@@ -0,0 +1,118 @@
+"""
+Per-user feed inboxes of recipes from followed authors.
+
+Feeds are materialized on write: when a recipe is created a background job
+copies it into the inbox of each of the author's followers, in bulk, and
+trims every touched inbox back to FEED_LENGTH entries. Following someone
+backfills their latest recipes and unfollowing removes them, so reading
+"new posts from people you follow" is a single indexed range scan.
+"""
+
+from django.db import models
+from django.db.models.functions import RowNumber
+from django.dispatch import receiver
+from recipes.db_helpers import chunks
+from recipes.models import FeedEntry, Job, Recipe, User
+
+FEED_LENGTH = 200
+
+# Followers written per INSERT when fanning out
+FAN_OUT_BATCH = 1000
+
+Follow = User.followers.through
+
+
+def trim_feeds(user_ids):
+    """Delete all but the newest FEED_LENGTH entries of the given inboxes."""
+
+    ranked = (
+        FeedEntry.objects
+        .filter(user__in=user_ids)
+        .annotate(position=models.Window(
+            RowNumber(),
+            partition_by=models.F('user'),
+            order_by=[models.F('created_at').desc(), models.F('recipe').desc()],
+        ))
+        .filter(position__gt=FEED_LENGTH)
+        .values_list('pk', flat=True)
+    )
+    stale = list(ranked)
+    if stale:
+        FeedEntry.objects.filter(pk__in=stale).delete()
+
+
+def fan_out_recipe(recipe_id):
+    """Job: add a new recipe to the inbox of every follower of its author."""
+
+    recipe = Recipe.objects.filter(pk=recipe_id).values('author_id', 'created_at').first()
+    if recipe is None:
+        return
+
+    followers = Follow.objects.filter(from_user=recipe['author_id']).values_list('to_user_id', flat=True)
+    follower_ids = list(followers)
+    for batch in chunks(follower_ids, FAN_OUT_BATCH):
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(user_id=user_id, recipe_id=recipe_id, author_id=recipe['author_id'],
+                          created_at=recipe['created_at'])
+                for user_id in batch
+            ],
+            ignore_conflicts=True,
+        )
+        trim_feeds(batch)
+
+
+def backfill_feed(user_id, author_id):
+    """Add an author's newest recipes to a user's inbox."""
+
+    recipes = (
+        Recipe.objects
+        .filter(author=author_id)
+        .order_by('-created_at', '-pk')
+        .values_list('pk', 'created_at')[:FEED_LENGTH]
+    )
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(user_id=user_id, recipe_id=pk, author_id=author_id, created_at=created_at)
+            for pk, created_at in recipes
+        ],
+        ignore_conflicts=True,
+    )
+    trim_feeds([user_id])
+
+
+def rebuild_feed(user):
+    """Rebuild a user's inbox from scratch from everyone they follow."""
+
+    FeedEntry.objects.filter(user=user).delete()
+    for author_id in Follow.objects.filter(to_user=user).values_list('from_user_id', flat=True):
+        backfill_feed(user.pk, author_id)
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+def queue_fan_out(sender, instance, created, **kwargs):
+    if created:
+        Job.objects.enqueue(fan_out_recipe, key=f"feed-fan-out:{instance.pk}", recipe_id=instance.pk)
+
+
+def _follow_pairs(instance, reverse, pk_set):
+    # followers.add(follower) is sent for the followed user,
+    # following.add(author) for the follower
+    if reverse:
+        return [(instance.pk, pk) for pk in pk_set]
+    return [(pk, instance.pk) for pk in pk_set]
+
+
+@receiver(models.signals.m2m_changed, sender=Follow)
+def follows_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        for follower_id, author_id in _follow_pairs(instance, reverse, pk_set):
+            backfill_feed(follower_id, author_id)
+    elif action == 'post_remove':
+        for follower_id, author_id in _follow_pairs(instance, reverse, pk_set):
+            FeedEntry.objects.filter(user=follower_id, author=author_id).delete()
+    elif action == 'pre_clear':
+        if reverse:
+            FeedEntry.objects.filter(user=instance).delete()
+        else:
+            FeedEntry.objects.filter(author=instance).delete()
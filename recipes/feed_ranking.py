@@ -0,0 +1,228 @@
+"""
+Ranked, pageable home feed.
+
+Every source of feed items (posts from followed authors, reviews on recipes
+the user reviewed, recommendations) yields items best first, and the sources
+are k-way merged with a heap, so a page only pulls as many rows from each
+source as it needs rather than building and sorting every candidate.
+
+Scores are measured in hours: an item's score is the time it was created
+(hours since the epoch) plus a boost for how relevant it is, so a boost of
+12 ranks an item like one posted twelve hours later. Because scores do not
+depend on the current time, the order is stable between requests and a page
+boundary can be carried in a cursor of (score, kind, pk). Recommendations
+have no creation time of their own; they are anchored to the start of the
+day the user started paging, which the cursor also records. As on the
+explore page, filtering by diet is opt in: posts and recommendations are
+only limited to a dietary style when one is requested.
+"""
+
+import heapq
+import math
+import random
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import dropwhile, islice
+from django.db.models import Count, Q
+from recipes.dietary import dietary_filter
+from recipes.models import FeedEntry, Recipe, RecipeReview
+from recipes.pagination import decode_token, encode_token
+from recipes.similarity.recommendations import recommend, seed_recipe_ids
+
+# Hours of boost per doubling of the user's reviews and saves of an author
+AFFINITY_HOURS = 12
+MAX_AFFINITY_HOURS = 48
+
+# Boost for reviews written by someone the user follows
+FOLLOWED_REVIEWER_HOURS = 24
+
+# Boost of the best recommendation of the day; the rest scale by score
+RECOMMENDATION_HOURS = 24
+
+# Rows fetched per query from the database backed sources
+CHUNK_SIZE = 50
+
+FeedItem = namedtuple('FeedItem', ['score', 'kind', 'pk', 'obj'])
+FeedPage = namedtuple('FeedPage', ['items', 'next_cursor'])
+
+
+def _hours(moment):
+    return moment.timestamp() / 3600
+
+
+def _moment(hours):
+    return datetime.fromtimestamp(hours * 3600, tz=timezone.utc)
+
+
+def _key(item):
+    return item[:3]
+
+
+def encode_feed_cursor(day, item):
+    """Encode the last item shown (and the recommendation day) as a token."""
+
+    return encode_token([day.isoformat(), item.score, item.kind, item.pk])
+
+
+def _parse_feed_cursor(day, score, kind, pk):
+    return date.fromisoformat(day), (float(score), str(kind), int(pk))
+
+
+def decode_feed_cursor(token):
+    """
+    Decode a token made by encode_feed_cursor.
+
+    Returns (day, (score, kind, pk)), or (None, None) for the first page.
+    """
+
+    return decode_token(token, _parse_feed_cursor) or (None, None)
+
+
+def _newest_first(queryset, order_field, pk_field, before=None):
+    """Iterate a queryset newest first, CHUNK_SIZE rows per query."""
+
+    if before is not None:
+        queryset = queryset.filter(**{f'{order_field}__lte': before})
+    position = None
+    while True:
+        chunk = queryset
+        if position is not None:
+            value, pk = position
+            chunk = chunk.filter(Q(**{f'{order_field}__lt': value}) | Q(**{order_field: value, f'{pk_field}__lt': pk}))
+        rows = list(chunk.order_by(f'-{order_field}', f'-{pk_field}')[:CHUNK_SIZE])
+        yield from rows
+        if len(rows) < CHUNK_SIZE:
+            return
+        position = getattr(rows[-1], order_field), getattr(rows[-1], pk_field)
+
+
+def _boosted(items, max_boost):
+    """
+    Re-order items that arrive newest first by their boosted score.
+
+    An item is released once no later item, however boosted, can beat it:
+    later items are no newer than the last one read, and boosts are capped
+    at max_boost.
+    """
+
+    pending = []
+    for created, item in items:
+        while pending and pending[0][1].score > created + max_boost:
+            yield heapq.heappop(pending)[1]
+        heapq.heappush(pending, ((-item.score, item.kind, -item.pk), item))
+    while pending:
+        yield heapq.heappop(pending)[1]
+
+
+def author_affinity(user):
+    """Boost in hours for each author whose recipes the user reviewed or saved."""
+
+    counts = {}
+    reviewed = RecipeReview.objects.filter(user=user).values('recipe__author').annotate(total=Count('pk'))
+    saved = Recipe.saved_by.through.objects.filter(user=user).values('recipe__author').annotate(total=Count('pk'))
+    for row in [*reviewed, *saved]:
+        counts[row['recipe__author']] = counts.get(row['recipe__author'], 0) + row['total']
+    return {
+        author: min(MAX_AFFINITY_HOURS, AFFINITY_HOURS * math.log2(1 + total))
+        for author, total in counts.items()
+    }
+
+
+def post_items(user, before=None, diet=None):
+    """Recipes in the user's inbox, boosted by affinity with their author."""
+
+    affinity = author_affinity(user)
+    entries = _newest_first(
+        FeedEntry.objects
+        .filter(dietary_filter(diet, 'recipe__dietary_flags'), user=user)
+        .select_related('recipe__author'),
+        'created_at', 'recipe_id', before,
+    )
+    return _boosted(
+        (
+            (_hours(entry.created_at),
+             FeedItem(_hours(entry.created_at) + affinity.get(entry.author_id, 0), 'post', entry.recipe_id, entry.recipe))
+            for entry in entries
+        ),
+        MAX_AFFINITY_HOURS,
+    )
+
+
+def review_items(user, before=None):
+    """Other people's reviews of recipes the user reviewed."""
+
+    followed = set(user.following.values_list('pk', flat=True))
+    reviews = _newest_first(
+        RecipeReview.objects
+        .filter(recipe__in=RecipeReview.objects.filter(user=user).values('recipe'))
+        .exclude(user=user)
+        .select_related('recipe__author', 'user'),
+        'created_at', 'pk', before,
+    )
+    return _boosted(
+        (
+            (_hours(review.created_at),
+             FeedItem(_hours(review.created_at) + (FOLLOWED_REVIEWER_HOURS if review.user_id in followed else 0),
+                      'review', review.pk, review))
+            for review in reviews
+        ),
+        FOLLOWED_REVIEWER_HOURS,
+    )
+
+
+def recommendation_items(user, day, per_seed=10, diet=None):
+    """
+    Recommended recipes, anchored to the start of `day`.
+
+    Seeds are sampled with a generator seeded by the user and day, so the
+    same recommendations come back while paging. Recipes already in the
+    user's inbox are left to the post source.
+    """
+
+    seeds = seed_recipe_ids(user, rng=random.Random(f'{user.pk}:{day.isoformat()}'))
+    ranked = recommend(seeds, per_seed)
+    if not ranked:
+        return
+
+    ids = [pk for pk, score in ranked]
+    in_inbox = set(FeedEntry.objects.filter(user=user, recipe_id__in=ids).values_list('recipe_id', flat=True))
+    recipes = (
+        Recipe.objects
+        .filter(dietary_filter(diet))
+        .select_related('author')
+        .in_bulk([pk for pk in ids if pk not in in_inbox])
+    )
+
+    anchor = _hours(datetime.combine(day, time.min, tzinfo=timezone.utc))
+    best = ranked[0][1] or 1
+    items = [
+        FeedItem(anchor + RECOMMENDATION_HOURS * score / best, 'recommendation', pk, recipes[pk])
+        for pk, score in ranked if pk in recipes
+    ]
+    yield from sorted(items, key=_key, reverse=True)
+
+
+def rank_feed(user, limit, cursor=None, diet=None):
+    """
+    Return a FeedPage of the user's `limit` best feed items after `cursor`.
+
+    `diet` is a dietary style to limit posts and recommendations to.
+
+    The page's next_cursor is None when the feed is exhausted.
+    """
+
+    day, position = decode_feed_cursor(cursor)
+    if day is None:
+        day = datetime.now(timezone.utc).date()
+
+    # Boosts are never negative, so nothing created after the cursor's
+    # score can still be unseen (a second of slack covers float rounding)
+    before = _moment(position[0]) + timedelta(seconds=1) if position is not None else None
+    sources = [post_items(user, before, diet), review_items(user, before), recommendation_items(user, day, diet=diet)]
+    merged = heapq.merge(*sources, key=_key, reverse=True)
+    if position is not None:
+        merged = dropwhile(lambda item: _key(item) >= position, merged)
+
+    items = list(islice(merged, limit + 1))
+    next_cursor = encode_feed_cursor(day, items[limit - 1]) if len(items) > limit else None
+    return FeedPage(items[:limit], next_cursor)
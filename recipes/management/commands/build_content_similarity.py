@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from recipes.similarity.content import update_content_similarity
+
+
+class Command(BaseCommand):
+    """
+    Management command to score recipes by shared ingredients and tags.
+
+    Rebuilds every recipe's content neighbours. Edits to ingredients and
+    tags queue an update of the edited recipe and a debounced rebuild on
+    the job queue.
+    """
+
+    help = 'Builds content-based (ingredient and tag) recipe neighbours'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=10, help='Neighbours kept per recipe')
+        parser.add_argument('--batch-size', type=int, default=500, help='Recipes scored per batch')
+
+    def handle(self, *args, **options):
+        result = update_content_similarity(
+            k=options['top_k'],
+            batch_size=options['batch_size'],
+        )
+
+        for stage, seconds in result['timings'].items():
+            self.stdout.write(f"{stage:>10}: {seconds * 1000:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {result['recipes']} recipes, "
+            f"storing {result['neighbours']} neighbours."
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from recipes.similarity.cooccurrence import METRICS, rebuild_similarities
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild every recipe similarity from scratch.
+
+    Computes item-item similarity over all likes and saves and replaces
+    the RecipeSimilar table with each recipe's top-k neighbours. Run it
+    periodically; reviews keep nudging scores between runs.
+    """
+
+    help = 'Rebuilds recipe similarities from co-occurring likes and saves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--metric', choices=METRICS, default='cosine', help='Similarity measure used to pick neighbours')
+        parser.add_argument('--top-k', type=int, default=20, help='Neighbours kept per recipe')
+        parser.add_argument('--min-common', type=int, default=1,
+                            help='Minimum number of users two recipes must share')
+
+    def handle(self, *args, **options):
+        result = rebuild_similarities(
+            metric=options['metric'],
+            k=options['top_k'],
+            min_common=options['min_common'],
+        )
+
+        for stage, seconds in result['timings'].items():
+            self.stdout.write(f"{stage:>10}: {seconds * 1000:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {result['pairs']} similar pairs for {result['recipes']} recipes "
+            f"from {result['interactions']} likes and saves."
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from recipes.dietary import classify_recipes
+
+
+class Command(BaseCommand):
+    """
+    Management command to recompute every recipe's dietary flags.
+
+    Ingredient and tag changes update a recipe's flags as they happen; run
+    this after changing the keyword lists in recipes.dietary or after bulk
+    changes that bypass signals.
+    """
+
+    help = 'Recomputes the dietary flags of all recipes from their ingredients and tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Recipes classified per batch')
+
+    def handle(self, *args, **options):
+        changed = classify_recipes(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated dietary flags of {changed} recipes."))
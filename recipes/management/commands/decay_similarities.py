@@ -0,0 +1,31 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from recipes.similarity.decay import HALF_LIFE, decay_similarities, schedule_decay
+
+
+class Command(BaseCommand):
+    """
+    Management command to decay recipe similarity scores.
+
+    With --schedule, queues the self-rescheduling daily decay job for the
+    run_jobs worker. Otherwise applies one decay step of --hours right
+    away, e.g. from cron (do not combine both).
+    """
+
+    help = 'Decays recipe similarity scores and prunes faded pairs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Time to decay scores by')
+        parser.add_argument('--schedule', action='store_true', help='Queue the periodic decay job instead')
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            job = schedule_decay()
+            self.stdout.write(self.style.SUCCESS(f"Decay job queued for {job.run_at:%Y-%m-%d %H:%M}."))
+            return
+
+        decayed, pruned = decay_similarities(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f"Decayed {decayed} pairs by {options['hours']} hours (half-life {HALF_LIFE.days} days), "
+            f"pruned {pruned}."
+        ))
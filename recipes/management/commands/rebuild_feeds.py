@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from recipes.feed import rebuild_feed
+from recipes.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild every user's feed inbox.
+
+    Inboxes are kept up to date as recipes are created and users follow
+    each other; run this once after deploying them, or to repair them.
+    """
+
+    help = 'Rebuilds the feed inbox of every user from the authors they follow'
+
+    def handle(self, *args, **options):
+        count = 0
+        for user in User.objects.filter(following__isnull=False).distinct().iterator():
+            rebuild_feed(user)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} feeds."))
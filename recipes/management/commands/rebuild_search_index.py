@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from recipes.search import fulltext, trigram
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild the recipe search indexes from scratch.
+
+    The full-text and trigram indexes are normally kept in sync by signals
+    when recipes, ingredients and tags change. Run this after upgrading an existing database, or after
+    loading data that bypassed the ORM.
+    """
+
+    help = 'Rebuilds the full-text and trigram search indexes for all recipes'
+
+    def handle(self, *args, **options):
+        if fulltext.is_available():
+            count = fulltext.rebuild_index()
+            self.stdout.write(self.style.SUCCESS(f"Indexed {count} recipes for full-text search."))
+        else:
+            self.stdout.write(self.style.WARNING("Full-text search is not available on this database."))
+
+        count = trigram.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} recipes for fuzzy search."))
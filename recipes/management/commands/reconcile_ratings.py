@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from recipes.models.recipe_review import recalculate_ratings
+
+
+class Command(BaseCommand):
+    """
+    Management command to recompute every recipe's stored rating totals.
+
+    Review signals keep Recipe.rating_sum and rating_count up to date; run
+    this after bulk changes that bypass signals (raw SQL, queryset.update())
+    to bring them back in line with the review table.
+    """
+
+    help = 'Recomputes the stored rating totals of all recipes from their reviews'
+
+    def handle(self, *args, **options):
+        updated = recalculate_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Recalculated ratings for {updated} recipes."))
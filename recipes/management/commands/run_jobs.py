@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from recipes.models import Job
+
+
+class Command(BaseCommand):
+    """
+    Management command that works through the background job queue.
+
+    Runs forever by default, polling for due jobs; use --once to run the
+    jobs that are due now and exit (e.g. from cron). Several workers can
+    run at the same time: each job is claimed by exactly one of them.
+    """
+
+    help = 'Runs queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are due and exit')
+        parser.add_argument('--sleep', type=float, default=2, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            count = Job.objects.run_pending()
+            if count:
+                self.stdout.write(f"Ran {count} job(s).")
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        failed = Job.objects.filter(status=Job.FAILED).count()
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} job(s) have failed; see the Job table."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from recipes.search import search_cache
+
+
+class Command(BaseCommand):
+    """
+    Management command to print the search result cache hit/miss counters.
+
+    Use the hit ratio to decide how long cached results should live and
+    how much memory the cache backend needs.
+    """
+
+    help = 'Shows (and optionally resets) the search result cache counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = search_cache.stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+
+        self.stdout.write(f"Hits: {stats['hits']}")
+        self.stdout.write(f"Misses: {stats['misses']}")
+        self.stdout.write(f"Hit ratio: {ratio:.1%}")
+
+        if options['reset']:
+            search_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from recipes.search import search_log
+
+
+class Command(BaseCommand):
+    """
+    Management command to roll up the search log and print query statistics.
+
+    Run it periodically (e.g. from cron) to fold new log entries into the
+    per-query totals; the report shows the slowest queries on average and
+    the most frequent ones, the best candidates for indexes or caching.
+    """
+
+    help = 'Rolls up the search log and prints the slowest and most frequent queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10, help='Number of queries to list in each table')
+        parser.add_argument('--rollup-only', action='store_true', help='Roll up the log without printing a report')
+
+    def handle(self, *args, **options):
+        folded = search_log.rollup()
+        self.stdout.write(f"Rolled up {folded} logged searches.")
+        if options['rollup_only']:
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSlowest queries (average ms):"))
+        for stats in search_log.top_slow(options['limit']):
+            self.stdout.write(
+                f"{stats.avg_ms:9.1f}  max {stats.max_ms:8.1f}  db {stats.db_ms / stats.count:8.1f}"
+                f"  x{stats.count:<6} {stats.query}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nMost frequent queries:"))
+        for stats in search_log.top_frequent(options['limit']):
+            self.stdout.write(
+                f"{stats.count:9}  avg {stats.avg_ms:8.1f}  results {stats.total_results // stats.count:<6}"
+                f" {stats.query}"
+            )
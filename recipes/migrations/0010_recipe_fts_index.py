@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Written out in full so later changes to recipes.search.fulltext cannot
+# change what this migration creates.
+CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_fts USING fts5("
+    "title, description, author, ingredients, tags, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+DROP_TABLE_SQL = "DROP TABLE IF EXISTS recipes_recipe_fts"
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_create_recipereview_table'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
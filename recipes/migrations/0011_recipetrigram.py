@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_fts_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='recipes.recipe')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'recipe'), name='unique_recipe_trigram')],
+            },
+        ),
+    ]
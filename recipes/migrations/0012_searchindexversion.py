@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipetrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
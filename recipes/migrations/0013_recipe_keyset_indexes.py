@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_searchindexversion'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['created_at', 'id'], name='recipe_created_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['updated_at', 'id'], name='recipe_updated_keyset'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:23
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_totals(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeReview = apps.get_model('recipes', 'RecipeReview')
+    reviews = RecipeReview.objects.filter(recipe=models.OuterRef('pk')).order_by().values('recipe')
+    Recipe.objects.update(
+        rating_sum=Coalesce(models.Subquery(reviews.annotate(total=models.Sum('rating')).values('total')), 0),
+        rating_count=Coalesce(models.Subquery(reviews.annotate(total=models.Count('pk')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_totals, migrations.RunPython.noop),
+    ]
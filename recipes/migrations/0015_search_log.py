@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_recipe_rating_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255)),
+                ('result_count', models.PositiveIntegerField()),
+                ('parse_ms', models.FloatField()),
+                ('db_ms', models.FloatField()),
+                ('render_ms', models.FloatField()),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchQueryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('db_ms', models.FloatField(default=0)),
+                ('total_results', models.PositiveBigIntegerField(default=0)),
+                ('last_seen', models.DateTimeField(null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'search query stats',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeContentProfile',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content_profile', serialize=False, to='recipes.recipe')),
+                ('fingerprint', models.CharField(max_length=32)),
+                ('scored_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecipeContentNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_neighbour_of', to='recipes.recipe')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_neighbours', to='recipes.recipe')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('recipe', 'neighbour'), name='unique_content_neighbour')],
+            },
+        ),
+    ]
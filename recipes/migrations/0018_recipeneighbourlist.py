@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_recipe_content_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeNeighbourList',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='neighbour_list', serialize=False, to='recipes.recipe')),
+                ('data', models.BinaryField()),
+            ],
+        ),
+    ]
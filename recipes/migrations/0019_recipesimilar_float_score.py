@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_recipeneighbourlist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipesimilar',
+            name='similarity_score',
+            field=models.FloatField(default=1),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+
+def queue_classification(apps, schema_editor):
+    # The keyword lists live in recipes.dietary and keep changing, so the
+    # flags are filled by a job running whatever classifier is current
+    # (same as `manage.py classify_recipes`) rather than by this migration.
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Job = apps.get_model('recipes', 'Job')
+    if Recipe.objects.exists():
+        Job.objects.get_or_create(
+            key='classify-recipes',
+            status='pending',
+            defaults={'task': 'recipes.dietary.classify_recipes', 'kwargs': {}},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0020_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='dietary_flags',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(queue_classification, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:31
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0021_recipe_dietary_flags'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='RecipeContentProfile',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+def mark_unclassified(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.filter(ingredients__isnull=True).update(dietary_flags=models.F('dietary_flags').bitor(16))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0022_delete_recipecontentprofile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='dietary_flags',
+            field=models.PositiveSmallIntegerField(db_index=True, default=16),
+        ),
+        migrations.RunPython(mark_unclassified, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0023_recipe_unclassified_flag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageCacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150, unique=True)),
+                ('version', models.BigIntegerField()),
+            ],
+        ),
+    ]
@@ -1,5 +1,12 @@
 from .user import *
+from .job import Job
 from .recipe import Recipe, RecipeIngredient, RecipeInstruction
 from .recipe_review import RecipeReview
+from .search_index import RecipeTrigram, SearchIndexVersion
+from .search_log import SearchLogEntry, SearchQueryStats
+from .content_similarity import RecipeContentNeighbour
+from .neighbour_list import RecipeNeighbourList
+from .feed import FeedEntry
+from .page_cache import PageCacheVersion
 __all__ = ['User', 'Recipe', 'RecipeIngredient','RecipeReview']
 
@@ -0,0 +1,24 @@
+from django.db import models
+from .recipe import Recipe
+
+
+class RecipeContentNeighbour(models.Model):
+    """
+    A recipe close to another in ingredients and tags.
+
+    Each recipe keeps its own top-k list, built by
+    recipes.similarity.content, so lists are not necessarily symmetric.
+    """
+
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='content_neighbours')
+    neighbour = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='content_neighbour_of')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['recipe', 'neighbour'], name='unique_content_neighbour')
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_id} ~ {self.neighbour_id} ({self.score:.2f})"
+
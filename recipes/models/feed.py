@@ -0,0 +1,31 @@
+from django.db import models
+from .recipe import Recipe
+from .user import User
+
+
+class FeedEntry(models.Model):
+    """
+    A recipe by a followed author in a user's feed inbox.
+
+    Rows are written when recipes are created (fan-out on write) and when
+    users follow someone, so reading a feed is one range scan over the
+    (user, created_at) index. See recipes.feed.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feed_entries')
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='+')
+    # Copied from the recipe so entries can be pruned and ordered without a join
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'recipe'], name='unique_feed_entry')
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-recipe'], name='feed_entry_inbox'),
+            models.Index(fields=['user', 'author'], name='feed_entry_author'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_id} in feed of {self.user_id}"
@@ -0,0 +1,147 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class JobManager(models.Manager):
+
+    def enqueue(self, task, key=None, delay=None, max_attempts=5, **kwargs):
+        """
+        Queue `task` (a module-level function or its dotted path) to be
+        called with `kwargs` by the run_jobs worker.
+
+        If `key` is given and a job with the same key is still waiting, no
+        new job is added and the waiting one is returned, so enqueueing the
+        same work twice runs it once.
+
+        With settings.JOBS_RUN_INLINE the jobs that are due are run as soon
+        as the current transaction commits, for development without a
+        run_jobs worker. Delayed jobs still wait: they run with the first
+        job queued after they fall due. Otherwise a job that queues its own
+        next run, like the similarity decay, would never stop running.
+        """
+
+        if callable(task):
+            task = f"{task.__module__}.{task.__qualname__}"
+        run_at = timezone.now() + (delay or timedelta())
+        if getattr(settings, 'JOBS_RUN_INLINE', False):
+            transaction.on_commit(self.run_pending)
+        defaults = {'task': task, 'kwargs': kwargs, 'run_at': run_at, 'max_attempts': max_attempts}
+
+        if key is None:
+            return self.create(**defaults)
+        job, created = self.get_or_create(key=key, status=Job.PENDING, defaults=defaults)
+        return job
+
+    def claim(self):
+        """
+        Take the next job that is due, marking it as running.
+
+        Jobs left running by a worker that died are picked up again after
+        Job.LOCK_TIMEOUT. Returns None when nothing is due.
+        """
+
+        now = timezone.now()
+        due = (
+            models.Q(status=Job.PENDING, run_at__lte=now)
+            | models.Q(status=Job.RUNNING, locked_at__lt=now - Job.LOCK_TIMEOUT)
+        )
+        for pk, status in self.filter(due).order_by('run_at', 'pk').values_list('pk', 'status')[:10]:
+            claimed = self.filter(pk=pk, status=status).filter(due).update(
+                status=Job.RUNNING,
+                locked_at=now,
+                attempts=models.F('attempts') + 1,
+            )
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+    def run_pending(self, limit=None):
+        """Run due jobs until there are none left (or `limit` have run). Returns the number run."""
+
+        count = 0
+        while limit is None or count < limit:
+            job = self.claim()
+            if job is None:
+                break
+            job.run()
+            count += 1
+        return count
+
+
+class Job(models.Model):
+    """
+    A unit of deferred work, run outside the request by the run_jobs command.
+
+    Successful jobs are deleted. Failed jobs are retried with exponential
+    backoff and kept with status 'failed' once out of attempts.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+
+    # First retry waits this long, doubling with each further attempt
+    RETRY_DELAY = timedelta(seconds=30)
+    LOCK_TIMEOUT = timedelta(minutes=10)
+
+    task = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict)
+    key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = JobManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_due'),
+        ]
+        constraints = [
+            # Only one waiting job per key; see JobManager.enqueue
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(status='pending'), name='unique_pending_job_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+    def run(self):
+        """Call the task, then delete the job or schedule a retry."""
+
+        try:
+            with transaction.atomic():
+                import_string(self.task)(**self.kwargs)
+        except Exception as error:
+            logger.exception("Job %s (%s) failed", self.pk, self.task)
+            self.last_error = f"{type(error).__name__}: {error}"
+            self.locked_at = None
+            if self.attempts >= self.max_attempts:
+                self.status = Job.FAILED
+            else:
+                self.status = Job.PENDING
+                self.run_at = timezone.now() + self.RETRY_DELAY * 2 ** (self.attempts - 1)
+            try:
+                with transaction.atomic():
+                    self.save(update_fields=['status', 'run_at', 'locked_at', 'last_error'])
+            except IntegrityError:
+                # The same work was queued again while this job ran; that job covers it
+                self.delete()
+        else:
+            self.delete()
@@ -0,0 +1,34 @@
+from array import array
+from django.db import models
+from .recipe import Recipe
+
+
+class RecipeNeighbourList(models.Model):
+    """
+    A recipe's co-occurrence neighbours, best first, packed into one row.
+
+    `data` holds the neighbour ids as 64-bit integers followed by their
+    similarity scores as doubles. Rows are derived from RecipeSimilar (both directions) by
+    recipes.similarity.neighbours and deleted whenever those scores change.
+    """
+
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name='neighbour_list')
+    data = models.BinaryField()
+
+    @staticmethod
+    def pack(neighbours):
+        ids = array('q', [pk for pk, score in neighbours])
+        scores = array('d', [score for pk, score in neighbours])
+        return ids.tobytes() + scores.tobytes()
+
+    @staticmethod
+    def unpack(data):
+        data = bytes(data)
+        middle = len(data) // 2
+        ids, scores = array('q'), array('d')
+        ids.frombytes(data[:middle])
+        scores.frombytes(data[middle:])
+        return list(zip(ids, scores))
+
+    def __str__(self):
+        return f"Neighbours of {self.recipe_id}"
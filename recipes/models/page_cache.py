@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class PageCacheVersion(models.Model):
+    """
+    Version token of something cached pages depend on: a recipe or a listing.
+
+    Kept in the database rather than the cache so every process sees the
+    same tokens and they are never evicted. A missing row means the thing
+    has not changed since tokens were first recorded. See recipes.page_cache.
+    """
+
+    name = models.CharField(max_length=150, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -1,14 +1,67 @@
-from django.db import models
+from collections import Counter
+from django.db import connection, models
+from django.core.exceptions import ImproperlyConfigured
 from django.core.validators import MinValueValidator
 from django.dispatch import receiver
 from django.utils import timezone
-from datetime import timedelta
 from taggit.managers import TaggableManager
 from .user import User
+from .job import Job
+
 """
     Stores a given recipe 
     One user can have many recipes.
 """
+
+
+def annotate_viewer(recipes, viewer):
+    """
+    Mark each recipe with the viewer's relationship to it:
+    is_saved_by_viewer and author_followed_by_viewer.
+
+    Costs two queries for the whole list (none for anonymous viewers), so
+    recipe cards can show save and follow state without a query per card.
+    Returns the recipes as a list.
+    """
+
+    recipes = list(recipes)
+    saved, followed = set(), set()
+    if recipes and viewer is not None and viewer.is_authenticated:
+        saved = set(
+            Recipe.saved_by.through.objects
+            .filter(user=viewer, recipe_id__in={recipe.pk for recipe in recipes})
+            .values_list('recipe_id', flat=True)
+        )
+        followed = set(
+            User.followers.through.objects
+            .filter(to_user=viewer, from_user_id__in={recipe.author_id for recipe in recipes})
+            .values_list('from_user_id', flat=True)
+        )
+    for recipe in recipes:
+        recipe.is_saved_by_viewer = recipe.pk in saved
+        recipe.author_followed_by_viewer = recipe.author_id in followed
+    return recipes
+
+
+class RecipeQuerySet(models.QuerySet):
+    """Recipe queryset with the annotations recipe listings need."""
+
+    def for_viewer(self, viewer):
+        """
+        Annotate is_saved_by_viewer and author_followed_by_viewer, as
+        annotate_viewer() does, with EXISTS subqueries in the same query.
+        """
+
+        if viewer is None or not viewer.is_authenticated:
+            return self.annotate(
+                is_saved_by_viewer=models.Value(False, output_field=models.BooleanField()),
+                author_followed_by_viewer=models.Value(False, output_field=models.BooleanField()),
+            )
+        saved = Recipe.saved_by.through.objects.filter(recipe=models.OuterRef('pk'), user=viewer)
+        followed = User.followers.through.objects.filter(from_user=models.OuterRef('author_id'), to_user=viewer)
+        return self.annotate(is_saved_by_viewer=models.Exists(saved), author_followed_by_viewer=models.Exists(followed))
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recipes')
     title = models.CharField(max_length=255)
@@ -22,33 +75,121 @@ class Recipe(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     saved_by = models.ManyToManyField(User, related_name='saved_recipes', blank=True)
     similar = models.ManyToManyField('self', through='RecipeSimilar', related_name='similars', blank=True, symmetrical=False)
+    # Running totals of review ratings, kept up to date by RecipeReview signals
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # Bitmask of the diets the recipe suits, derived by recipes.dietary;
+    # UNCLASSIFIED (16) until it has ingredients
+    dietary_flags = models.PositiveSmallIntegerField(default=16, db_index=True)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        # Support keyset pagination over (created_at, id) and (updated_at, id)
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='recipe_created_keyset'),
+            models.Index(fields=['updated_at', 'id'], name='recipe_updated_keyset'),
+        ]
+
+    @property
+    def avg_rating(self):
+        """Average review rating, or None if the recipe has no reviews."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
 
     @property
     def type_name(self):
         return self.__class__.__name__
+
+    @property
+    def card_version(self):
+        """
+        Changes whenever anything shown on the recipe's card changes, for
+        keying its cached fragment. Ratings are updated without touching
+        updated_at, so they are part of it too. Needs the `tag_names` set
+        by recipes.tag_names.attach_tag_names(), so a listing cannot fall
+        back to a tag query per card.
+        """
+        tag_names = getattr(self, 'tag_names', None)
+        if tag_names is None:
+            raise ImproperlyConfigured(
+                "Recipe.card_version needs tag_names; pass the recipes through attach_tag_names()"
+            )
+        return "|".join([
+            self.updated_at.isoformat(),
+            str(self.rating_sum),
+            str(self.rating_count),
+            self.author.username,
+            *tag_names,
+        ])
     
     def __str__(self):
         return self.title
     
     def add_similar(self, recipes):
-        for r in recipes:
-            a, b = (r, self) if self.pk > r.pk else (self, r)
-            rs, created = RecipeSimilar.objects.get_or_create(recipe_A=a, recipe_B=b)            
-            if not created:
-                rs.update()
+        """
+        Count one more co-like between this recipe and each of `recipes`.
+
+        Pairs are stored with the lower pk as recipe_A and all of them are
+        written in one INSERT ... ON CONFLICT statement: new pairs start at
+        the number of times they appear and existing pairs are incremented.
+        Old scores fade through the periodic decay job instead of expiring
+        (see recipes.similarity.decay).
+        """
+        pairs = Counter(
+            (min(self.pk, r.pk), max(self.pk, r.pk)) for r in recipes if r.pk != self.pk
+        )
+        if not pairs:
+            return
+
+        opts = RecipeSimilar._meta
+        quote = connection.ops.quote_name
+        table = quote(opts.db_table)
+        recipe_a = quote(opts.get_field('recipe_A').column)
+        recipe_b = quote(opts.get_field('recipe_B').column)
+        score = quote(opts.get_field('similarity_score').column)
+        updated_at = quote(opts.get_field('updated_at').column)
+
+        now = timezone.now()
+        adapt = connection.ops.adapt_datetimefield_value
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(pairs))
+        params = [value for (a, b), n in pairs.items() for value in (a, b, n, adapt(now))]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({recipe_a}, {recipe_b}, {score}, {updated_at}) VALUES {values} "
+                f"ON CONFLICT ({recipe_a}, {recipe_b}) DO UPDATE SET "
+                f"{score} = {table}.{score} + excluded.{score}, "
+                f"{updated_at} = excluded.{updated_at}",
+                params,
+            )
+
+        from recipes.similarity.neighbours import neighbours_changed
+        neighbours_changed({pk for pair in pairs for pk in pair})
 
     def get_similar(self, lim=100):
-        s = Recipe.objects.filter(
-            models.Q(simsB__recipe_A=self) | models.Q(simsA__recipe_B=self)
-        ).distinct().order_by('-simsA__similarity_score')[:lim]
-        return s
+        """Recipes liked by the same people, highest similarity score first."""
+        from recipes.similarity.neighbours import neighbour_index
+        ids = [pk for pk, score in neighbour_index.neighbours(self.pk)[:lim]]
+        recipes = Recipe.objects.select_related('author').in_bulk(ids)
+        return [recipes[pk] for pk in ids if pk in recipes]
+
+    def get_content_similar(self, lim=10):
+        """Recipes with the most similar ingredients and tags, closest first."""
+        return Recipe.objects.filter(
+            content_neighbour_of__recipe=self
+        ).select_related('author').order_by('-content_neighbour_of__score', 'pk')[:lim]
     
 
 class RecipeSimilar(models.Model):
     """Custom through table for 'similar' field"""
     recipe_A = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="simsA")
     recipe_B = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="simsB")
-    similarity_score = models.IntegerField(default=1)
+    # Counted in co-likes: every user who liked or saved both recipes adds 1
+    # (add_similar, or a rebuild in recipes.similarity.cooccurrence), and the
+    # total halves every HALF_LIFE without new ones (recipes.similarity.decay)
+    similarity_score = models.FloatField(default=1)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -56,15 +197,6 @@ class RecipeSimilar(models.Model):
         constraints =[
             models.UniqueConstraint(fields=['recipe_A','recipe_B'], name="unique_similarities")
         ]
-    
-    def update (self):
-        if self.updated_at <= timezone.now() - timedelta(days=60): 
-            self.delete()
-            return
-        else: 
-            self.similarity_score=models.F('similarity_score') + 1
-            self.save()
-    
 
 
 class RecipeIngredient(models.Model):
@@ -99,11 +231,30 @@ class RecipeInstruction(models.Model):
         return f"Step {self.step_number}"
     
 
+def update_similar_recipes(review_id, recipe_id, user_id):
+    """
+    Job: link a recipe the user liked with the other recipes they liked
+    most recently. Only reviews written before `review_id` count, as if
+    the job had run when the review was saved.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None:
+        return
+    similar_recipes = Recipe.objects.filter(
+        reviews__user = user_id,
+        reviews__rating__gte = 4,
+        reviews__pk__lt = review_id
+    ).exclude(pk = recipe_id).order_by("-created_at").only("pk")[:10]
+    recipe.add_similar(similar_recipes)
+
+
 @receiver(models.signals.post_save, sender='recipes.RecipeReview')
 def handle_new_review(sender, instance, created, **kwargs):
     if created and int(instance.rating)>=4:
-        similar_recipes = Recipe.objects.filter(
-            reviews__user = instance.user,
-            reviews__rating__gte = 4
-        ).exclude(pk = instance.recipe.pk).order_by("-created_at")[:10]
-        instance.recipe.add_similar(similar_recipes)
\ No newline at end of file
+        Job.objects.enqueue(
+            update_similar_recipes,
+            key=f"similar-recipes:{instance.pk}",
+            review_id=instance.pk,
+            recipe_id=instance.recipe_id,
+            user_id=instance.user_id,
+        )
\ No newline at end of file
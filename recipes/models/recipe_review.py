@@ -1,5 +1,7 @@
 from django.db import models 
+from django.db.models.functions import Coalesce
 from django.conf import settings 
+from django.dispatch import receiver
 from recipes.models import Recipe
 
 class RecipeReview(models.Model):
@@ -33,4 +35,57 @@ class RecipeReview(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.recipe.title} - {self.rating} stars"
\ No newline at end of file
+        return f"{self.recipe.title} - {self.rating} stars"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so changes can be applied to the recipe's totals
+        instance._stored_rating = instance.rating if 'rating' in field_names else None
+        return instance
+
+
+def recalculate_ratings(recipes=None):
+    """
+    Recompute the stored rating totals from the review table.
+
+    Updates every recipe (or only those in the `recipes` queryset) in a
+    single statement and returns the number of rows updated.
+    """
+
+    if recipes is None:
+        recipes = Recipe.objects.all()
+    reviews = RecipeReview.objects.filter(recipe=models.OuterRef('pk')).order_by().values('recipe')
+    return recipes.update(
+        rating_sum=Coalesce(models.Subquery(reviews.annotate(total=models.Sum('rating')).values('total')), 0),
+        rating_count=Coalesce(models.Subquery(reviews.annotate(total=models.Count('pk')).values('total')), 0),
+    )
+
+
+def _adjust_rating_totals(recipe_id, rating_delta, count_delta):
+    Recipe.objects.filter(pk=recipe_id).update(
+        rating_sum=models.F('rating_sum') + rating_delta,
+        rating_count=models.F('rating_count') + count_delta,
+    )
+
+
+@receiver(models.signals.post_save, sender=RecipeReview)
+def add_review_rating(sender, instance, created, **kwargs):
+    # The rating may still be the raw form or fixture value, e.g. "4"
+    rating = int(instance.rating)
+    stored = getattr(instance, '_stored_rating', None)
+    if created:
+        _adjust_rating_totals(instance.recipe_id, rating, 1)
+    elif stored is None:
+        # Saved without being loaded first, so the old rating is unknown
+        recalculate_ratings(Recipe.objects.filter(pk=instance.recipe_id))
+    elif rating != stored:
+        _adjust_rating_totals(instance.recipe_id, rating - stored, 0)
+    instance._stored_rating = rating
+
+
+@receiver(models.signals.post_delete, sender=RecipeReview)
+def remove_review_rating(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_rating', None)
+    rating = stored if stored is not None else int(instance.rating)
+    _adjust_rating_totals(instance.recipe_id, -rating, -1)
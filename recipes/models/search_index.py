@@ -0,0 +1,35 @@
+from django.db import models
+from .recipe import Recipe
+
+
+class RecipeTrigram(models.Model):
+    """
+    One row per distinct trigram found in a recipe's title and tag names.
+    Used for typo-tolerant (fuzzy) search.
+    """
+
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['trigram', 'recipe'], name='unique_recipe_trigram')
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} -> {self.recipe_id}"
+
+
+class SearchIndexVersion(models.Model):
+    """
+    Change counter for an in-memory search index.
+
+    Bumped every time the data behind the index changes, so each process
+    can tell whether its copy of the index is still current.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
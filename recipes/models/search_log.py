@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class SearchLogEntry(models.Model):
+    """
+    One search, as run by the search page.
+
+    Each search inserts its own row. Rows are only ever appended, and are
+    folded into SearchQueryStats and deleted by the periodic rollup.
+    """
+
+    query = models.CharField(max_length=255)
+    result_count = models.PositiveIntegerField()
+    parse_ms = models.FloatField()
+    db_ms = models.FloatField()
+    render_ms = models.FloatField()
+    created_at = models.DateTimeField()
+
+    @property
+    def total_ms(self):
+        return self.parse_ms + self.db_ms + self.render_ms
+
+    def __str__(self):
+        return f"{self.query!r} ({self.total_ms:.1f} ms)"
+
+
+class SearchQueryStats(models.Model):
+    """Running totals for one normalized search query."""
+
+    query = models.CharField(max_length=255, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    db_ms = models.FloatField(default=0)
+    total_results = models.PositiveBigIntegerField(default=0)
+    last_seen = models.DateTimeField(null=True)
+
+    class Meta:
+        verbose_name_plural = 'search query stats'
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.count if self.count else 0
+
+    def __str__(self):
+        return f"{self.query!r} x{self.count}"
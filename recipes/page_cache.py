@@ -0,0 +1,237 @@
+"""
+Whole-page cache of recipe listings for anonymous visitors.
+
+Logged-out visitors all get the same explore and tag pages, so the HTML of
+each page (one per path and query string, e.g. per tag and cursor) is kept
+in the cache. Views declare what a page depends on with depends_on(): the
+recipes it shows and the listings it belongs to. Each of those has a version
+token that is bumped when it changes, and a cached page is fresh only while
+every version it was rendered against is unchanged, so a page is refreshed
+exactly when one of its recipes (or their rating, tags or author name)
+changes or recipes join its listing. Tokens are PageCacheVersion rows, so
+every process sees a bump and none is lost to cache eviction; checking
+them costs one query per cached page served.
+
+A stale page is not dropped. The first request to see it takes a lock and
+renders a new copy while everyone else is served the stale copy, so a
+burst of traffic after a change costs one render instead of one per
+request. A page nobody has cached yet is locked the same way, and the
+other requests wait briefly for the first copy instead of all rendering it.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import models
+from django.dispatch import receiver
+from django.http import HttpResponse
+from taggit.models import Tag, TaggedItem
+from recipes.models import PageCacheVersion, Recipe, RecipeIngredient, RecipeReview
+
+PREFIX = 'page-cache'
+
+# Pages are re-rendered at least this often, even if nothing they show changed
+FRESH_FOR = 10 * 60
+
+# Stale pages are kept this long to serve while a new copy is rendered
+KEEP_FOR = 60 * 60
+
+# A renderer that dies leaves its lock for this long
+LOCK_TIMEOUT = 30
+
+# Requests for a page nobody has cached wait this long for the first copy
+LOCK_WAIT = 2
+LOCK_POLL = 0.05
+
+
+def _recipe_key(recipe_id):
+    return f'recipe:{recipe_id}'
+
+
+def _listing_key(listing):
+    return f'listing:{listing}'
+
+
+def _bump(names):
+    token = time.time_ns()
+    PageCacheVersion.objects.bulk_create(
+        [PageCacheVersion(name=name, version=token) for name in names],
+        update_conflicts=True,
+        unique_fields=['name'],
+        update_fields=['version'],
+    )
+
+
+def _versions(names):
+    return dict(PageCacheVersion.objects.filter(name__in=names).values_list('name', 'version'))
+
+
+def bump_recipes(recipe_ids):
+    """Mark cached pages showing any of the recipes as stale."""
+
+    _bump([_recipe_key(pk) for pk in recipe_ids])
+
+
+def bump_listings(listings):
+    """Mark cached pages of the given listings as stale."""
+
+    _bump([_listing_key(listing) for listing in listings])
+
+
+def tag_listing(name):
+    return f'tag:{name}'
+
+
+def depends_on(request, recipes=(), listings=()):
+    """Record the recipes and listings the page being rendered shows."""
+
+    request.page_cache_dependencies = (
+        [_recipe_key(recipe.pk) for recipe in recipes] + [_listing_key(listing) for listing in listings]
+    )
+
+
+def _page_key(request):
+    query = request.GET.copy()
+    digest = hashlib.md5(f'{request.path}?{sorted(query.lists())}'.encode()).hexdigest()
+    return f'{PREFIX}:page:{digest}'
+
+
+def _is_fresh(entry):
+    if time.time() > entry['fresh_until']:
+        return False
+    return _versions(list(entry['versions'])) == {
+        name: token for name, token in entry['versions'].items() if token is not None
+    }
+
+
+def _wait_for_entry(key):
+    """The entry another request is rendering, or None if it takes longer than LOCK_WAIT."""
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _from_entry(entry):
+    response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    return response
+
+
+def _render_and_store(view, request, key, args, kwargs):
+    response = view(request, *args, **kwargs)
+    dependencies = getattr(request, 'page_cache_dependencies', None)
+    if response.status_code != 200 or response.cookies or dependencies is None:
+        return response
+
+    versions = _versions(dependencies)
+    cache.set(key, {
+        'content': response.content,
+        'status': response.status_code,
+        'content_type': response['Content-Type'],
+        'headers': {header: response[header] for header in ('Vary',) if response.has_header(header)},
+        'versions': {dependency: versions.get(dependency) for dependency in dependencies},
+        'fresh_until': time.time() + FRESH_FOR,
+    }, KEEP_FOR)
+    return response
+
+
+def cache_anonymous_page(view):
+    """
+    Serve a view from the page cache for anonymous GET requests.
+
+    The view must call depends_on() for its response to be cached.
+    Visitors with pending messages always get a fresh render, since those
+    are shown on the page.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated or len(get_messages(request)):
+            return view(request, *args, **kwargs)
+
+        key = _page_key(request)
+        entry = cache.get(key)
+        if entry is not None and _is_fresh(entry):
+            return _from_entry(entry)
+
+        if cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+            try:
+                return _render_and_store(view, request, key, args, kwargs)
+            finally:
+                cache.delete(f'{key}:lock')
+
+        # Another request is already rendering this page
+        entry = entry or _wait_for_entry(key)
+        if entry is not None:
+            return _from_entry(entry)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _tag_listings(recipe):
+    return [tag_listing(name) for name in recipe.tags.names()]
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    # Saving moves the recipe to the top of its tag pages (newest updated first)
+    bump_recipes([instance.pk])
+    bump_listings((['explore'] if created else []) + _tag_listings(instance))
+
+
+@receiver(models.signals.post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    bump_recipes([instance.pk])
+
+
+@receiver(models.signals.post_save, sender=RecipeReview)
+@receiver(models.signals.post_delete, sender=RecipeReview)
+def rating_changed(sender, instance, **kwargs):
+    bump_recipes([instance.recipe_id])
+
+
+@receiver(models.signals.post_save, sender=RecipeIngredient)
+@receiver(models.signals.post_delete, sender=RecipeIngredient)
+def ingredients_changed(sender, **kwargs):
+    # Ingredients decide which diets a recipe suits
+    bump_listings(['explore:diet'])
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def recipe_tags_changed(sender, instance, action, pk_set, **kwargs):
+    if not isinstance(instance, Recipe):
+        return
+    if action in ('post_add', 'post_remove'):
+        names = Tag.objects.filter(pk__in=pk_set).values_list('name', flat=True)
+        bump_recipes([instance.pk])
+        bump_listings([tag_listing(name) for name in names] + ['explore:diet'])
+    elif action == 'pre_clear':
+        bump_recipes([instance.pk])
+        bump_listings(_tag_listings(instance) + ['explore:diet'])
+
+
+@receiver(models.signals.post_save, sender=Tag)
+@receiver(models.signals.pre_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    # Cards of the tagged recipes show the name, and so do the pages of an old name
+    tagged = TaggedItem.objects.filter(
+        tag=instance, content_type__app_label='recipes', content_type__model='recipe'
+    )
+    bump_recipes(tagged.values_list('object_id', flat=True))
+    bump_listings([tag_listing(instance.name)])
+
+
+@receiver(models.signals.post_save, sender=get_user_model())
+def author_renamed(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'username' in update_fields):
+        bump_recipes(Recipe.objects.filter(author=instance).values_list('pk', flat=True))
@@ -0,0 +1,153 @@
+"""
+Keyset (cursor) pagination for recipe listings.
+
+Instead of COUNT(*) plus OFFSET, each page is fetched with a WHERE clause on
+the (ordering field, id) of the last row shown, so every page costs the same
+however deep it is. Cursors are opaque url-safe tokens.
+"""
+
+import base64
+import json
+from datetime import datetime
+from django.db.models import Max, Q
+
+
+def encode_token(values):
+    """Encode a list of JSON values as an opaque url-safe token."""
+
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token, parse):
+    """
+    Decode a token made by encode_token and return `parse(*values)`.
+
+    Returns None for a missing or malformed token, including one whose
+    values `parse` rejects with a ValueError or TypeError, so callers can
+    send bad links to the first page.
+    """
+
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        return parse(*json.loads(raw))
+    except (ValueError, TypeError):
+        return None
+
+
+def encode_cursor(direction, value, pk):
+    """Encode a page boundary as an opaque token."""
+
+    return encode_token([direction, value.isoformat(), pk])
+
+
+def _parse_cursor(direction, value, pk):
+    if direction not in ('next', 'prev'):
+        raise ValueError(direction)
+    return direction, (datetime.fromisoformat(value), int(pk))
+
+
+def decode_cursor(token):
+    """
+    Decode a token made by encode_cursor.
+
+    Returns (direction, (value, pk)), or ('next', None) for the first page.
+    """
+
+    return decode_token(token, _parse_cursor) or ('next', None)
+
+
+def estimate_count(queryset):
+    """
+    Cheaply estimate the number of rows in a queryset.
+
+    An unfiltered queryset uses the highest primary key (one index lookup),
+    which over-counts by the number of deleted rows. Filtered querysets
+    are counted exactly.
+    """
+
+    if not queryset.query.where:
+        return queryset.aggregate(highest=Max('pk'))['highest'] or 0
+    return queryset.count()
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, paginator):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def approximate_count(self):
+        return self.paginator.approximate_count
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset newest first on (order_field, pk).
+
+    `count_queryset` is an optional plain queryset used for the approximate
+    total; it should have the same filters as `queryset` but no annotations.
+    """
+
+    def __init__(self, queryset, per_page, order_field='created_at', count_queryset=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.order_field = order_field
+        self.count_queryset = count_queryset
+        self._count = None
+
+    @property
+    def approximate_count(self):
+        if self.count_queryset is None:
+            return None
+        if self._count is None:
+            self._count = estimate_count(self.count_queryset)
+        return self._count
+
+    def _cursor(self, direction, obj):
+        return encode_cursor(direction, getattr(obj, self.order_field), obj.pk)
+
+    def get_page(self, cursor=None):
+        """Return the page after (or before) the given cursor token."""
+
+        direction, position = decode_cursor(cursor)
+        field = self.order_field
+        queryset = self.queryset
+
+        if direction == 'prev':
+            value, pk = position
+            queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+            rows = list(queryset.order_by(field, 'pk')[:self.per_page + 1])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            if position is not None:
+                value, pk = position
+                queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+            rows = list(queryset.order_by(f'-{field}', '-pk')[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = position is not None
+
+        next_cursor = self._cursor('next', rows[-1]) if has_next and rows else None
+        previous_cursor = self._cursor('prev', rows[0]) if has_previous and rows else None
+        return KeysetPage(rows, next_cursor, previous_cursor, self)
@@ -0,0 +1,151 @@
+"""
+Per-view query budgets.
+
+Views declare the most queries a request may run, with the @query_budget(n)
+decorator on function views or a `query_budget` attribute on class-based
+views. QueryBudgetMiddleware counts the queries of each request and, when
+settings.QUERY_BUDGET_ENFORCE is on (it follows DEBUG, so it is on during
+development and tests), raises QueryBudgetExceeded for a request over its
+budget. The error carries a report of the queries that ran more than once,
+grouped by SQL fingerprint, with the template line or code that ran them,
+which is usually enough to spot an N+1 loop in a template.
+
+Only GET and HEAD requests are checked. Writes also reindex the recipe for
+search, similarity and feeds, work that grows with what was submitted
+rather than with what a page shows, so views that only accept POST need no
+budget.
+"""
+
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import connection
+from django.db.models import QuerySet
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its view's budget."""
+
+
+def query_budget(limit):
+    """Declare the most queries a function view may run per request."""
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+def view_query_budget(view):
+    """The budget declared by a view function or class-based view, or None."""
+
+    budget = getattr(view, 'query_budget', None)
+    if budget is None:
+        budget = getattr(getattr(view, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+def fingerprint(sql):
+    """Reduce SQL to its shape: literals and IN lists collapse to placeholders."""
+
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+\b', '?', sql)
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', sql)
+    return ' '.join(sql.split())
+
+
+def _caller():
+    """
+    Where the query came from: the innermost template node being rendered,
+    or else the innermost frame of project code outside queryset methods.
+    """
+
+    code_location = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        node = frame.f_locals.get('self') if frame.f_code.co_name == 'render_annotated' else None
+        token = getattr(node, 'token', None)
+        origin = getattr(node, 'origin', None)
+        if token is not None and origin is not None:
+            return f"{origin.template_name or origin.name}:{token.lineno}"
+
+        filename = frame.f_code.co_filename
+        if (code_location is None and filename.startswith(PROJECT_ROOT) and filename != __file__
+                and f'{os.sep}site-packages{os.sep}' not in filename
+                and not isinstance(frame.f_locals.get('self'), QuerySet)):
+            code_location = f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_lineno}"
+        frame = frame.f_back
+    return code_location or 'unknown'
+
+
+class QueryRecorder:
+    """Context manager recording the SQL and origin of every query run inside it."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, _caller()))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def duplicates(self):
+        """[(fingerprint, count, Counter of origins)] for repeated queries, most repeated first."""
+
+        origins = defaultdict(Counter)
+        for sql, origin in self.queries:
+            origins[fingerprint(sql)][origin] += 1
+        repeated = [
+            (shape, sum(counts.values()), counts) for shape, counts in origins.items() if sum(counts.values()) > 1
+        ]
+        return sorted(repeated, key=lambda item: -item[1])
+
+    def report(self, budget=None):
+        """Human readable summary of the queries run and their duplicates."""
+
+        lines = [f"{len(self)} queries" + (f" (budget {budget})" if budget is not None else "")]
+        for shape, count, origins in self.duplicates():
+            lines.append(f"{count} x {shape}")
+            for origin, times in origins.most_common():
+                lines.append(f"    {times} from {origin}")
+        return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    """Fail GET and HEAD requests that run more queries than their view's budget."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS or not getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and len(recorder) > budget:
+            raise QueryBudgetExceeded(f"{request.method} {request.path}: {recorder.report(budget)}")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = view_query_budget(view_func)
@@ -0,0 +1,8 @@
+from .query import SearchQuery, TAG_PREFIX
+from .engine import search_recipe_ids, load_recipes
+from .typeahead import typeahead_index
+from .tag_index import tag_index
+from .ingredient_index import ingredient_index, parse_pantry
+from .cache import search_cache
+from .analytics import search_log
+from . import fulltext, trigram
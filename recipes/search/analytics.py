@@ -0,0 +1,118 @@
+"""
+Timing and usage log for the search page.
+
+Every search appends its normalized query, result count and the time spent
+parsing, querying the database and rendering to SearchLogEntry, one insert
+per search, so the log survives restarts and every process writes to the
+same table. rollup() periodically folds the raw log into one
+SearchQueryStats row per query and deletes the folded entries, keeping the
+tables small; see the search_query_stats command.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+from recipes.db_helpers import QUERY_BATCH_SIZE, chunks
+from recipes.models import SearchLogEntry, SearchQueryStats
+
+STATS_FIELDS = ['count', 'total_ms', 'max_ms', 'db_ms', 'total_results', 'last_seen']
+
+
+class SearchLog:
+    """Append-only log of searches."""
+
+    def record(self, query, result_count, parse_ms, db_ms, render_ms):
+        """Append a search to the log."""
+
+        if not query:
+            return
+
+        SearchLogEntry.objects.create(
+            query=query.normalized()[:255],
+            result_count=result_count,
+            parse_ms=parse_ms,
+            db_ms=db_ms,
+            render_ms=render_ms,
+            created_at=timezone.now(),
+        )
+
+    def rollup(self):
+        """
+        Fold the logged searches into per-query totals.
+
+        One aggregate query groups the log by query; the totals are then
+        merged into SearchQueryStats with a single bulk upsert. Returns the
+        number of log entries folded in. Entries written while the rollup
+        runs are left for the next one.
+        """
+
+        with transaction.atomic():
+            last_id = SearchLogEntry.objects.aggregate(last=Max('pk'))['last']
+            if last_id is None:
+                return 0
+
+            entries = SearchLogEntry.objects.filter(pk__lte=last_id)
+            total_time = F('parse_ms') + F('db_ms') + F('render_ms')
+            groups = list(
+                entries.values('query')
+                .order_by()
+                .annotate(
+                    count=Count('pk'),
+                    total_ms=Sum(total_time),
+                    max_ms=Max(total_time),
+                    db_ms=Sum('db_ms'),
+                    total_results=Sum('result_count'),
+                    last_seen=Max('created_at'),
+                )
+            )
+
+            queries = [group['query'] for group in groups]
+            existing = {}
+            for batch in chunks(queries):
+                existing.update(
+                    (stats.query, stats)
+                    for stats in SearchQueryStats.objects.select_for_update().filter(query__in=batch)
+                )
+
+            merged = []
+            for group in groups:
+                # New instances without a pk, so every row goes in the same upsert
+                stats = SearchQueryStats(query=group['query'])
+                old = existing.get(group['query'])
+                if old is not None:
+                    for field in STATS_FIELDS:
+                        setattr(stats, field, getattr(old, field))
+                stats.count += group['count']
+                stats.total_ms += group['total_ms']
+                stats.max_ms = max(stats.max_ms, group['max_ms'])
+                stats.db_ms += group['db_ms']
+                stats.total_results += group['total_results']
+                stats.last_seen = max(filter(None, [stats.last_seen, group['last_seen']]))
+                merged.append(stats)
+            SearchQueryStats.objects.bulk_create(
+                merged,
+                batch_size=QUERY_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['query'],
+                update_fields=STATS_FIELDS,
+            )
+
+            entries.delete()
+        return sum(group['count'] for group in groups)
+
+    def top_frequent(self, limit=10):
+        """The most often searched queries."""
+
+        return list(SearchQueryStats.objects.order_by('-count', 'query')[:limit])
+
+    def top_slow(self, limit=10):
+        """The queries with the highest average time."""
+
+        return list(
+            SearchQueryStats.objects
+            .filter(count__gt=0)
+            .order_by((F('total_ms') / F('count')).desc(), 'query')[:limit]
+        )
+
+
+search_log = SearchLog()
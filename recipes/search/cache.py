@@ -0,0 +1,140 @@
+"""
+Cache of search results, keyed on the normalized query.
+
+Each entry is the ordered list of matching recipe ids, so pages are
+rendered from the cached list without running the search again. Entries
+carry a generation number that is bumped whenever recipes, their
+ingredients, tags or authors' usernames change, which invalidates every
+cached result at once. Run with a shared cache backend (see CACHES) when
+serving from several processes so they all see the same generation.
+
+The facet values of a query's results (see recipes.search.facets) are
+cached beside its ids. They include average ratings, so they also carry a
+ratings generation that every review bumps.
+"""
+
+import hashlib
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+from recipes.db_helpers import now_and_on_commit
+from recipes.models import Recipe, RecipeIngredient, RecipeReview
+
+
+class SearchResultCache:
+    """Ordered recipe id lists for normalized search queries."""
+
+    prefix = 'search-results'
+    timeout = 10 * 60
+
+    def _generation(self, counter='generation'):
+        generation = cache.get(f'{self.prefix}:{counter}')
+        if generation is None:
+            generation = self._reset_generation(counter)
+        return generation
+
+    def _reset_generation(self, counter='generation'):
+        # Start from the clock so a lost counter never reuses an old generation
+        generation = int(time.time() * 1000)
+        cache.set(f'{self.prefix}:{counter}', generation, None)
+        return generation
+
+    def _key(self, query):
+        digest = hashlib.md5(query.normalized().encode()).hexdigest()
+        return f'{self.prefix}:{self._generation()}:{digest}'
+
+    def _count(self, counter):
+        key = f'{self.prefix}:{counter}'
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+    def get_or_compute(self, query, compute):
+        """Return the cached id list for a query, computing and storing it on a miss."""
+
+        if not query:
+            return compute(query)
+
+        key = self._key(query)
+        recipe_ids = cache.get(key)
+        if recipe_ids is not None:
+            self._count('hits')
+            return recipe_ids
+
+        self._count('misses')
+        recipe_ids = compute(query)
+        cache.set(key, recipe_ids, self.timeout)
+        return recipe_ids
+
+    def facet_values(self, query, compute):
+        """Return the cached facet values of a query's results, computing them on a miss."""
+
+        if not query:
+            return compute()
+
+        key = f"{self._key(query)}:facets:{self._generation('ratings')}"
+        values = cache.get(key)
+        if values is None:
+            values = compute()
+            cache.set(key, values, self.timeout)
+        return values
+
+    def invalidate(self, counter='generation'):
+        """Invalidate every cached result, or with counter='ratings' every cached facet value."""
+
+        try:
+            cache.incr(f'{self.prefix}:{counter}')
+        except ValueError:
+            self._reset_generation(counter)
+
+    def stats(self):
+        """Return the hit and miss counters."""
+
+        counters = cache.get_many([f'{self.prefix}:hits', f'{self.prefix}:misses'])
+        return {
+            'hits': counters.get(f'{self.prefix}:hits', 0),
+            'misses': counters.get(f'{self.prefix}:misses', 0),
+        }
+
+    def reset_stats(self):
+        cache.delete_many([f'{self.prefix}:hits', f'{self.prefix}:misses'])
+
+
+search_cache = SearchResultCache()
+
+
+def invalidate_search_cache(counter='generation'):
+    """Invalidate cached results, see now_and_on_commit."""
+
+    now_and_on_commit(lambda: search_cache.invalidate(counter))
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+@receiver(models.signals.post_delete, sender=Recipe)
+@receiver(models.signals.post_save, sender=RecipeIngredient)
+@receiver(models.signals.post_delete, sender=RecipeIngredient)
+def invalidate_on_recipe_change(sender, **kwargs):
+    invalidate_search_cache()
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def invalidate_on_tag_change(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_search_cache()
+
+
+@receiver(models.signals.post_save, sender=RecipeReview)
+@receiver(models.signals.post_delete, sender=RecipeReview)
+def invalidate_on_rating_change(sender, **kwargs):
+    invalidate_search_cache('ratings')
+
+
+@receiver(models.signals.post_save, sender=get_user_model())
+def invalidate_on_username_change(sender, update_fields=None, **kwargs):
+    if update_fields is None or 'username' in update_fields:
+        invalidate_search_cache()
@@ -0,0 +1,74 @@
+"""
+Turns a parsed search box query into an ordered list of recipe ids.
+
+Views paginate the id list and only load the recipes on the requested page,
+so the cost of rendering a page does not depend on the number of matches.
+"""
+
+from django.db.models import Q
+from recipes.models import Recipe
+from recipes.search import fulltext, trigram
+from recipes.search.tag_index import tag_index
+
+
+def _contains_filter(terms):
+    """
+    Fallback text filter used when the full-text index is unavailable.
+    Matches the full phrase or any individual word against title and author.
+    """
+
+    query_filter = Q()
+    normal_query = " ".join(terms)
+    query_filter |= Q(title__icontains=normal_query) | Q(author__username__icontains=normal_query)
+
+    for term in terms:
+        query_filter |= Q(title__icontains=term) | Q(author__username__icontains=term)
+
+    return query_filter
+
+
+def search_recipe_ids(query):
+    """
+    Return the ids of recipes matching a SearchQuery.
+
+    Tags use AND logic and must match exactly (case-insensitive); they are
+    intersected in memory by the tag index. A tag that does not exist
+    empties the results unless normal terms are also given.
+    Normal terms are matched through the full-text index (or the trigram
+    index in fuzzy mode) and ordered by relevance; tag-only queries are
+    ordered newest first.
+    """
+
+    if not query:
+        return []
+
+    tagged_ids, unknown_tags = tag_index.match(query.tags)
+    if unknown_tags and not query.terms:
+        return []
+
+    if query.terms:
+        if query.fuzzy:
+            ranked_ids = trigram.search(query.terms)
+        else:
+            ranked_ids = fulltext.search(query.terms)
+        if ranked_ids is not None:
+            if tagged_ids is not None:
+                allowed = set(tagged_ids)
+                ranked_ids = [pk for pk in ranked_ids if pk in allowed]
+            return ranked_ids
+
+    recipes = Recipe.objects.all()
+    if tagged_ids is not None:
+        recipes = recipes.filter(pk__in=tagged_ids)
+    if query.terms:
+        recipes = recipes.filter(_contains_filter(query.terms))
+
+    return list(recipes.order_by('-created_at').values_list('pk', flat=True))
+
+
+def load_recipes(recipe_ids):
+    """Fetch the recipes for a list of ids, keeping the order of the list."""
+
+    recipes = Recipe.objects.filter(pk__in=recipe_ids).select_related('author')
+    by_id = {recipe.pk: recipe for recipe in recipes}
+    return [by_id[pk] for pk in recipe_ids if pk in by_id]
@@ -0,0 +1,202 @@
+"""
+Facet counts for search results.
+
+All facets are computed together: the prep time, servings and average
+rating of every matching recipe are loaded in batched queries (and cached
+with the query's results), then a single pass over the matching ids buckets
+each recipe and counts its tags from the tag index. Facet selections
+(?prep=, ?servings=, ?rating=) filter the same id list, and picking a tag
+adds it to the query as a #tag. The diet facet tests the stored dietary
+flags; a recipe can count towards several diets.
+
+Counts are disjunctive: each facet is counted over the results filtered by
+every other facet's selection but not its own, so the other options of a
+selected facet keep showing how many results picking them instead gives.
+"""
+
+from collections import Counter
+from recipes.db_helpers import chunks
+from recipes.dietary import DIET_LABELS, DIETARY_FLAGS, suits
+from recipes.models import Recipe
+from recipes.search.cache import search_cache
+from recipes.search.query import TAG_PREFIX
+from recipes.search.tag_index import tag_index
+
+# (value, label, lowest, highest) - bounds are inclusive, None is open-ended
+PREP_TIME_BUCKETS = [
+    ('15', 'Under 15 min', None, 15),
+    ('30', '15 - 30 min', 16, 30),
+    ('60', '30 - 60 min', 31, 60),
+    ('60+', 'Over an hour', 61, None),
+]
+
+SERVINGS_BUCKETS = [
+    ('1-2', '1 - 2', None, 2),
+    ('3-4', '3 - 4', 3, 4),
+    ('5-6', '5 - 6', 5, 6),
+    ('7+', '7 or more', 7, None),
+]
+
+# Ratings are averages, so the upper bound of a band is exclusive
+RATING_BANDS = [
+    ('4', '4 stars and up', 4, None),
+    ('3', '3 - 4 stars', 3, 4),
+    ('low', 'Under 3 stars', None, 3),
+]
+UNRATED = ('unrated', 'Not yet rated')
+
+FACET_LABELS = {
+    'prep': 'Prep time',
+    'servings': 'Servings',
+    'rating': 'Rating',
+}
+
+TAG_FACET_SIZE = 10
+
+
+def _bucket(value, buckets):
+    for key, label, lowest, highest in buckets:
+        if (lowest is None or value >= lowest) and (highest is None or value <= highest):
+            return key
+    return None
+
+
+def _rating_band(avg_rating):
+    if avg_rating is None:
+        return UNRATED[0]
+    for key, label, lowest, highest in RATING_BANDS:
+        if (lowest is None or avg_rating >= lowest) and (highest is None or avg_rating < highest):
+            return key
+    return None
+
+
+def recipe_facet_values(recipe_ids):
+    """Map each recipe id to its prep, servings, rating and diet facet values, one query per batch."""
+
+    values = {}
+    for batch in chunks(recipe_ids):
+        rows = (
+            Recipe.objects
+            .filter(pk__in=batch)
+            .values_list('pk', 'prep_time', 'servings', 'rating_sum', 'rating_count', 'dietary_flags')
+        )
+        for pk, prep_time, servings, rating_sum, rating_count, dietary_flags in rows:
+            values[pk] = {
+                'prep': _bucket(prep_time, PREP_TIME_BUCKETS),
+                'servings': _bucket(servings, SERVINGS_BUCKETS),
+                'rating': _rating_band(rating_sum / rating_count if rating_count else None),
+                'diet': dietary_flags,
+            }
+    return values
+
+
+def _options(name, buckets, counts, selected, params):
+    options = []
+    for key, label in buckets:
+        toggled = params.copy()
+        toggled.pop('page', None)
+        if selected.get(name) == key:
+            toggled.pop(name, None)
+        else:
+            toggled[name] = key
+        options.append({
+            'value': key,
+            'label': label,
+            'count': counts[name][key],
+            'selected': selected.get(name) == key,
+            'query_string': toggled.urlencode(),
+        })
+    return options
+
+
+def _diet_options(counts, diet, params):
+    options = []
+    for key in DIETARY_FLAGS:
+        toggled = params.copy()
+        toggled.pop('page', None)
+        if diet == key:
+            toggled.pop('diet', None)
+        else:
+            toggled['diet'] = key
+        options.append({
+            'value': key,
+            'label': DIET_LABELS[key],
+            'count': counts[key],
+            'selected': diet == key,
+            'query_string': toggled.urlencode(),
+        })
+    return options
+
+
+def apply_facets(query, recipe_ids, params, diet=None):
+    """
+    Filter the ordered result ids by the facet selections in `params`
+    (a QueryDict) and by `diet` (a key of DIETARY_FLAGS), and count
+    every facet over the results of the other facets' selections.
+    `recipe_ids` must be the results of `query`, whose facet values are
+    cached with them.
+
+    Returns (filtered ids in their original order, list of facets for the template).
+    """
+
+    selected = {name: params[name] for name in FACET_LABELS if params.get(name)}
+    values = search_cache.facet_values(query, lambda: recipe_facet_values(recipe_ids))
+
+    diet_flag = DIETARY_FLAGS.get(diet, 0)
+
+    filtered_ids = []
+    counts = {name: Counter() for name in FACET_LABELS}
+    diet_counts = Counter()
+    for pk in recipe_ids:
+        recipe_values = values.get(pk)
+        if recipe_values is None:
+            continue
+        failed = [name for name, value in selected.items() if recipe_values[name] != value]
+        if not suits(recipe_values['diet'], diet_flag):
+            failed.append('diet')
+        if len(failed) > 1:
+            continue
+        if not failed:
+            filtered_ids.append(pk)
+
+        # A recipe only missing one facet's selection still counts for that facet
+        for name in FACET_LABELS:
+            if failed in ([], [name]):
+                counts[name][recipe_values[name]] += 1
+        if failed in ([], ['diet']):
+            for key, flag in DIETARY_FLAGS.items():
+                if suits(recipe_values['diet'], flag):
+                    diet_counts[key] += 1
+
+    facets = [
+        {'name': name, 'label': FACET_LABELS[name], 'options': _options(name, choices, counts, selected, params)}
+        for name, choices in (
+            ('prep', [bucket[:2] for bucket in PREP_TIME_BUCKETS]),
+            ('servings', [bucket[:2] for bucket in SERVINGS_BUCKETS]),
+            ('rating', [band[:2] for band in RATING_BANDS] + [UNRATED]),
+        )
+    ]
+    facets.append({'name': 'diet', 'label': 'Diet', 'options': _diet_options(diet_counts, diet, params)})
+
+    # Tags already in the query are not offered again
+    in_query = {tag.lower() for tag in query.tags}
+    tag_options = []
+    tag_counts = tag_index.count_tags(filtered_ids)
+    for name, count in sorted(tag_counts.items(), key=lambda item: (-item[1], item[0])):
+        if name in in_query:
+            continue
+        refined = params.copy()
+        refined.pop('page', None)
+        refined['search'] = f"{query.text} {TAG_PREFIX}{name}".strip()
+        tag_options.append({
+            'value': name,
+            'label': TAG_PREFIX + name,
+            'count': count,
+            'selected': False,
+            'query_string': refined.urlencode(),
+        })
+        if len(tag_options) == TAG_FACET_SIZE:
+            break
+    facets.insert(0, {'name': 'tag', 'label': 'Tags', 'options': tag_options})
+
+    return filtered_ids, facets
@@ -0,0 +1,226 @@
+"""
+Full-text search index over recipes, backed by an SQLite FTS5 table.
+
+One row per recipe (rowid = recipe id) holding the title, description,
+author username, ingredient names and tag names. The index is kept in sync
+by the signal receivers at the bottom of this module and can be rebuilt from
+scratch with `python3 manage.py rebuild_search_index`.
+
+On databases without FTS5 every function is a no-op and `search` returns
+None, so callers fall back to plain `icontains` filtering.
+"""
+
+import re
+from collections import defaultdict
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+from recipes.models import Recipe, RecipeIngredient
+
+TABLE = 'recipes_recipe_fts'
+
+# Relative bm25 weight of each indexed column, in table column order.
+COLUMN_WEIGHTS = {
+    'title': 10.0,
+    'description': 1.0,
+    'author': 5.0,
+    'ingredients': 2.0,
+    'tags': 3.0,
+}
+
+_TOKEN_RE = re.compile(r'\w+')
+
+_available = False
+
+
+def is_available():
+    """Return True if the database has the FTS index table."""
+
+    global _available
+    if not _available:
+        _available = (
+            connection.vendor == 'sqlite'
+            and TABLE in connection.introspection.table_names()
+        )
+    return _available
+
+
+def build_match_expression(terms):
+    """
+    Turn normal search terms into an FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix query and words are OR-ed together, so
+    'chick rice' matches anything containing a word starting with 'chick' or 'rice'.
+    Returns an empty string if the terms contain no searchable characters.
+    """
+
+    tokens = []
+    for term in terms:
+        for token in _TOKEN_RE.findall(term.lower()):
+            if token not in tokens:
+                tokens.append(token)
+
+    return " OR ".join(f'"{token}"*' for token in tokens)
+
+
+def search(terms):
+    """
+    Return the ids of recipes matching the terms, best bm25 match first.
+
+    Returns None if the full-text index is not available.
+    """
+
+    if not is_available():
+        return None
+
+    match = build_match_expression(terms)
+    if not match:
+        return []
+
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS.values())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s "
+            f"ORDER BY bm25({TABLE}, {weights}), rowid DESC",
+            [match],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _recipe_tag_names(recipe_ids):
+    """Map recipe id -> list of tag names for the given recipes (None for all)."""
+
+    tagged = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Recipe))
+    if recipe_ids is not None:
+        tagged = tagged.filter(object_id__in=recipe_ids)
+
+    names = defaultdict(list)
+    for recipe_id, name in tagged.values_list('object_id', 'tag__name'):
+        names[recipe_id].append(name)
+    return names
+
+
+def _recipe_ingredient_names(recipe_ids):
+    """Map recipe id -> list of ingredient names for the given recipes (None for all)."""
+
+    ingredients = RecipeIngredient.objects.all()
+    if recipe_ids is not None:
+        ingredients = ingredients.filter(recipe_id__in=recipe_ids)
+
+    names = defaultdict(list)
+    for recipe_id, name in ingredients.values_list('recipe_id', 'name'):
+        names[recipe_id].append(name)
+    return names
+
+
+def _index_rows(recipe_ids=None):
+    """Build the FTS rows for the given recipes (None for every recipe)."""
+
+    recipes = Recipe.objects.all()
+    if recipe_ids is not None:
+        recipes = recipes.filter(pk__in=recipe_ids)
+
+    ingredients = _recipe_ingredient_names(recipe_ids)
+    tags = _recipe_tag_names(recipe_ids)
+
+    return [
+        (
+            pk,
+            title,
+            description,
+            username or '',
+            " ".join(ingredients.get(pk, [])),
+            " ".join(tags.get(pk, [])),
+        )
+        for pk, title, description, username in recipes.values_list(
+            'pk', 'title', 'description', 'author__username'
+        )
+    ]
+
+
+def _write_rows(cursor, rows):
+    columns = ", ".join(COLUMN_WEIGHTS)
+    placeholders = ", ".join(["%s"] * (len(COLUMN_WEIGHTS) + 1))
+    cursor.executemany(
+        f"INSERT INTO {TABLE} (rowid, {columns}) VALUES ({placeholders})", rows
+    )
+
+
+def index_recipe(recipe_id):
+    """(Re)index a single recipe, removing it if it no longer exists."""
+
+    if not is_available():
+        return
+
+    rows = _index_rows([recipe_id])
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [recipe_id])
+        _write_rows(cursor, rows)
+
+
+def remove_recipe(recipe_id):
+    """Remove a recipe from the index."""
+
+    if not is_available():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [recipe_id])
+
+
+def rebuild_index():
+    """Drop every index row and reindex all recipes. Returns the number indexed."""
+
+    if not is_available():
+        return 0
+
+    rows = _index_rows()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        _write_rows(cursor, rows)
+    return len(rows)
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+def index_saved_recipe(sender, instance, **kwargs):
+    index_recipe(instance.pk)
+
+
+@receiver(models.signals.post_delete, sender=Recipe)
+def unindex_deleted_recipe(sender, instance, **kwargs):
+    remove_recipe(instance.pk)
+
+
+@receiver(models.signals.post_save, sender=RecipeIngredient)
+@receiver(models.signals.post_delete, sender=RecipeIngredient)
+def index_changed_ingredient(sender, instance, **kwargs):
+    index_recipe(instance.recipe_id)
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def index_changed_tags(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        index_recipe(instance.pk)
+
+
+@receiver(models.signals.post_save, sender=get_user_model())
+def index_renamed_author(sender, instance, update_fields=None, **kwargs):
+    """Keep the author column in step when a user changes their username."""
+
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if not is_available():
+        return
+
+    recipe_ids = list(Recipe.objects.filter(author=instance).values_list('pk', flat=True))
+    if not recipe_ids:
+        return
+
+    placeholders = ", ".join(["%s"] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {TABLE} SET author = %s WHERE rowid IN ({placeholders})",
+            [instance.username, *recipe_ids],
+        )
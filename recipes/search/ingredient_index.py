@@ -0,0 +1,139 @@
+"""
+In-memory inverted index of recipe ingredients for pantry searches.
+
+Ingredient names are free text, so they are normalized ('Eggs ' and 'egg'
+are the same ingredient) and each normalized name maps to a sorted array of
+the ids of recipes using it. Each recipe also records its set of
+ingredients, so a pantry search only touches the postings of the pantry's
+ingredients and then compares per-recipe hit counts with ingredient counts.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+from django.db import models
+from django.dispatch import receiver
+from recipes.models import Recipe, RecipeIngredient
+from recipes.search.memory_index import InMemoryIndex
+from recipes.search.postings import contains
+
+PantryMatch = namedtuple('PantryMatch', ['recipe_id', 'matched', 'total', 'missing'])
+
+
+def normalize_ingredient(name):
+    """
+    Reduce an ingredient name to its lookup form.
+
+    Lowercases, keeps only letters, digits and single spaces, and drops a
+    simple plural ending from the last word ('tomatoes' -> 'tomato').
+    """
+
+    words = re.sub(r'[^\w\s]', ' ', name.lower()).split()
+    if not words:
+        return ''
+    last = words[-1]
+    if len(last) > 3 and last.endswith('oes'):
+        last = last[:-2]
+    elif len(last) > 3 and last.endswith('s') and not last.endswith('ss'):
+        last = last[:-1]
+    return " ".join(words[:-1] + [last])
+
+
+def parse_pantry(text):
+    """Split comma or newline separated ingredients into normalized names."""
+
+    names = []
+    for part in re.split(r'[,\n]', text):
+        name = normalize_ingredient(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class IngredientIndex(InMemoryIndex):
+    """Normalized ingredient name -> sorted array of recipe ids."""
+
+    name = 'ingredients'
+
+    def __init__(self):
+        super().__init__()
+        self.postings = {}
+        self.recipe_ingredients = {}
+
+    def build(self):
+        postings = {}
+        recipe_ingredients = {}
+
+        for recipe_id, name in RecipeIngredient.objects.values_list('recipe_id', 'name'):
+            key = normalize_ingredient(name)
+            if not key:
+                continue
+            recipe_ingredients.setdefault(recipe_id, set()).add(key)
+
+        for recipe_id, keys in recipe_ingredients.items():
+            for key in keys:
+                postings.setdefault(key, []).append(recipe_id)
+
+        self.postings = {key: array('q', sorted(ids)) for key, ids in postings.items()}
+        self.recipe_ingredients = recipe_ingredients
+
+    def pantry(self, names, max_missing=0):
+        """
+        Find recipes that can be made from the given ingredients.
+
+        `names` should already be normalized (see parse_pantry). A recipe
+        matches if at most `max_missing` of its ingredients are not in the
+        pantry and it uses at least one pantry ingredient. Returns
+        PantryMatch tuples, best coverage first, then fewest missing.
+        """
+
+        self.ensure_current()
+        hits = Counter()
+        for key in set(names):
+            hits.update(self.postings.get(key, ()))
+
+        pantry = set(names)
+        matches = []
+        for recipe_id, matched in hits.items():
+            ingredients = self.recipe_ingredients[recipe_id]
+            if len(ingredients) - matched <= max_missing:
+                missing = sorted(ingredients - pantry)
+                matches.append(PantryMatch(recipe_id, matched, len(ingredients), missing))
+
+        matches.sort(key=lambda match: (-match.matched / match.total, len(match.missing), match.recipe_id))
+        return matches
+
+    def set_recipe_ingredients(self, recipe_id, names):
+        """Replace the ingredients recorded for a recipe."""
+
+        new = {key for key in map(normalize_ingredient, names) if key}
+        old = self.recipe_ingredients.pop(recipe_id, set())
+
+        for key in old - new:
+            postings = self.postings.get(key)
+            if postings is not None and contains(postings, recipe_id):
+                postings.pop(bisect_left(postings, recipe_id))
+                if not postings:
+                    del self.postings[key]
+        for key in new - old:
+            insort(self.postings.setdefault(key, array('q')), recipe_id)
+
+        if new:
+            self.recipe_ingredients[recipe_id] = new
+
+
+ingredient_index = IngredientIndex()
+
+
+@receiver(models.signals.post_save, sender=RecipeIngredient)
+@receiver(models.signals.post_delete, sender=RecipeIngredient)
+def update_recipe_ingredients(sender, instance, **kwargs):
+    recipe_id = instance.recipe_id
+    names = list(RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list('name', flat=True))
+    ingredient_index.changed(lambda: ingredient_index.set_recipe_ingredients(recipe_id, names))
+
+
+@receiver(models.signals.post_delete, sender=Recipe)
+def remove_deleted_recipe(sender, instance, **kwargs):
+    ingredient_index.changed(lambda: ingredient_index.set_recipe_ingredients(instance.pk, []))
@@ -0,0 +1,81 @@
+"""
+Base class for process-local search indexes.
+
+Each index keeps its data in memory and a version number in the
+SearchIndexVersion table. Every change bumps the stored version: if this
+process was up to date the change is applied in place, otherwise the index
+is rebuilt from the database the next time it is used. This keeps separate
+worker processes (and rolled back transactions) from serving stale data.
+"""
+
+import threading
+from django.db.models import F
+from recipes.models import SearchIndexVersion
+
+
+def current_version(name):
+    """Return the stored version of an index (0 if it has never changed)."""
+
+    version = SearchIndexVersion.objects.filter(name=name).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_version(name):
+    """Increment the stored version of an index and return the new value."""
+
+    updated = SearchIndexVersion.objects.filter(name=name).update(version=F('version') + 1)
+    if not updated:
+        SearchIndexVersion.objects.get_or_create(name=name)
+        SearchIndexVersion.objects.filter(name=name).update(version=F('version') + 1)
+    return current_version(name)
+
+
+class InMemoryIndex:
+    """
+    A lazily built, process-local index kept in step with the database.
+
+    Subclasses set `name` and implement `build()`, which loads the whole
+    index from the database. Lookups call `ensure_current()` first; signal
+    receivers report changes through `changed()`.
+    """
+
+    name = None
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+
+    def build(self):
+        raise NotImplementedError
+
+    def ensure_current(self):
+        """Rebuild the index if it is missing or out of date."""
+
+        version = current_version(self.name)
+        if version != self._version:
+            with self._lock:
+                self.build()
+                self._version = version
+
+    def changed(self, apply=None):
+        """
+        Record a change to the data behind the index.
+
+        `apply` updates the in-memory data for the change. It is only called
+        if this process held the previous version; otherwise (or if no
+        `apply` is given) the index is marked stale and rebuilt on the next lookup.
+        """
+
+        version = bump_version(self.name)
+        with self._lock:
+            if apply is not None and self._version is not None and self._version == version - 1:
+                apply()
+                self._version = version
+            else:
+                self._version = None
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup."""
+
+        with self._lock:
+            self._version = None
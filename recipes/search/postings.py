@@ -0,0 +1,13 @@
+"""
+Helpers for posting lists: sorted arrays of recipe ids, as kept by the
+in-memory tag and ingredient indexes.
+"""
+
+from bisect import bisect_left
+
+
+def contains(postings, recipe_id):
+    """Whether the sorted `postings` include recipe_id, by binary search."""
+
+    position = bisect_left(postings, recipe_id)
+    return position < len(postings) and postings[position] == recipe_id
@@ -0,0 +1,37 @@
+TAG_PREFIX = '#'
+
+
+class SearchQuery:
+    """
+    A search box query split into #tags and normal terms.
+
+    Words starting with '#' are tags (matched exactly, AND logic),
+    every other word is a normal term (matched against recipe text, OR logic).
+    In fuzzy mode normal terms are matched by trigram similarity instead,
+    so misspelled words still find recipes.
+    """
+
+    def __init__(self, text, fuzzy=False):
+        self.text = text or ''
+        self.fuzzy = fuzzy
+        words = self.text.split()
+
+        self.tags = [word[1:].strip() for word in words if word.startswith(TAG_PREFIX)]
+        self.terms = [word.strip() for word in words if not word.startswith(TAG_PREFIX)]
+
+    def normalized(self):
+        """
+        Return a canonical form of the query: lowercased, with tags sorted
+        and terms deduplicated, so equivalent searches share one form.
+        """
+
+        tags = sorted({tag.lower() for tag in self.tags})
+        terms = sorted({term.lower() for term in self.terms})
+        mode = 'fuzzy' if self.fuzzy else 'text'
+        return " ".join([f"{mode}:"] + [TAG_PREFIX + tag for tag in tags] + terms)
+
+    def __bool__(self):
+        return bool(self.tags or self.terms)
+
+    def __str__(self):
+        return self.text
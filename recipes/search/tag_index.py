@@ -0,0 +1,131 @@
+"""
+In-memory posting lists for #tag searches.
+
+Every tag name maps to a sorted array of the ids of recipes carrying it, so
+a multi-tag AND query is an intersection of id arrays instead of one join
+through taggit's tables per tag. The intersection walks the smallest posting
+and binary-searches the others, costing roughly the size of the rarest tag.
+"""
+
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from django.db import models
+from django.dispatch import receiver
+from taggit.models import Tag, TaggedItem
+from recipes.models import Recipe
+from recipes.search.memory_index import InMemoryIndex
+from recipes.search.postings import contains
+
+
+class TagIndex(InMemoryIndex):
+    """Tag name (lowercased) -> sorted array of recipe ids."""
+
+    name = 'tags'
+
+    def __init__(self):
+        super().__init__()
+        self.postings = {}
+        self.recipe_tags = {}
+
+    def build(self):
+        postings = {name.lower(): [] for name in Tag.objects.values_list('name', flat=True)}
+        recipe_tags = {}
+
+        tagged = (
+            TaggedItem.objects
+            .filter(content_type__app_label='recipes', content_type__model='recipe')
+            .values_list('object_id', 'tag__name')
+        )
+        for recipe_id, name in tagged:
+            key = name.lower()
+            postings.setdefault(key, []).append(recipe_id)
+            recipe_tags.setdefault(recipe_id, set()).add(key)
+
+        self.postings = {key: array('q', sorted(ids)) for key, ids in postings.items()}
+        self.recipe_tags = recipe_tags
+
+    def match(self, names):
+        """
+        Intersect the postings of the named tags (case-insensitive).
+
+        Returns a tuple of the sorted ids of recipes carrying every known
+        tag (None if none of the tags exist) and the names of unknown tags.
+        """
+
+        if not names:
+            return None, []
+
+        self.ensure_current()
+        known = {name.lower() for name in names if name.lower() in self.postings}
+        unknown = [name for name in names if name.lower() not in known]
+        if not known:
+            return None, unknown
+
+        smallest, *others = sorted((self.postings[key] for key in known), key=len)
+        recipe_ids = [
+            recipe_id for recipe_id in smallest
+            if all(contains(postings, recipe_id) for postings in others)
+        ]
+        return recipe_ids, unknown
+
+    def count_tags(self, recipe_ids):
+        """Count how many of the given recipes carry each tag."""
+
+        self.ensure_current()
+        counts = Counter()
+        for recipe_id in recipe_ids:
+            counts.update(self.recipe_tags.get(recipe_id, ()))
+        return counts
+
+    def set_recipe_tags(self, recipe_id, names):
+        """Replace the tags recorded for a recipe."""
+
+        new = {name.lower() for name in names}
+        old = self.recipe_tags.pop(recipe_id, set())
+
+        for key in old - new:
+            postings = self.postings.get(key)
+            if postings is not None and contains(postings, recipe_id):
+                postings.pop(bisect_left(postings, recipe_id))
+        for key in new - old:
+            insort(self.postings.setdefault(key, array('q')), recipe_id)
+
+        if new:
+            self.recipe_tags[recipe_id] = new
+
+    def remove_tag(self, key):
+        """Drop a deleted tag and its postings."""
+
+        for recipe_id in self.postings.pop(key, ()):
+            self.recipe_tags.get(recipe_id, set()).discard(key)
+
+
+tag_index = TagIndex()
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def update_recipe_tags(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        names = list(instance.tags.names())
+        tag_index.changed(lambda: tag_index.set_recipe_tags(instance.pk, names))
+
+
+@receiver(models.signals.post_delete, sender=Recipe)
+def remove_deleted_recipe(sender, instance, **kwargs):
+    tag_index.changed(lambda: tag_index.set_recipe_tags(instance.pk, []))
+
+
+@receiver(models.signals.post_save, sender=Tag)
+def add_saved_tag(sender, instance, **kwargs):
+    tag_index.changed(lambda: tag_index.postings.setdefault(instance.name.lower(), array('q')))
+
+
+@receiver(models.signals.post_delete, sender=Tag)
+def remove_deleted_tag(sender, instance, **kwargs):
+    key = instance.name.lower()
+    if Tag.objects.filter(name__iexact=key).exists():
+        # Another tag differing only in case still uses this name
+        tag_index.changed()
+    else:
+        tag_index.changed(lambda: tag_index.remove_tag(key))
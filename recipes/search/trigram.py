@@ -0,0 +1,161 @@
+"""
+Trigram index over recipe titles and tag names for typo-tolerant search.
+
+Every word is padded ("  word ") and split into overlapping three-character
+chunks, so 'spagetti' still shares most of its trigrams with 'spaghetti'.
+The trigrams of each recipe are stored in RecipeTrigram and updated for
+that recipe whenever its title or tags change.
+
+Matching groups and counts the stored rows of every query trigram, so the
+work grows with how many recipes share those trigrams; CANDIDATE_LIMIT only
+caps the output. Trigrams found in more than COMMON_TRIGRAM_RECIPES recipes
+(" pa", "ing", ...) say little about a match and are left out of the count.
+A query made only of such trigrams still counts them all.
+"""
+
+import math
+import re
+from django.db import connection, models
+from django.db.models import Count
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+from recipes.db_helpers import chunks
+from recipes.models import Recipe, RecipeTrigram
+
+# Upper bound on the candidates returned by a fuzzy search,
+# so a query never returns (or renders) more than this many recipes.
+CANDIDATE_LIMIT = 200
+
+# Fraction of a query word's trigrams a recipe must share to match.
+MIN_SIMILARITY = 0.5
+
+# Trigrams stored for more recipes than this are too common to search by
+COMMON_TRIGRAM_RECIPES = 5000
+
+# Trigrams counted per query. Each is a branch of a compound SELECT with
+# three parameters; SQLite allows 500 branches and (before 3.32) 999 parameters
+COMMON_TRIGRAM_BATCH = 300
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def word_trigrams(word):
+    """Return the set of padded trigrams for a single word."""
+
+    padded = f"  {word.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def text_trigrams(text):
+    """Return the set of trigrams for every word in a piece of text."""
+
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        grams |= word_trigrams(word)
+    return grams
+
+
+def index_recipe(recipe):
+    """
+    Bring the stored trigrams for a recipe in line with its title and tags,
+    writing only the trigrams that changed.
+    """
+
+    grams = text_trigrams(recipe.title)
+    for name in recipe.tags.names():
+        grams |= text_trigrams(name)
+
+    stored = set(RecipeTrigram.objects.filter(recipe=recipe).values_list('trigram', flat=True))
+    if stored == grams:
+        return
+    if stored - grams:
+        RecipeTrigram.objects.filter(recipe=recipe, trigram__in=stored - grams).delete()
+    RecipeTrigram.objects.bulk_create(
+        RecipeTrigram(recipe=recipe, trigram=gram) for gram in grams - stored
+    )
+
+
+def rebuild_index():
+    """Reindex the trigrams of every recipe. Returns the number of recipes indexed."""
+
+    RecipeTrigram.objects.all().delete()
+    rows = []
+    count = 0
+    for recipe in Recipe.objects.prefetch_related('tags').iterator(chunk_size=500):
+        grams = text_trigrams(recipe.title)
+        for tag in recipe.tags.all():
+            grams |= text_trigrams(tag.name)
+        rows.extend(RecipeTrigram(recipe=recipe, trigram=gram) for gram in grams)
+        count += 1
+
+    RecipeTrigram.objects.bulk_create(rows, batch_size=1000)
+    return count
+
+
+def common_trigrams(grams):
+    """
+    Return the trigrams stored for more than COMMON_TRIGRAM_RECIPES recipes.
+
+    Each trigram's rows are counted only up to that limit, so this reads a
+    bounded slice of the index however common a trigram is.
+    """
+
+    grams = sorted(grams)
+    table = RecipeTrigram._meta.db_table
+    common = set()
+    for batch in chunks(grams, COMMON_TRIGRAM_BATCH):
+        counts = " UNION ALL ".join(
+            f"SELECT %s, (SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE trigram = %s LIMIT %s) AS postings)"
+            for _ in batch
+        )
+        params = []
+        for gram in batch:
+            params += [gram, gram, COMMON_TRIGRAM_RECIPES + 1]
+        with connection.cursor() as cursor:
+            cursor.execute(counts, params)
+            common.update(gram for gram, count in cursor.fetchall() if count > COMMON_TRIGRAM_RECIPES)
+    return common
+
+
+def search(terms, limit=CANDIDATE_LIMIT):
+    """
+    Return ids of recipes whose title or tags resemble the terms,
+    most shared trigrams first.
+    """
+
+    words = [word for term in terms for word in _WORD_RE.findall(term.lower())]
+    if not words:
+        return []
+
+    word_grams = [word_trigrams(word) for word in words]
+    common = common_trigrams(set().union(*word_grams))
+    if any(grams - common for grams in word_grams):
+        word_grams = [grams - common for grams in word_grams if grams - common]
+    grams = set().union(*word_grams)
+
+    # A recipe must share a good part of at least the shortest word
+    shortest = min(len(g) for g in word_grams)
+    min_shared = max(min(2, shortest), math.ceil(shortest * MIN_SIMILARITY))
+
+    rows = (
+        RecipeTrigram.objects
+        .filter(trigram__in=grams)
+        .values('recipe_id')
+        .annotate(shared=Count('id'))
+        .filter(shared__gte=min_shared)
+        .order_by('-shared', '-recipe_id')
+        .values_list('recipe_id', flat=True)[:limit]
+    )
+    return list(rows)
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+def index_saved_recipe(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'title' in update_fields:
+        index_recipe(instance)
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def index_changed_tags(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        index_recipe(instance)
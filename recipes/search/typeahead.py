@@ -0,0 +1,186 @@
+"""
+In-memory prefix index used for search box autocompletion.
+
+Recipe titles, usernames and tag names are kept in sorted arrays so a
+completion is a binary search plus a short scan. Titles are indexed from
+every word, so 'bolog' completes to 'Spaghetti Bolognese'.
+"""
+
+from bisect import bisect_left, bisect_right
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.dispatch import receiver
+from taggit.models import Tag
+from recipes.models import Recipe
+from recipes.search.memory_index import InMemoryIndex
+from recipes.search.query import TAG_PREFIX
+
+USER_PREFIX = '@'
+
+# Stop scanning a prefix range after this many entries per requested
+# completion, so very short prefixes stay cheap when labels repeat.
+SCAN_FACTOR = 20
+
+
+def title_keys(title):
+    """Return a lookup key for the title starting at each of its words."""
+
+    lowered = title.lower()
+    keys = []
+    for position, char in enumerate(lowered):
+        if not char.isspace() and (position == 0 or lowered[position - 1].isspace()):
+            keys.append(lowered[position:])
+    return keys
+
+
+class PrefixIndex:
+    """Parallel sorted arrays of keys, display labels and owning object ids."""
+
+    def __init__(self, entries=()):
+        entries = sorted(entries)
+        self.keys = [key for key, label, owner in entries]
+        self.labels = [label for key, label, owner in entries]
+        self.owners = [owner for key, label, owner in entries]
+        self._owner_keys = {}
+        for key, label, owner in entries:
+            self._owner_keys.setdefault(owner, []).append(key)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, owner, keys, label):
+        for key in keys:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.labels.insert(position, label)
+            self.owners.insert(position, owner)
+        self._owner_keys.setdefault(owner, []).extend(keys)
+
+    def remove(self, owner):
+        for key in self._owner_keys.pop(owner, []):
+            position = bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key:
+                if self.owners[position] == owner:
+                    del self.keys[position], self.labels[position], self.owners[position]
+                    break
+                position += 1
+
+    def replace(self, owner, keys, label):
+        self.remove(owner)
+        self.add(owner, keys, label)
+
+    def complete(self, prefix, limit):
+        """Return up to `limit` distinct labels whose key starts with `prefix`."""
+
+        labels = []
+        position = bisect_left(self.keys, prefix)
+        end = min(len(self.keys), position + limit * SCAN_FACTOR)
+        while position < end and len(labels) < limit and self.keys[position].startswith(prefix):
+            if self.labels[position] not in labels:
+                labels.append(self.labels[position])
+            position += 1
+        return labels
+
+
+class TypeaheadIndex(InMemoryIndex):
+    """Completions for recipe titles, @usernames and #tags."""
+
+    name = 'typeahead'
+
+    def __init__(self):
+        super().__init__()
+        self.titles = PrefixIndex()
+        self.users = PrefixIndex()
+        self.tags = PrefixIndex()
+
+    def build(self):
+        self.titles = PrefixIndex(
+            (key, title, pk)
+            for pk, title in Recipe.objects.values_list('pk', 'title')
+            for key in title_keys(title)
+        )
+        self.users = PrefixIndex(
+            (username.lower(), username, pk)
+            for pk, username in get_user_model().objects.values_list('pk', 'username')
+        )
+        self.tags = PrefixIndex(
+            (name.lower(), name, pk)
+            for pk, name in Tag.objects.values_list('pk', 'name')
+        )
+
+    def suggest(self, text, limit=8):
+        """
+        Complete the search box text.
+
+        The last word picks what is completed: '#veg' completes tags,
+        '@ja' completes usernames and anything else completes recipe titles
+        from the normal (non-tag) words typed so far. Returns a list of
+        dicts with the suggestion type, its label and the full query to run.
+        """
+
+        words = text.split()
+        if not words or text[-1].isspace():
+            return []
+
+        self.ensure_current()
+        head, last = words[:-1], words[-1]
+
+        if last.startswith(TAG_PREFIX):
+            return [
+                {'type': 'tag', 'label': TAG_PREFIX + name, 'query': " ".join(head + [TAG_PREFIX + name])}
+                for name in self.tags.complete(last[1:].lower(), limit)
+            ]
+
+        if last.startswith(USER_PREFIX):
+            return [
+                {'type': 'user', 'label': username, 'query': " ".join(head + [username])}
+                for username in self.users.complete(last.lower(), limit)
+            ]
+
+        tags = [word for word in words if word.startswith(TAG_PREFIX)]
+        terms = [word for word in words if not word.startswith(TAG_PREFIX)]
+        return [
+            {'type': 'recipe', 'label': title, 'query': " ".join(tags + [title])}
+            for title in self.titles.complete(" ".join(terms).lower(), limit)
+        ]
+
+
+typeahead_index = TypeaheadIndex()
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+def update_saved_title(sender, instance, **kwargs):
+    typeahead_index.changed(
+        lambda: typeahead_index.titles.replace(instance.pk, title_keys(instance.title), instance.title)
+    )
+
+
+@receiver(models.signals.post_delete, sender=Recipe)
+def remove_deleted_title(sender, instance, **kwargs):
+    typeahead_index.changed(lambda: typeahead_index.titles.remove(instance.pk))
+
+
+@receiver(models.signals.post_save, sender=get_user_model())
+def update_saved_username(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    typeahead_index.changed(
+        lambda: typeahead_index.users.replace(instance.pk, [instance.username.lower()], instance.username)
+    )
+
+
+@receiver(models.signals.post_delete, sender=get_user_model())
+def remove_deleted_username(sender, instance, **kwargs):
+    typeahead_index.changed(lambda: typeahead_index.users.remove(instance.pk))
+
+
+@receiver(models.signals.post_save, sender=Tag)
+def update_saved_tag(sender, instance, **kwargs):
+    typeahead_index.changed(
+        lambda: typeahead_index.tags.replace(instance.pk, [instance.name.lower()], instance.name)
+    )
+
+
+@receiver(models.signals.post_delete, sender=Tag)
+def remove_deleted_tag(sender, instance, **kwargs):
+    typeahead_index.changed(lambda: typeahead_index.tags.remove(instance.pk))
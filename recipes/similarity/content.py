@@ -0,0 +1,255 @@
+"""
+Content-based recipe similarity from ingredients and tags.
+
+Each recipe becomes a TF-IDF vector over its normalized ingredient names
+and tag names, so rare shared ingredients ('saffron') count for more than
+common ones ('salt'). Rows are L2-normalized, making the sparse product of
+a batch of rows with the whole matrix their cosine similarities; the top-k
+neighbours of every recipe are stored in RecipeContentNeighbour. Unlike
+co-occurrence similarity this needs no reviews, so brand new recipes get
+neighbours as soon as they are scored.
+
+An edit queues an incremental update of the edited recipe: it is scored
+against the recipes sharing one of its tokens (found through the ingredient
+and tag indexes), its own list is replaced, and it is added to, moved in or
+dropped from the lists of those recipes. The IDF weights of every other
+recipe drift slightly with each edit, so edits also queue one full rebuild
+that waits REBUILD_DELAY; edits made while it waits are covered by the
+same rebuild.
+"""
+
+import math
+import time
+from datetime import timedelta
+import numpy as np
+from scipy import sparse
+from django.db import models, transaction
+from django.dispatch import receiver
+from taggit.models import TaggedItem
+from recipes.db_helpers import chunks
+from recipes.models import Job, Recipe, RecipeContentNeighbour, RecipeIngredient
+from recipes.search.ingredient_index import ingredient_index, normalize_ingredient
+from recipes.search.tag_index import tag_index
+from recipes.similarity.cooccurrence import top_neighbours
+
+# Edits to one recipe within this window are scored together
+REFRESH_DELAY = timedelta(seconds=30)
+# Edits within this window after the first are covered by one full rebuild
+REBUILD_DELAY = timedelta(days=1)
+
+
+def load_recipe_tokens(recipe_ids=None):
+    """
+    Map every recipe id to the sorted set of its ingredient and tag tokens.
+
+    Only the given recipes are loaded when recipe_ids is passed.
+    """
+
+    recipes = Recipe.objects.all()
+    ingredients = RecipeIngredient.objects.all()
+    tagged = TaggedItem.objects.filter(content_type__app_label='recipes', content_type__model='recipe')
+    if recipe_ids is not None:
+        recipes = recipes.filter(pk__in=recipe_ids)
+        ingredients = ingredients.filter(recipe_id__in=recipe_ids)
+        tagged = tagged.filter(object_id__in=recipe_ids)
+
+    tokens = {pk: set() for pk in recipes.values_list('pk', flat=True)}
+    for recipe_id, name in ingredients.values_list('recipe_id', 'name'):
+        key = normalize_ingredient(name)
+        if key and recipe_id in tokens:
+            tokens[recipe_id].add(f'ingredient:{key}')
+
+    for recipe_id, name in tagged.values_list('object_id', 'tag__name'):
+        if recipe_id in tokens:
+            tokens[recipe_id].add(f'tag:{name.lower()}')
+
+    return {pk: sorted(names) for pk, names in tokens.items()}
+
+
+def tfidf_matrix(tokens_by_recipe):
+    """
+    Build the L2-normalized TF-IDF matrix (one row per recipe).
+
+    Returns the CSR matrix and the recipe id of each row.
+    """
+
+    recipe_ids = np.array(sorted(tokens_by_recipe), dtype=np.int64)
+    vocabulary = {}
+    rows, cols = [], []
+    for row, recipe_id in enumerate(recipe_ids):
+        for token in tokens_by_recipe[recipe_id]:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(recipe_ids), len(vocabulary))
+    )
+    document_frequency = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + len(recipe_ids)) / (1 + document_frequency)) + 1
+    matrix = matrix @ sparse.diags(idf)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix), recipe_ids
+
+
+def nearest_neighbours(matrix, rows, k, batch_size=500):
+    """
+    Yield (row, neighbour row, score) arrays for the given matrix rows.
+
+    Rows are scored in batches so memory stays proportional to the batch,
+    not to the square of the catalogue.
+    """
+
+    for batch in chunks(rows, batch_size):
+        similarity = (matrix[batch] @ matrix.T).tocoo()
+        keep = (batch[similarity.row] != similarity.col) & (similarity.data > 0)
+        similarity = sparse.coo_matrix(
+            (similarity.data[keep], (similarity.row[keep], similarity.col[keep])), shape=similarity.shape
+        )
+        batch_rows, neighbour_rows, scores = top_neighbours(similarity, k)
+        yield batch[batch_rows], neighbour_rows, scores
+
+
+def update_content_similarity(k=10, batch_size=500):
+    """
+    Score every recipe and replace the stored content neighbours.
+
+    Returns a dict with the number of recipes scored, the neighbours
+    stored and the seconds spent in each stage.
+    """
+
+    timings = {}
+    started = time.perf_counter()
+
+    def stage(name):
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = now - started
+        started = now
+
+    tokens = load_recipe_tokens()
+    stage('load')
+
+    matrix, recipe_ids = tfidf_matrix(tokens)
+    rows = np.arange(len(recipe_ids))
+    stage('vectorize')
+
+    neighbours = [
+        RecipeContentNeighbour(recipe_id=int(recipe_ids[row]), neighbour_id=int(recipe_ids[col]), score=float(score))
+        for batch_rows, neighbour_rows, scores in nearest_neighbours(matrix, rows, k, batch_size)
+        for row, col, score in zip(batch_rows, neighbour_rows, scores)
+    ]
+    stage('score')
+
+    with transaction.atomic():
+        RecipeContentNeighbour.objects.all().delete()
+        RecipeContentNeighbour.objects.bulk_create(neighbours, batch_size=1000)
+    stage('write')
+
+    return {
+        'recipes': len(recipe_ids),
+        'neighbours': len(neighbours),
+        'timings': timings,
+    }
+
+
+def _token_postings(token):
+    kind, key = token.split(':', 1)
+    index = ingredient_index if kind == 'ingredient' else tag_index
+    return index.postings.get(key, ())
+
+
+def _weights(tokens, idf):
+    weights = {token: idf[token] for token in tokens}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1
+    return {token: weight / norm for token, weight in weights.items()}
+
+
+def _cosine(a, b):
+    if len(b) < len(a):
+        a, b = b, a
+    return sum(weight * b[token] for token, weight in a.items() if token in b)
+
+
+def update_recipe_content_similarity(recipe_id, k=10):
+    """
+    Re-score one recipe and update the content neighbours it appears in.
+
+    Only recipes sharing a token with the recipe, or currently listing it,
+    are loaded. IDF weights come from the index postings, so the recipe's
+    scores match what a full build would give it; the scores other recipes
+    have with each other are left to the next full build.
+    """
+
+    ingredient_index.ensure_current()
+    tag_index.ensure_current()
+
+    tokens = load_recipe_tokens([recipe_id])
+    if recipe_id not in tokens:
+        # Deleted: its rows went with it
+        return
+
+    candidates = {pk for token in tokens[recipe_id] for pk in _token_postings(token)}
+    candidates.update(
+        RecipeContentNeighbour.objects.filter(neighbour_id=recipe_id).values_list('recipe_id', flat=True)
+    )
+    candidates.discard(recipe_id)
+    tokens.update(load_recipe_tokens(candidates))
+
+    total = Recipe.objects.count()
+    idf = {
+        token: math.log((1 + total) / (1 + len(_token_postings(token)))) + 1
+        for names in tokens.values() for token in names
+    }
+    vectors = {pk: _weights(names, idf) for pk, names in tokens.items()}
+    scores = {pk: _cosine(vectors[recipe_id], vectors[pk]) for pk in candidates if pk in vectors}
+
+    lists = {pk: {} for pk in scores}
+    for row in RecipeContentNeighbour.objects.filter(recipe_id__in=scores):
+        lists[row.recipe_id][row.neighbour_id] = row.score
+    for pk, score in scores.items():
+        lists[pk].pop(recipe_id, None)
+        if score > 0:
+            lists[pk][recipe_id] = score
+    lists[recipe_id] = {pk: score for pk, score in scores.items() if score > 0}
+
+    neighbours = [
+        RecipeContentNeighbour(recipe_id=pk, neighbour_id=neighbour_id, score=score)
+        for pk, listed in lists.items()
+        for neighbour_id, score in sorted(listed.items(), key=lambda item: (-item[1], item[0]))[:k]
+    ]
+    with transaction.atomic():
+        RecipeContentNeighbour.objects.filter(recipe_id__in=lists).delete()
+        RecipeContentNeighbour.objects.bulk_create(neighbours, batch_size=1000)
+
+
+def refresh_recipe_content(recipe_id):
+    """Job: re-score a recipe after its ingredients or tags changed."""
+
+    update_recipe_content_similarity(recipe_id)
+
+
+def refresh_content_similarity():
+    """Job: rebuild every content neighbour list so IDF drift is corrected."""
+
+    update_content_similarity()
+
+
+def queue_refresh(recipe_id):
+    Job.objects.enqueue(
+        refresh_recipe_content, key=f'content-similarity:{recipe_id}', delay=REFRESH_DELAY, recipe_id=recipe_id,
+    )
+    Job.objects.enqueue(refresh_content_similarity, key='content-similarity', delay=REBUILD_DELAY)
+
+
+@receiver(models.signals.post_save, sender=RecipeIngredient)
+@receiver(models.signals.post_delete, sender=RecipeIngredient)
+def ingredients_changed(sender, instance, **kwargs):
+    queue_refresh(instance.recipe_id)
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def tags_changed(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        queue_refresh(instance.pk)
@@ -0,0 +1,65 @@
+"""
+Exponential time decay of recipe similarity scores.
+
+Scores halve every HALF_LIFE without new co-likes. Rather than tracking an
+age per pair, a periodic job multiplies every score by the decay factor for
+the time since the previous run in a single UPDATE, then deletes pairs
+that have faded below PRUNE_BELOW. Co-likes added between runs are plain
+increments, so recent activity always outweighs old activity and the
+table stays bounded without per-row Python work.
+"""
+
+from datetime import datetime, timedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from recipes.models import Job
+from recipes.models.recipe import RecipeSimilar
+from recipes.similarity.neighbours import neighbours_changed
+
+HALF_LIFE = timedelta(days=30)
+DECAY_INTERVAL = timedelta(days=1)
+
+# Scores are in co-likes (see RecipeSimilar.similarity_score), so a single
+# co-like falls below this after a little over three half-lives
+PRUNE_BELOW = 0.1
+
+
+def decay_factor(elapsed):
+    return 0.5 ** (elapsed / HALF_LIFE)
+
+
+def decay_similarities(elapsed=DECAY_INTERVAL):
+    """
+    Decay every similarity score by `elapsed` worth of time and prune
+    faded pairs. Returns the number of pairs decayed and pruned.
+    """
+
+    with transaction.atomic():
+        decayed = RecipeSimilar.objects.update(similarity_score=F('similarity_score') * decay_factor(elapsed))
+        pruned, _ = RecipeSimilar.objects.filter(similarity_score__lt=PRUNE_BELOW).delete()
+        neighbours_changed()
+    return decayed, pruned
+
+
+def run_decay(last_run=None):
+    """
+    Job: decay scores for the time since `last_run` (an ISO timestamp, or
+    DECAY_INTERVAL ago if not given) and schedule the next run.
+    """
+
+    now = timezone.now()
+    elapsed = now - datetime.fromisoformat(last_run) if last_run else DECAY_INTERVAL
+    decay_similarities(max(elapsed, timedelta()))
+    schedule_decay(last_run=now)
+
+
+def schedule_decay(last_run=None, delay=DECAY_INTERVAL):
+    """Queue the periodic decay job unless it is already waiting."""
+
+    return Job.objects.enqueue(
+        run_decay,
+        key='similarity-decay',
+        delay=delay,
+        last_run=(last_run or timezone.now()).isoformat(),
+    )
@@ -0,0 +1,184 @@
+"""
+Materialized, cached neighbour lists for Recipe.get_similar.
+
+RecipeSimilar stores each pair once (lower id first), so listing a recipe's
+neighbours means looking at both columns, then sorting. That work is done
+once per recipe and stored as a packed RecipeNeighbourList row; a
+process-local LRU of decoded lists sits in front of the table. Whenever
+scores change the affected rows are deleted, the LRU entries are evicted
+(using the same version counter scheme as the search indexes, so other
+processes drop their copies too) and a job is queued to store the rows
+again. Lookups never write: a recipe without a stored row has its list
+worked out from RecipeSimilar and only kept in the LRU.
+Saving a RecipeSimilar row invalidates its two recipes through post_save;
+bulk writes (add_similar, rebuilds, decay) call neighbours_changed()
+themselves. There is deliberately no delete receiver, which would stop
+Django from deleting RecipeSimilar rows in bulk.
+"""
+
+from collections import OrderedDict
+from django.db import models, transaction
+from django.dispatch import receiver
+from recipes.models import Job, Recipe, RecipeNeighbourList
+from recipes.models.recipe import RecipeSimilar
+from recipes.search.memory_index import InMemoryIndex
+
+# Longest list materialized per recipe (get_similar's default limit)
+MAX_NEIGHBOURS = 100
+
+
+def neighbour_lists(recipe_ids=None):
+    """
+    Work out the neighbour lists of the given recipes (all recipes with
+    any similarity if None) without storing them.
+    Returns {recipe id: [(id, score), ...]}.
+    """
+
+    pairs = RecipeSimilar.objects.values_list('recipe_A_id', 'recipe_B_id', 'similarity_score')
+    if recipe_ids is not None:
+        recipe_ids = set(recipe_ids)
+        pairs = pairs.filter(models.Q(recipe_A__in=recipe_ids) | models.Q(recipe_B__in=recipe_ids))
+
+    lists = {pk: [] for pk in recipe_ids or ()}
+    for a, b, score in pairs:
+        if recipe_ids is None or a in recipe_ids:
+            lists.setdefault(a, []).append((b, score))
+        if recipe_ids is None or b in recipe_ids:
+            lists.setdefault(b, []).append((a, score))
+
+    for pk, neighbours in lists.items():
+        neighbours.sort(key=lambda pair: (-pair[1], pair[0]))
+        del neighbours[MAX_NEIGHBOURS:]
+    return lists
+
+
+def materialize(recipe_ids=None):
+    """
+    Build and store the neighbour lists of the given recipes (all recipes
+    with any similarity if None). Returns {recipe id: [(id, score), ...]}.
+    """
+
+    lists = neighbour_lists(recipe_ids)
+    with transaction.atomic():
+        if recipe_ids is None:
+            RecipeNeighbourList.objects.all().delete()
+        else:
+            RecipeNeighbourList.objects.filter(recipe_id__in=list(lists)).delete()
+        RecipeNeighbourList.objects.bulk_create(
+            [RecipeNeighbourList(recipe_id=pk, data=RecipeNeighbourList.pack(neighbours))
+             for pk, neighbours in lists.items()],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    return lists
+
+
+def materialize_missing():
+    """Job: store the lists of recipes that have similarities but no stored list."""
+
+    pairs = RecipeSimilar.objects.values_list('recipe_A_id', 'recipe_B_id')
+    recipe_ids = {pk for pair in pairs for pk in pair}
+    recipe_ids -= set(RecipeNeighbourList.objects.values_list('pk', flat=True))
+    if recipe_ids:
+        materialize(recipe_ids)
+
+
+class NeighbourIndex(InMemoryIndex):
+    """LRU of decoded neighbour lists, keyed by recipe id."""
+
+    name = 'neighbours'
+    size = 1024
+
+    def __init__(self):
+        super().__init__()
+        self.lists = OrderedDict()
+
+    def build(self):
+        self.lists = OrderedDict()
+
+    def neighbours(self, recipe_id):
+        """Return the recipe's [(neighbour id, score), ...] list, best first."""
+
+        self.ensure_current()
+        with self._lock:
+            if recipe_id in self.lists:
+                self.lists.move_to_end(recipe_id)
+                return self.lists[recipe_id]
+
+        data = RecipeNeighbourList.objects.filter(pk=recipe_id).values_list('data', flat=True).first()
+        if data is None:
+            neighbours = neighbour_lists([recipe_id])[recipe_id]
+        else:
+            neighbours = RecipeNeighbourList.unpack(data)
+
+        with self._lock:
+            self.lists[recipe_id] = neighbours
+            if len(self.lists) > self.size:
+                self.lists.popitem(last=False)
+        return neighbours
+
+    def neighbours_many(self, recipe_ids):
+        """
+        Return {recipe id: neighbour list} for several recipes at once.
+
+        Cached lists cost nothing; the rest are read in one query, and any
+        that are not stored are worked out together.
+        """
+
+        self.ensure_current()
+        with self._lock:
+            found = {pk: self.lists[pk] for pk in recipe_ids if pk in self.lists}
+
+        missing = [pk for pk in recipe_ids if pk not in found]
+        if missing:
+            stored = RecipeNeighbourList.objects.filter(pk__in=missing).values_list('pk', 'data')
+            loaded = {pk: RecipeNeighbourList.unpack(data) for pk, data in stored}
+            unbuilt = [pk for pk in missing if pk not in loaded]
+            if unbuilt:
+                loaded.update(neighbour_lists(unbuilt))
+
+            with self._lock:
+                for pk, neighbours in loaded.items():
+                    self.lists[pk] = neighbours
+                while len(self.lists) > self.size:
+                    self.lists.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def evict(self, recipe_ids):
+        for pk in recipe_ids:
+            self.lists.pop(pk, None)
+
+
+neighbour_index = NeighbourIndex()
+
+
+def neighbours_changed(recipe_ids=None):
+    """
+    Record that the similarity scores of the given recipes (all recipes
+    if None) changed, dropping their stored and cached lists and queueing
+    a job to store them again.
+    """
+
+    Job.objects.enqueue(materialize_missing, key='neighbour-lists')
+
+    if recipe_ids is None:
+        RecipeNeighbourList.objects.all().delete()
+        neighbour_index.changed()
+    else:
+        recipe_ids = set(recipe_ids)
+        RecipeNeighbourList.objects.filter(recipe_id__in=recipe_ids).delete()
+        neighbour_index.changed(lambda: neighbour_index.evict(recipe_ids))
+
+
+@receiver(models.signals.pre_delete, sender=Recipe)
+def remove_deleted_recipe(sender, instance, **kwargs):
+    # Its pairs are deleted by the cascade, changing its neighbours' lists
+    pairs = RecipeSimilar.objects.filter(models.Q(recipe_A=instance) | models.Q(recipe_B=instance))
+    affected = {pk for pair in pairs.values_list('recipe_A_id', 'recipe_B_id') for pk in pair}
+    neighbours_changed(affected | {instance.pk})
+
+
+@receiver(models.signals.post_save, sender=RecipeSimilar)
+def similarity_saved(sender, instance, **kwargs):
+    neighbours_changed([instance.recipe_A_id, instance.recipe_B_id])
@@ -0,0 +1,59 @@
+"""
+Batched "you might also like" recommendations.
+
+A handful of seed recipes the user liked or saved is expanded through
+their materialized neighbour lists in one go: each seed contributes its
+top neighbours, scores of candidates reached from several seeds are added
+up, and the seeds themselves are left out. Seeds are sampled in Python from
+the user's most recent saves and likes, avoiding ORDER BY RANDOM() over
+everything they ever saved.
+"""
+
+import random
+from collections import defaultdict
+from recipes.models import Recipe
+from recipes.similarity.neighbours import neighbour_index
+
+LIKE_RATING = 4
+
+
+def seed_recipe_ids(user, count=10, recent=30, rng=random):
+    """
+    Pick up to `count` saved and `count` liked recipe ids for a user,
+    sampled from their `recent` most recent saves and likes. Pass a seeded
+    `rng` (a random.Random) for a repeatable sample.
+    """
+
+    saved = list(
+        Recipe.saved_by.through.objects
+        .filter(user=user)
+        .order_by('-pk')
+        .values_list('recipe_id', flat=True)[:recent]
+    )
+    liked = list(
+        user.recipe_reviews
+        .filter(rating__gte=LIKE_RATING)
+        .order_by('-created_at')
+        .values_list('recipe_id', flat=True)[:recent]
+    )
+    seeds = rng.sample(saved, min(count, len(saved))) + rng.sample(liked, min(count, len(liked)))
+    return list(dict.fromkeys(seeds))
+
+
+def recommend(seed_ids, per_seed=10, limit=None):
+    """
+    Rank recipes similar to the seeds.
+
+    Returns [(recipe id, aggregated score), ...], best first, without the
+    seeds and with each candidate listed once.
+    """
+
+    seeds = set(seed_ids)
+    scores = defaultdict(float)
+    for neighbours in neighbour_index.neighbours_many(list(seeds)).values():
+        for pk, score in neighbours[:per_seed]:
+            if pk not in seeds:
+                scores[pk] += score
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit] if limit is not None else ranked
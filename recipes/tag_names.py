@@ -0,0 +1,94 @@
+"""
+Tag names for recipe listings.
+
+Cards list each recipe's tags, and `recipe.tags.all` costs a query through
+taggit's generic relation per card. attach_tag_names() sets a tuple of tag
+names on every recipe of a page instead: names are read from the cache,
+one key per recipe, and the recipes that missed are loaded with a single
+TaggedItem query and cached. Entries are deleted when a recipe's tags are
+changed or a tag it uses is renamed or deleted, and when a recipe is
+created or deleted.
+"""
+
+from django.core.cache import cache
+from django.db import models
+from django.dispatch import receiver
+from taggit.models import Tag, TaggedItem
+from recipes.db_helpers import now_and_on_commit
+from recipes.models import Recipe
+
+CACHE_PREFIX = 'recipe-tags'
+CACHE_TIMEOUT = 60 * 60
+
+
+def _key(recipe_id):
+    return f'{CACHE_PREFIX}:{recipe_id}'
+
+
+def tag_names(recipe_ids):
+    """Map each recipe id to the tuple of its tag names, in the order they were added."""
+
+    keys = {_key(pk): pk for pk in recipe_ids}
+    names = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+    missing = [pk for pk in keys.values() if pk not in names]
+    if missing:
+        loaded = {pk: [] for pk in missing}
+        tagged = (
+            TaggedItem.objects
+            .filter(content_type__app_label='recipes', content_type__model='recipe', object_id__in=missing)
+            .order_by('pk')
+            .values_list('object_id', 'tag__name')
+        )
+        for recipe_id, name in tagged:
+            loaded[recipe_id].append(name)
+        loaded = {pk: tuple(values) for pk, values in loaded.items()}
+        cache.set_many({_key(pk): value for pk, value in loaded.items()}, CACHE_TIMEOUT)
+        names.update(loaded)
+
+    return names
+
+
+def attach_tag_names(recipes):
+    """Set `tag_names` on each recipe with at most one query; returns them as a list."""
+
+    recipes = list(recipes)
+    names = tag_names({recipe.pk for recipe in recipes})
+    for recipe in recipes:
+        recipe.tag_names = names[recipe.pk]
+    return recipes
+
+
+def forget_tag_names(recipe_ids):
+    """Drop the cached names of recipes, see now_and_on_commit."""
+
+    keys = [_key(pk) for pk in recipe_ids]
+    if keys:
+        now_and_on_commit(lambda: cache.delete_many(keys))
+
+
+@receiver(models.signals.m2m_changed, sender=TaggedItem)
+def recipe_tags_changed(sender, instance, action, **kwargs):
+    if isinstance(instance, Recipe) and action in ('post_add', 'post_remove', 'post_clear'):
+        forget_tag_names([instance.pk])
+
+
+@receiver(models.signals.post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    # A rolled back recipe's id can be handed out again
+    if created:
+        forget_tag_names([instance.pk])
+
+
+@receiver(models.signals.post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    forget_tag_names([instance.pk])
+
+
+@receiver(models.signals.post_save, sender=Tag)
+@receiver(models.signals.pre_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    tagged = TaggedItem.objects.filter(
+        tag=instance, content_type__app_label='recipes', content_type__model='recipe'
+    )
+    forget_tag_names(list(tagged.values_list('object_id', flat=True)))
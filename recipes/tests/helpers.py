@@ -1,5 +1,10 @@
-from django.urls import reverse
+import tempfile
+from urllib.parse import urlsplit
+from django.test import override_settings
+from django.urls import resolve, reverse
 from with_asserts.mixin import AssertHTMLMixin
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.query_budget import QueryRecorder, view_query_budget
 
 def reverse_with_next(url_name, next_url):
     """Extended version of reverse to generate URLs with redirects"""
@@ -8,6 +13,28 @@ def reverse_with_next(url_name, next_url):
     return url
 
 
+def create_user(username, password=None, **fields):
+    """Create a user whose email is derived from the username ('@cook' -> cook@example.com)."""
+    user = User(username=username, email=f"{username.lstrip('@')}@example.com", **fields)
+    if password:
+        user.set_password(password)
+    user.save()
+    return user
+
+
+def create_recipe(author, title, ingredients=(), tags=(), **fields):
+    """Create a recipe with the named ingredients and tags, reloaded so signal-set fields are current."""
+    recipe = Recipe.objects.create(
+        author=author, title=title, **{'description': "desc", 'prep_time': 5, 'servings': 1, **fields}
+    )
+    for name in ingredients:
+        RecipeIngredient.objects.create(recipe=recipe, name=name, amount=1, unit='g')
+    if tags:
+        recipe.tags.add(*tags)
+    recipe.refresh_from_db()
+    return recipe
+
+
 class LogInTester:
     """Class support login in tests."""
  
@@ -34,4 +61,27 @@ class MenuTesterMixin(AssertHTMLMixin):
         """Check that no menu is present."""
         
         for url in self.menu_urls:
-            self.assertNotHTML(response, f'a[href="{url}"]')
\ No newline at end of file
+            self.assertNotHTML(response, f'a[href="{url}"]')
+
+class TemporaryMediaMixin:
+    """Class to keep files uploaded by tests out of the real MEDIA_ROOT."""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media_root.cleanup)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root.name))
+        super().setUpClass()
+
+class QueryBudgetTesterMixin:
+    """Class to extend tests with checks of views' declared query budgets."""
+
+    def assert_within_query_budget(self, url):
+        """GET a url and check it stays within its view's declared query budget."""
+
+        budget = view_query_budget(resolve(urlsplit(url).path).func)
+        self.assertIsNotNone(budget, f"{url} has no query budget")
+        with override_settings(QUERY_BUDGET_ENFORCE=False), QueryRecorder() as recorder:
+            response = self.client.get(url)
+        self.assertLessEqual(len(recorder), budget, f"{url}: {recorder.report(budget)}")
+        return response
@@ -0,0 +1,158 @@
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from recipes.dietary import (
+    GLUTEN_FREE, HALAL, UNCLASSIFIED, VEGAN, VEGETARIAN, classify, classify_recipes, dietary_filter, masks_with,
+)
+from recipes.feed_ranking import rank_feed
+from recipes.models import Recipe, RecipeIngredient
+from recipes.search import SearchQuery
+from recipes.search.facets import apply_facets
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class ClassifyTestCase(TestCase):
+    """Tests for deriving dietary flags from ingredient names and tags."""
+
+    def test_plant_based_recipe_suits_every_diet(self):
+        self.assertEqual(classify(["Tomatoes", "olive oil", "Eggplant"]), VEGETARIAN | VEGAN | HALAL | GLUTEN_FREE)
+
+    def test_animal_products(self):
+        self.assertEqual(classify(["eggs", "rice"]), VEGETARIAN | HALAL | GLUTEN_FREE)
+        self.assertEqual(classify(["chicken thighs", "rice"]), GLUTEN_FREE)
+        self.assertEqual(classify(["salmon fillet"]), HALAL | GLUTEN_FREE)
+        self.assertEqual(classify(["bacon", "lettuce"]), GLUTEN_FREE)
+
+    def test_plant_words_cancel_animal_and_gluten_words(self):
+        self.assertTrue(classify(["peanut butter", "almond milk"]) & VEGAN)
+        self.assertTrue(classify(["rice flour"]) & GLUTEN_FREE)
+        self.assertFalse(classify(["plain flour"]) & GLUTEN_FREE)
+        self.assertTrue(classify(["butter beans", "butter lettuce"]) & VEGAN)
+
+    def test_free_qualifiers(self):
+        self.assertTrue(classify(["gluten free flour", "gluten-free pasta"]) & GLUTEN_FREE)
+        self.assertTrue(classify(["dairy free cheese", "egg free mayonnaise"]) & VEGAN)
+        self.assertFalse(classify(["fat free milk"]) & VEGAN)
+
+    def test_words_ending_in_s_are_not_all_plurals(self):
+        self.assertFalse(classify(["couscous"]) & GLUTEN_FREE)
+        self.assertEqual(classify(["hummus", "asparagus"]), VEGETARIAN | VEGAN | HALAL | GLUTEN_FREE)
+        self.assertFalse(classify(["breadcrumbs"]) & GLUTEN_FREE)
+
+    def test_plurals(self):
+        self.assertEqual(classify(["anchovies"]), HALAL | GLUTEN_FREE)
+        self.assertEqual(classify(["sardines", "tomatoes"]), HALAL | GLUTEN_FREE)
+        self.assertFalse(classify(["pastries"]) & GLUTEN_FREE)
+        self.assertFalse(classify(["sausages"]) & VEGETARIAN)
+        self.assertEqual(classify(["cherries", "peaches"]), VEGETARIAN | VEGAN | HALAL | GLUTEN_FREE)
+
+    def test_alcohol_is_not_halal(self):
+        self.assertFalse(classify(["red wine", "mushrooms"]) & HALAL)
+
+    def test_halal_meat(self):
+        self.assertFalse(classify(["beef mince"]) & HALAL)
+        self.assertTrue(classify(["halal beef mince", "onion"]) & HALAL)
+        self.assertFalse(classify(["halal chicken", "bacon"]) & HALAL)
+
+    def test_tags_set_flags(self):
+        self.assertEqual(classify(["rice"], ["Gluten-Free"]) & GLUTEN_FREE, GLUTEN_FREE)
+        self.assertEqual(classify(["lamb shoulder"], ["halal"]), HALAL | GLUTEN_FREE)
+
+    def test_recipes_without_ingredients_are_unclassified(self):
+        self.assertEqual(classify([], []), UNCLASSIFIED)
+        self.assertEqual(classify([], ["vegetarian"]), VEGETARIAN | UNCLASSIFIED)
+
+    def test_masks_with_flag(self):
+        masks = masks_with(VEGAN)
+        self.assertEqual(len(masks), 24)
+        self.assertTrue(all(mask & (VEGAN | UNCLASSIFIED) for mask in masks))
+        self.assertIn(UNCLASSIFIED, masks)
+        self.assertEqual(dietary_filter('none'), dietary_filter(None))
+
+
+class DietaryFlagsTestCase(TestCase):
+    """Tests for storing flags and filtering listings by the viewer's diet."""
+
+    def setUp(self):
+        self.vegan = create_user('@vegan', password='Password123', dietary_style='vegan')
+        self.salad = create_recipe(self.vegan, "Salad", ["lettuce", "tomato"])
+        self.omelette = create_recipe(self.vegan, "Omelette", ["eggs", "butter"])
+
+    def test_flags_follow_ingredient_and_tag_changes(self):
+        self.assertTrue(self.salad.dietary_flags & VEGAN)
+        cheese = RecipeIngredient.objects.create(recipe=self.salad, name="feta", amount=1)
+        self.salad.refresh_from_db()
+        self.assertFalse(self.salad.dietary_flags & VEGAN)
+
+        cheese.delete()
+        self.salad.tags.add("halal")
+        self.salad.refresh_from_db()
+        self.assertTrue(self.salad.dietary_flags & VEGAN)
+
+        recipe = create_recipe(self.vegan, "Plain")
+        recipe.tags.add("vegetarian")
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.dietary_flags, VEGETARIAN | UNCLASSIFIED)
+
+    def test_classify_recipes_fixes_stale_flags(self):
+        Recipe.objects.update(dietary_flags=0)
+        self.assertEqual(classify_recipes(batch_size=1), 2)
+        self.assertEqual(classify_recipes(), 0)
+        self.assertEqual(list(Recipe.objects.filter(dietary_filter('vegan'))), [self.salad])
+
+    def test_unclassified_recipes_are_never_filtered_out(self):
+        draft = create_recipe(self.vegan, "Draft")
+        self.assertEqual(set(Recipe.objects.filter(dietary_filter('vegan'))), {self.salad, draft})
+
+    def test_explore_offers_viewer_diet_as_a_toggle(self):
+        self.client.login(username='@vegan', password='Password123')
+        response = self.client.get(reverse('explore'))
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertContains(response, 'Show only vegan recipes')
+
+        response = self.client.get(reverse('explore'), {'diet': 'vegan'})
+        self.assertEqual(list(response.context['page_obj']), [self.salad])
+        self.assertContains(response, 'Showing vegan recipes')
+        self.assertNotContains(response, 'Show only vegan recipes')
+
+    def test_anonymous_explore_is_unfiltered(self):
+        response = self.client.get(reverse('explore'))
+        self.assertEqual(len(response.context['page_obj']), 2)
+        response = self.client.get(reverse('explore'), {'diet': 'vegan'})
+        self.assertEqual(list(response.context['page_obj']), [self.salad])
+
+    def test_search_diet_facet(self):
+        ids = [self.salad.pk, self.omelette.pk]
+        filtered, facets = apply_facets(SearchQuery("dish"), ids, QueryDict(), diet='vegan')
+        self.assertEqual(filtered, [self.salad.pk])
+
+        diet_facet = facets[-1]
+        self.assertEqual(diet_facet['name'], 'diet')
+        vegan = next(option for option in diet_facet['options'] if option['value'] == 'vegan')
+        self.assertTrue(vegan['selected'])
+        self.assertNotIn('diet', QueryDict(vegan['query_string']))
+
+        filtered, facets = apply_facets(SearchQuery("dish"), ids, QueryDict())
+        counts = {option['value']: option['count'] for option in facets[-1]['options']}
+        self.assertEqual(counts, {'vegetarian': 2, 'vegan': 1, 'halal': 2, 'gluten_free': 2})
+
+    def test_feed_offers_viewer_diet_as_a_toggle(self):
+        chef = create_user('@chef')
+        self.vegan.follow(chef)
+        self.salad.author = chef
+        self.salad.save()
+        self.omelette.author = chef
+        self.omelette.save()
+        self.vegan.unfollow(chef)
+        self.vegan.follow(chef)
+        self.assertEqual({item.obj for item in rank_feed(self.vegan, 10).items}, {self.salad, self.omelette})
+        self.assertEqual([item.obj for item in rank_feed(self.vegan, 10, diet='vegan').items], [self.salad])
+
+        self.client.login(username='@vegan', password='Password123')
+        response = self.client.get(reverse('display_user_feed'))
+        self.assertEqual(len(response.context['feed_data']), 2)
+        self.assertContains(response, 'Show only vegan recipes')
+
+        response = self.client.get(reverse('display_user_feed'), {'diet': 'vegan'})
+        self.assertEqual(response.context['feed_data'], [self.salad])
+        self.assertContains(response, 'Showing vegan posts and recommendations')
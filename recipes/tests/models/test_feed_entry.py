@@ -0,0 +1,79 @@
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from recipes import feed
+from recipes.feed import rebuild_feed
+from recipes.models import FeedEntry, Job
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class FeedEntryTestCase(TestCase):
+    """Tests for the fan-out-on-write feed inboxes."""
+
+    def setUp(self):
+        self.reader = create_user('@reader', password='Password123')
+        self.chef = create_user('@chef')
+        self.baker = create_user('@baker')
+
+    def _inbox(self, user):
+        entries = FeedEntry.objects.filter(user=user).select_related('recipe').order_by('-created_at', '-recipe_id')
+        return [entry.recipe for entry in entries]
+
+    def test_new_recipe_is_fanned_out_by_a_job(self):
+        self.reader.follow(self.chef)
+        soup = create_recipe(self.chef, "Soup")
+        self.assertEqual(self._inbox(self.reader), [])
+
+        Job.objects.run_pending()
+        self.assertEqual(self._inbox(self.reader), [soup])
+        self.assertEqual(self._inbox(self.chef), [])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        soup = create_recipe(self.chef, "Soup")
+        stew = create_recipe(self.chef, "Stew")
+        bread = create_recipe(self.baker, "Bread")
+
+        self.reader.follow(self.chef)
+        self.baker.following.add(self.chef)
+        self.reader.follow(self.baker)
+        self.assertEqual(self._inbox(self.reader), [bread, stew, soup])
+        self.assertEqual(self._inbox(self.baker), [stew, soup])
+
+        self.reader.unfollow(self.chef)
+        self.assertEqual(self._inbox(self.reader), [bread])
+
+    def test_clearing_follows_empties_inboxes(self):
+        create_recipe(self.chef, "Soup")
+        self.reader.follow(self.chef)
+        self.baker.follow(self.chef)
+        self.chef.followers.clear()
+        self.assertFalse(FeedEntry.objects.exists())
+
+    def test_inboxes_are_trimmed(self):
+        with mock.patch.object(feed, 'FEED_LENGTH', 2):
+            self.reader.follow(self.chef)
+            recipes = [create_recipe(self.chef, f"Dish {n}") for n in range(3)]
+            Job.objects.run_pending()
+            self.assertEqual(self._inbox(self.reader), [recipes[2], recipes[1]])
+            self.assertEqual(FeedEntry.objects.filter(user=self.reader).count(), 2)
+
+    def test_deleted_recipe_leaves_feed(self):
+        self.reader.follow(self.chef)
+        soup = create_recipe(self.chef, "Soup")
+        Job.objects.run_pending()
+        soup.delete()
+        self.assertEqual(self._inbox(self.reader), [])
+
+    def test_rebuild_feed(self):
+        soup = create_recipe(self.chef, "Soup")
+        self.reader.follow(self.chef)
+        FeedEntry.objects.all().delete()
+        rebuild_feed(self.reader)
+        self.assertEqual(self._inbox(self.reader), [soup])
+
+    def test_feed_page_reads_inbox(self):
+        soup = create_recipe(self.chef, "Soup")
+        self.reader.follow(self.chef)
+        self.client.login(username='@reader', password='Password123')
+        response = self.client.get(reverse('display_user_feed'))
+        self.assertEqual(response.context['feed_data'], [soup])
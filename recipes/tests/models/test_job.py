@@ -0,0 +1,98 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from recipes.models import Job
+from recipes.similarity.decay import DECAY_INTERVAL, schedule_decay
+
+calls = []
+
+
+def record_call(value):
+    calls.append(value)
+
+
+def fail_always(value):
+    raise ValueError(f"bad value {value}")
+
+
+class JobModelTest(TestCase):
+    """Tests for the background job queue."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        job = Job.objects.enqueue(record_call, value=3)
+        self.assertEqual(job.task, 'recipes.tests.models.test_job.record_call')
+        self.assertEqual(Job.objects.run_pending(), 1)
+        self.assertEqual(calls, [3])
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_by_dotted_path(self):
+        Job.objects.enqueue('recipes.tests.models.test_job.record_call', value='a')
+        Job.objects.run_pending()
+        self.assertEqual(calls, ['a'])
+
+    @override_settings(JOBS_RUN_INLINE=True)
+    def test_inline_jobs_run_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.enqueue(record_call, key='inline', value=4)
+            Job.objects.enqueue(record_call, key='later', delay=timedelta(minutes=5), value=5)
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [4])
+        self.assertEqual(list(Job.objects.values_list('key', flat=True)), ['later'])
+
+    @override_settings(JOBS_RUN_INLINE=True)
+    def test_inline_job_that_queues_its_next_run_runs_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_decay(delay=timedelta())
+        job = Job.objects.get()
+        self.assertEqual(job.key, 'similarity-decay')
+        self.assertGreater(job.run_at, timezone.now() + DECAY_INTERVAL - timedelta(minutes=1))
+
+    def test_same_key_is_queued_once(self):
+        first = Job.objects.enqueue(record_call, key='only-once', value=1)
+        second = Job.objects.enqueue(record_call, key='only-once', value=2)
+        self.assertEqual(first.pk, second.pk)
+        Job.objects.run_pending()
+        self.assertEqual(calls, [1])
+
+    def test_key_can_be_reused_after_the_job_ran(self):
+        Job.objects.enqueue(record_call, key='again', value=1)
+        Job.objects.run_pending()
+        Job.objects.enqueue(record_call, key='again', value=2)
+        Job.objects.run_pending()
+        self.assertEqual(calls, [1, 2])
+
+    def test_delayed_job_waits(self):
+        Job.objects.enqueue(record_call, delay=timedelta(minutes=5), value=1)
+        self.assertEqual(Job.objects.run_pending(), 0)
+        self.assertEqual(calls, [])
+
+    def test_failed_job_is_retried_with_backoff(self):
+        Job.objects.enqueue(fail_always, value=1)
+        with self.assertLogs('recipes.models.job', 'ERROR'):
+            self.assertEqual(Job.objects.run_pending(), 1)
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('bad value 1', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + Job.RETRY_DELAY - timedelta(seconds=5))
+        self.assertEqual(Job.objects.run_pending(), 0)
+
+    def test_job_fails_after_max_attempts(self):
+        Job.objects.enqueue(fail_always, max_attempts=2, value=1)
+        with self.assertLogs('recipes.models.job', 'ERROR'):
+            Job.objects.run_pending()
+            Job.objects.update(run_at=timezone.now())
+            Job.objects.run_pending()
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = Job.objects.enqueue(record_call, value=1)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, locked_at=timezone.now() - Job.LOCK_TIMEOUT - timedelta(seconds=1)
+        )
+        self.assertEqual(Job.objects.run_pending(), 1)
+        self.assertEqual(calls, [1])
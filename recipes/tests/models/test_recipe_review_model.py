@@ -1,6 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 from recipes.models import Recipe, RecipeReview, User
+from recipes.models.recipe_review import recalculate_ratings
 
 class RecipeReviewModelTest(TestCase):
 
@@ -50,4 +51,54 @@ class RecipeReviewModelTest(TestCase):
         )
 
         expected = f"{self.recipe.title} - 5 stars"
-        self.assertEqual(str(review), expected)
\ No newline at end of file
+        self.assertEqual(str(review), expected)
+
+class RecipeRatingTotalsTest(TestCase):
+    """Tests for the rating totals stored on Recipe."""
+
+    fixtures = [
+            'recipes/tests/fixtures/default_user.json',
+            'recipes/tests/fixtures/other_users.json',
+            'recipes/tests/fixtures/default_recipe.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.other_user = User.objects.get(username='@janedoe')
+        self.recipe = Recipe.objects.get(pk=1)
+
+    def _totals(self):
+        self.recipe.refresh_from_db()
+        return self.recipe.rating_sum, self.recipe.rating_count
+
+    def test_no_reviews(self):
+        self.assertEqual(self._totals(), (0, 0))
+        self.assertIsNone(self.recipe.avg_rating)
+
+    def test_created_reviews_are_added(self):
+        RecipeReview.objects.create(recipe=self.recipe, user=self.user, rating=5)
+        RecipeReview.objects.create(recipe=self.recipe, user=self.other_user, rating=2)
+        self.assertEqual(self._totals(), (7, 2))
+        self.assertEqual(self.recipe.avg_rating, 3.5)
+
+    def test_update_or_create_changes_rating(self):
+        RecipeReview.objects.create(recipe=self.recipe, user=self.user, rating=5)
+        RecipeReview.objects.update_or_create(recipe=self.recipe, user=self.user, defaults={'rating': 1})
+        self.assertEqual(self._totals(), (1, 1))
+
+    def test_saving_an_unloaded_review_recalculates(self):
+        review = RecipeReview.objects.create(recipe=self.recipe, user=self.user, rating=5)
+        RecipeReview(pk=review.pk, recipe=self.recipe, user=self.user, rating=3, created_at=review.created_at).save()
+        self.assertEqual(self._totals(), (3, 1))
+
+    def test_deleted_review_is_removed(self):
+        review = RecipeReview.objects.create(recipe=self.recipe, user=self.user, rating=5)
+        RecipeReview.objects.create(recipe=self.recipe, user=self.other_user, rating=2)
+        review.delete()
+        self.assertEqual(self._totals(), (2, 1))
+
+    def test_recalculate_ratings(self):
+        RecipeReview.objects.create(recipe=self.recipe, user=self.user, rating=4)
+        Recipe.objects.update(rating_sum=0, rating_count=0)
+        recalculate_ratings()
+        self.assertEqual(self._totals(), (4, 1))
@@ -1,5 +1,8 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from recipes.models import *
+from recipes.models import Job
 from recipes.models.recipe import RecipeSimilar
 
 class RecipeSimilarModelTests(TestCase):
@@ -18,6 +21,8 @@ class RecipeSimilarModelTests(TestCase):
         self.salad = Recipe.objects.get(title= "Chicken Salad")
         self.cakes = Recipe.objects.get(title= "Fairy Cakes")
         self.cereal = Recipe.objects.get(title= "Cereal")
+        # Similarities from the fixture reviews are computed by queued jobs
+        Job.objects.run_pending()
 
     def test_positive_review_creates_normalised_similarity(self):
         RecipeSimilar.objects.get(
@@ -39,6 +44,7 @@ class RecipeSimilarModelTests(TestCase):
             user = self.userJane,
             rating = "4"
         )
+        Job.objects.run_pending()
         after = RecipeSimilar.objects.count()
         self.assertEqual(before, after)
 
@@ -71,6 +77,35 @@ class RecipeSimilarModelTests(TestCase):
             list(self.cereal.get_similar()), [self.rice, self.salad])
 
 
+    def test_add_similar_is_one_statement(self):
+        # Signals also queue the neighbour list job and drop stale lists;
+        # only statements on the RecipeSimilar table are counted here
+        table = RecipeSimilar._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            self.cakes.add_similar([self.rice, self.salad, self.cereal])
+        statements = [query['sql'] for query in queries if table in query['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('INSERT'))
+        self.assertEqual(
+            RecipeSimilar.objects.get(recipe_A=self.rice, recipe_B=self.salad).similarity_score, 1)
+        self.assertEqual(
+            RecipeSimilar.objects.get(recipe_A=self.rice, recipe_B=self.cakes).similarity_score, 1)
+
+    def test_add_similar_increments_existing_pairs(self):
+        self.salad.add_similar([self.rice, self.rice])
+        self.assertEqual(
+            RecipeSimilar.objects.get(recipe_A=self.rice, recipe_B=self.salad).similarity_score, 3)
+
+    def test_review_queues_similarity_job(self):
+        before = RecipeSimilar.objects.count()
+        RecipeReview.objects.create(recipe=self.cakes, user=self.userPetra, rating=5)
+        self.assertEqual(RecipeSimilar.objects.count(), before)
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+
+        Job.objects.run_pending()
+        self.assertTrue(RecipeSimilar.objects.filter(recipe_A=self.cakes, recipe_B=self.cereal).exists())
+        self.assertFalse(Job.objects.exists())
+
     def simulate_activity(self):
         RecipeReview.objects.create(
             recipe = self.salad,
@@ -96,4 +131,5 @@ class RecipeSimilarModelTests(TestCase):
             recipe = self.salad,
             user = self.userPetra,
             rating = "5"
-        )
\ No newline at end of file
+        )
+        Job.objects.run_pending()
\ No newline at end of file
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from taggit.models import Tag
+from recipes.models import Recipe
+from recipes.tag_names import attach_tag_names, tag_names
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class TagNamesTestCase(TestCase):
+    """Tests for the cached tag names shown on recipe cards."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('@tagger')
+        self.soup = create_recipe(self.user, "Soup", tags=["winter", "easy"])
+        self.salad = create_recipe(self.user, "Salad")
+
+    def test_names_for_a_page_take_one_query_then_none(self):
+        with self.assertNumQueries(1):
+            names = tag_names([self.soup.pk, self.salad.pk])
+        self.assertEqual(set(names[self.soup.pk]), {"winter", "easy"})
+        self.assertEqual(names[self.salad.pk], ())
+
+        with self.assertNumQueries(0):
+            soup, salad = attach_tag_names([self.soup, self.salad])
+        self.assertEqual(set(soup.tag_names), {"winter", "easy"})
+
+    def test_changing_tags_invalidates(self):
+        tag_names([self.soup.pk])
+        self.soup.tags.set(["summer"])
+        self.assertEqual(tag_names([self.soup.pk])[self.soup.pk], ("summer",))
+        self.soup.tags.clear()
+        self.assertEqual(tag_names([self.soup.pk])[self.soup.pk], ())
+
+    def test_renaming_or_deleting_a_tag_invalidates(self):
+        tag_names([self.soup.pk])
+        tag = Tag.objects.get(name="winter")
+        tag.name = "cold"
+        tag.save()
+        self.assertEqual(set(tag_names([self.soup.pk])[self.soup.pk]), {"cold", "easy"})
+
+        tag.delete()
+        self.assertEqual(tag_names([self.soup.pk])[self.soup.pk], ("easy",))
+
+    def test_attach_tag_names(self):
+        (recipe,) = attach_tag_names(Recipe.objects.filter(pk=self.soup.pk))
+        self.assertEqual(set(recipe.tag_names), {"winter", "easy"})
+
+    def test_explore_cost_does_not_grow_with_cards(self):
+        # Logged in, so pages are rendered rather than served from the page cache
+        self.user.set_password('Password123')
+        self.user.save()
+        self.client.login(username='@tagger', password='Password123')
+        self.client.get(reverse('explore'))
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('explore'))
+        for n in range(10):
+            create_recipe(self.user, f"Dish {n}", tags=[f"tag{n}", "easy"])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse('explore'))
+        self.assertEqual(len(many), len(few) + 1)
+        self.assertContains(response, '#tag9')
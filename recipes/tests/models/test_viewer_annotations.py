@@ -0,0 +1,64 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipes.models import Recipe
+from recipes.models.recipe import annotate_viewer
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class ViewerAnnotationsTestCase(TestCase):
+    """Tests for marking recipes with the viewer's saves and follows."""
+
+    def setUp(self):
+        self.viewer = create_user('@viewer', password='Password123')
+        self.chef = create_user('@chef')
+        self.baker = create_user('@baker')
+        self.soup = create_recipe(self.chef, "Soup")
+        self.bread = create_recipe(self.baker, "Bread")
+        self.viewer.saved_recipes.add(self.soup)
+        self.viewer.follow(self.baker)
+
+    def test_annotate_viewer(self):
+        recipes = list(Recipe.objects.order_by('-title'))
+        with self.assertNumQueries(2):
+            soup, bread = annotate_viewer(recipes, self.viewer)
+        self.assertTrue(soup.is_saved_by_viewer)
+        self.assertFalse(soup.author_followed_by_viewer)
+        self.assertFalse(bread.is_saved_by_viewer)
+        self.assertTrue(bread.author_followed_by_viewer)
+
+    def test_anonymous_viewer_needs_no_queries(self):
+        with self.assertNumQueries(0):
+            (recipe,) = annotate_viewer([self.soup], AnonymousUser())
+        self.assertFalse(recipe.is_saved_by_viewer)
+
+    def test_queryset_annotates_after_chaining(self):
+        recipes = Recipe.objects.for_viewer(self.viewer).order_by('-title')[:1]
+        self.assertTrue(recipes[0].is_saved_by_viewer)
+        self.assertTrue(self.viewer.saved_recipes.for_viewer(self.viewer).get().is_saved_by_viewer)
+        with self.assertNumQueries(1):
+            soup, bread = Recipe.objects.for_viewer(self.viewer).order_by('-title').iterator()
+        self.assertTrue(soup.is_saved_by_viewer)
+        self.assertTrue(bread.author_followed_by_viewer)
+        self.assertFalse(Recipe.objects.for_viewer(AnonymousUser()).in_bulk()[self.soup.pk].is_saved_by_viewer)
+        self.assertEqual(list(Recipe.objects.for_viewer(self.viewer).values_list('title', flat=True).order_by('title')),
+                         ["Bread", "Soup"])
+
+    def test_explore_cards_do_not_query_saves_per_card(self):
+        for n in range(5):
+            create_recipe(self.chef, f"Dish {n}")
+        self.client.login(username='@viewer', password='Password123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('explore'))
+        saved_queries = [query for query in queries if 'recipe_saved_by' in query['sql']]
+        self.assertEqual(len(saved_queries), 1)
+        self.assertContains(response, 'bi-bookmark-fill', count=1)
+
+    def test_feed_card_labels_followed_authors(self):
+        self.client.login(username='@viewer', password='Password123')
+        response = self.client.get(reverse('display_user_feed'))
+        self.assertEqual(response.context['feed_data'], [self.bread])
+        self.assertContains(response, 'In your following')
+        self.assertNotContains(response, 'Reccomended for you')
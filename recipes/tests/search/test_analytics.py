@@ -0,0 +1,66 @@
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import SearchLogEntry, SearchQueryStats
+from recipes.search import SearchQuery, search_log
+
+
+class SearchLogTestCase(TestCase):
+    """Tests for the search timing log and its rollup."""
+
+    def _record(self, text, total_ms, results=3):
+        search_log.record(SearchQuery(text), results, parse_ms=0, db_ms=total_ms / 2, render_ms=total_ms / 2)
+
+    def test_entries_are_written_at_once(self):
+        self._record("pasta", 10)
+        entry = SearchLogEntry.objects.get()
+        self.assertEqual(entry.query, SearchQuery("pasta").normalized())
+        self.assertEqual(entry.total_ms, 10)
+
+    def test_empty_queries_are_not_logged(self):
+        search_log.record(SearchQuery(""), 0, 0, 0, 0)
+        self.assertFalse(SearchLogEntry.objects.exists())
+
+    def test_rollup_merges_into_stats(self):
+        self._record("pasta", 10, results=4)
+        self._record("Pasta", 30, results=2)
+        self._record("soup", 5)
+        self.assertEqual(search_log.rollup(), 3)
+        self.assertEqual(SearchLogEntry.objects.count(), 0)
+
+        self._record("pasta", 50)
+        self.assertEqual(search_log.rollup(), 1)
+
+        stats = SearchQueryStats.objects.get(query=SearchQuery("pasta").normalized())
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.total_ms, 90)
+        self.assertEqual(stats.max_ms, 50)
+        self.assertEqual(stats.total_results, 9)
+        self.assertEqual(stats.avg_ms, 30)
+
+    def test_rollup_query_count_does_not_grow_with_queries(self):
+        for text in ("pasta", "soup", "curry", "pie"):
+            self._record(text, 10)
+        search_log.rollup()
+        for text in ("pasta", "soup", "curry", "pie", "salad"):
+            self._record(text, 10)
+        # Savepoint, last id, aggregate, existing totals, upsert, delete, release
+        with self.assertNumQueries(7):
+            self.assertEqual(search_log.rollup(), 5)
+        self.assertEqual(SearchQueryStats.objects.get(query=SearchQuery("soup").normalized()).count, 2)
+
+    def test_top_queries(self):
+        self._record("pasta", 10)
+        self._record("pasta", 10)
+        self._record("soup", 40)
+        search_log.rollup()
+
+        self.assertEqual([stats.query for stats in search_log.top_frequent()], [
+            SearchQuery("pasta").normalized(), SearchQuery("soup").normalized(),
+        ])
+        self.assertEqual(search_log.top_slow(1)[0].query, SearchQuery("soup").normalized())
+
+    def test_search_view_records_timings(self):
+        self.client.get(reverse('search_results'), {'search': 'lasagne'})
+        entry = SearchLogEntry.objects.get(query=SearchQuery("lasagne").normalized())
+        self.assertEqual(entry.result_count, 0)
+        self.assertGreater(entry.render_ms, 0)
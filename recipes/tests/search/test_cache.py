@@ -0,0 +1,66 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.search import SearchQuery, search_cache, search_recipe_ids
+
+
+class SearchResultCacheTestCase(TestCase):
+    """Tests for the normalized search result cache."""
+
+    def setUp(self):
+        self.author = User.objects.create(username='@cacheauthor', email='cache@example.com')
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            title="Chicken Curry",
+            description="desc",
+            prep_time=10,
+            servings=2,
+        )
+        self.recipe.tags.add('spicy', 'dinner')
+        search_cache.reset_stats()
+
+    def test_normalized_query(self):
+        query = SearchQuery("Curry #Spicy chicken #dinner curry")
+        self.assertEqual(query.normalized(), "text: #dinner #spicy chicken curry")
+        self.assertEqual(SearchQuery("x", fuzzy=True).normalized(), "fuzzy: x")
+
+    def test_equivalent_queries_share_an_entry(self):
+        compute = mock.Mock(wraps=search_recipe_ids)
+        first = search_cache.get_or_compute(SearchQuery("chicken #spicy #dinner"), compute)
+        second = search_cache.get_or_compute(SearchQuery("#DINNER Chicken #spicy"), compute)
+
+        self.assertEqual(first, [self.recipe.pk])
+        self.assertEqual(second, first)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(search_cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_recipe_changes_invalidate(self):
+        search_cache.get_or_compute(SearchQuery("korma"), search_recipe_ids)
+        self.recipe.title = "Chicken Korma"
+        self.recipe.save()
+        self.assertEqual(search_cache.get_or_compute(SearchQuery("korma"), search_recipe_ids), [self.recipe.pk])
+
+    def test_ingredient_changes_invalidate(self):
+        search_cache.get_or_compute(SearchQuery("coriander"), search_recipe_ids)
+        RecipeIngredient.objects.create(recipe=self.recipe, name="Coriander", amount=1, unit='g')
+        self.assertEqual(search_cache.get_or_compute(SearchQuery("coriander"), search_recipe_ids), [self.recipe.pk])
+
+    def test_tag_changes_invalidate(self):
+        search_cache.get_or_compute(SearchQuery("#spicy"), search_recipe_ids)
+        self.recipe.tags.remove('spicy')
+        self.assertEqual(search_cache.get_or_compute(SearchQuery("#spicy"), search_recipe_ids), [])
+
+    def test_search_view_uses_cache(self):
+        self.client.get(reverse('search_results'), {'search': 'chicken'})
+        self.client.get(reverse('search_results'), {'search': 'chicken', 'page': 2})
+        self.assertEqual(search_cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_stats_command(self):
+        search_cache.get_or_compute(SearchQuery("chicken"), search_recipe_ids)
+        out = StringIO()
+        call_command('search_cache_stats', '--reset', stdout=out)
+        self.assertIn("Misses: 1", out.getvalue())
+        self.assertEqual(search_cache.stats(), {'hits': 0, 'misses': 0})
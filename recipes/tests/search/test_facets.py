@@ -0,0 +1,86 @@
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import RecipeReview
+from recipes.search import SearchQuery, tag_index
+from recipes.search.facets import apply_facets
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class SearchFacetsTestCase(TestCase):
+    """Tests for single-pass search facet counts."""
+
+    def setUp(self):
+        self.author = create_user('@facetauthor')
+        self.reviewer = create_user('@facetreviewer')
+        self.quick = create_recipe(self.author, "Quick Pasta", prep_time=10, servings=2, tags=['pasta', 'easy'])
+        self.bake = create_recipe(self.author, "Pasta Bake", prep_time=45, servings=4, tags=['pasta'])
+        self.feast = create_recipe(self.author, "Pasta Feast", prep_time=90, servings=8, tags=['pasta', 'party'])
+        RecipeReview.objects.create(recipe=self.quick, user=self.reviewer, rating=5)
+        RecipeReview.objects.create(recipe=self.bake, user=self.reviewer, rating=2)
+        self.ids = [self.quick.pk, self.bake.pk, self.feast.pk]
+
+    def _counts(self, facets):
+        return {
+            facet['name']: {option['value']: option['count'] for option in facet['options']}
+            for facet in facets
+        }
+
+    def test_counts_every_facet(self):
+        ids, facets = apply_facets(SearchQuery("pasta"), self.ids, QueryDict())
+        self.assertEqual(ids, self.ids)
+
+        counts = self._counts(facets)
+        self.assertEqual(counts['tag'], {'pasta': 3, 'easy': 1, 'party': 1})
+        self.assertEqual(counts['prep'], {'15': 1, '30': 0, '60': 1, '60+': 1})
+        self.assertEqual(counts['servings'], {'1-2': 1, '3-4': 1, '5-6': 0, '7+': 1})
+        self.assertEqual(counts['rating'], {'4': 1, '3': 0, 'low': 1, 'unrated': 1})
+
+    def test_facet_values_come_from_one_query(self):
+        tag_index.ensure_current()
+        with self.assertNumQueries(2):
+            # One for the facet values, one to check the tag index is current
+            apply_facets(SearchQuery("pasta"), self.ids, QueryDict())
+
+    def test_selection_filters_results_and_counts(self):
+        ids, facets = apply_facets(SearchQuery("pasta"), self.ids, QueryDict('prep=60%2B'))
+        self.assertEqual(ids, [self.feast.pk])
+
+        counts = self._counts(facets)
+        self.assertEqual(counts['tag'], {'pasta': 1, 'party': 1})
+        selected = [option for option in facets[1]['options'] if option['selected']]
+        self.assertEqual(selected[0]['query_string'], '')
+
+    def test_counts_ignore_their_own_selection(self):
+        ids, facets = apply_facets(SearchQuery("pasta"), self.ids, QueryDict('prep=60%2B&servings=3-4'))
+        self.assertEqual(ids, [])
+
+        counts = self._counts(facets)
+        # Other prep buckets count the recipes with 3 - 4 servings, and the other way round
+        self.assertEqual(counts['prep'], {'15': 0, '30': 0, '60': 1, '60+': 0})
+        self.assertEqual(counts['servings'], {'1-2': 0, '3-4': 0, '5-6': 0, '7+': 1})
+        self.assertEqual(counts['rating'], {'4': 0, '3': 0, 'low': 0, 'unrated': 0})
+
+    def test_facet_values_are_cached_with_the_results(self):
+        apply_facets(SearchQuery("pasta"), self.ids, QueryDict())
+        tag_index.ensure_current()
+        with self.assertNumQueries(1):
+            apply_facets(SearchQuery("pasta"), self.ids, QueryDict('prep=15'))
+
+        # A new rating moves the recipe to another band
+        RecipeReview.objects.create(recipe=self.feast, user=self.reviewer, rating=4)
+        ids, facets = apply_facets(SearchQuery("pasta"), self.ids, QueryDict('rating=4'))
+        self.assertEqual(ids, [self.quick.pk, self.feast.pk])
+
+    def test_tags_in_query_are_not_offered(self):
+        ids, facets = apply_facets(SearchQuery("#pasta"), self.ids, QueryDict('search=%23pasta'))
+        tag_facet = facets[0]
+        self.assertNotIn('pasta', [option['value'] for option in tag_facet['options']])
+        self.assertEqual(
+            QueryDict(tag_facet['options'][0]['query_string'])['search'], '#pasta #easy'
+        )
+
+    def test_search_view_applies_facets(self):
+        response = self.client.get(reverse('search_results'), {'search': 'pasta', 'rating': 'unrated'})
+        self.assertEqual(list(response.context['page_obj']), [self.feast])
+        self.assertContains(response, 'Not yet rated (1)')
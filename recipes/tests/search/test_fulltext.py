@@ -0,0 +1,73 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.search import fulltext
+
+
+class FullTextSearchTestCase(TestCase):
+    """Tests for the FTS5 recipe search index."""
+
+    def setUp(self):
+        self.author = User.objects.create(username='@fullauthor', email='full@example.com')
+        self.cake = Recipe.objects.create(
+            author=self.author,
+            title="Lemon Cake",
+            description="Zesty sponge for the afternoon",
+            prep_time=40,
+            servings=8,
+        )
+        self.pie = Recipe.objects.create(
+            author=self.author,
+            title="Apple Pie",
+            description="Goes well after a lemon sorbet",
+            prep_time=60,
+            servings=6,
+        )
+
+    def test_match_expression_uses_quoted_prefixes(self):
+        self.assertEqual(fulltext.build_match_expression(['Chick', 'rice!']), '"chick"* OR "rice"*')
+
+    def test_match_expression_ignores_punctuation_only_terms(self):
+        self.assertEqual(fulltext.build_match_expression(['!!', '---']), '')
+
+    def test_title_match_ranks_above_description_match(self):
+        self.assertEqual(fulltext.search(['lemon']), [self.cake.pk, self.pie.pk])
+
+    def test_ingredients_are_searchable(self):
+        RecipeIngredient.objects.create(recipe=self.pie, name="Bramley apples", amount=3, unit='g')
+        self.assertEqual(fulltext.search(['bramley']), [self.pie.pk])
+
+    def test_tags_are_searchable(self):
+        self.cake.tags.add('citrus')
+        self.assertEqual(fulltext.search(['citrus']), [self.cake.pk])
+        self.cake.tags.clear()
+        self.assertEqual(fulltext.search(['citrus']), [])
+
+    def test_updated_recipe_is_reindexed(self):
+        self.cake.title = "Orange Cake"
+        self.cake.save()
+        self.assertEqual(fulltext.search(['orange']), [self.cake.pk])
+
+    def test_deleted_recipe_is_removed(self):
+        self.cake.delete()
+        self.assertEqual(fulltext.search(['cake']), [])
+
+    def test_renamed_author_is_reindexed(self):
+        self.author.username = '@renamedbaker'
+        self.author.save()
+        self.assertCountEqual(fulltext.search(['renamedbaker']), [self.cake.pk, self.pie.pk])
+
+    def test_rebuild_command_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {fulltext.TABLE}")
+        self.assertEqual(fulltext.search(['cake']), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(fulltext.search(['cake']), [self.cake.pk])
+
+    def test_search_view_orders_by_relevance(self):
+        response = self.client.get(reverse('search_results'), {'search': 'lemon'})
+        self.assertEqual(list(response.context['page_obj']), [self.cake, self.pie])
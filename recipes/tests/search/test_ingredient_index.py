@@ -0,0 +1,59 @@
+from django.test import TestCase
+from recipes.models import RecipeIngredient
+from recipes.search import ingredient_index, parse_pantry
+from recipes.search.ingredient_index import normalize_ingredient
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class IngredientIndexTestCase(TestCase):
+    """Tests for the in-memory ingredient index behind pantry searches."""
+
+    def setUp(self):
+        self.author = create_user('@pantryauthor')
+        self.pancakes = create_recipe(self.author, "Pancakes", ingredients=['Eggs', 'Flour', 'Milk'])
+        self.omelette = create_recipe(self.author, "Omelette", ingredients=['eggs', 'cheese'])
+        self.cake = create_recipe(self.author, "Cake", ingredients=['eggs', 'flour', 'sugar', 'butter'])
+
+    def _ids(self, matches):
+        return [match.recipe_id for match in matches]
+
+    def test_normalize_ingredient(self):
+        self.assertEqual(normalize_ingredient(" Eggs "), "egg")
+        self.assertEqual(normalize_ingredient("Tomatoes"), "tomato")
+        self.assertEqual(normalize_ingredient("Plain  Flour!"), "plain flour")
+        self.assertEqual(normalize_ingredient("glass"), "glass")
+
+    def test_parse_pantry(self):
+        self.assertEqual(parse_pantry("eggs, Flour,\nmilk, egg,"), ['egg', 'flour', 'milk'])
+
+    def test_covered_recipes(self):
+        matches = ingredient_index.pantry(parse_pantry("eggs, flour, milk"))
+        self.assertEqual(self._ids(matches), [self.pancakes.pk])
+        self.assertEqual(matches[0].matched, 3)
+        self.assertEqual(matches[0].missing, [])
+
+    def test_missing_ingredients_are_ranked_by_coverage(self):
+        matches = ingredient_index.pantry(parse_pantry("eggs, flour, milk"), max_missing=2)
+        # Omelette and cake are both half covered; omelette needs fewer extras
+        self.assertEqual(self._ids(matches), [self.pancakes.pk, self.omelette.pk, self.cake.pk])
+        self.assertEqual(matches[1].missing, ['cheese'])
+        self.assertEqual(matches[2].missing, ['butter', 'sugar'])
+
+    def test_unknown_ingredients_match_nothing(self):
+        self.assertEqual(ingredient_index.pantry(['saffron'], max_missing=5), [])
+
+    def test_added_ingredient_updates_index(self):
+        ingredient_index.pantry(['egg'])
+        RecipeIngredient.objects.create(recipe=self.omelette, name='milk', amount=1, unit='ml')
+        matches = ingredient_index.pantry(parse_pantry("eggs, milk, cheese"))
+        self.assertIn(self.omelette.pk, self._ids(matches))
+
+    def test_deleted_ingredient_updates_index(self):
+        ingredient_index.pantry(['egg'])
+        self.omelette.ingredients.get(name='cheese').delete()
+        self.assertEqual(self._ids(ingredient_index.pantry(['egg'])), [self.omelette.pk])
+
+    def test_deleted_recipe_is_removed(self):
+        ingredient_index.pantry(['egg'])
+        self.omelette.delete()
+        self.assertNotIn(self.omelette.pk, self._ids(ingredient_index.pantry(['egg', 'cheese'])))
@@ -0,0 +1,50 @@
+from django.test import TestCase
+from taggit.models import Tag
+from recipes.search import tag_index
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class TagIndexTestCase(TestCase):
+    """Tests for the in-memory tag posting lists."""
+
+    def setUp(self):
+        self.author = create_user('@tagauthor')
+        self.salad = create_recipe(self.author, "Salad", tags=['vegan', 'easy', 'quick'])
+        self.curry = create_recipe(self.author, "Curry", tags=['vegan', 'spicy'])
+        self.toast = create_recipe(self.author, "Toast", tags=['easy', 'quick'])
+
+    def test_single_tag(self):
+        self.assertEqual(tag_index.match(['vegan']), ([self.salad.pk, self.curry.pk], []))
+
+    def test_multiple_tags_are_intersected(self):
+        self.assertEqual(tag_index.match(['easy', 'quick', 'vegan']), ([self.salad.pk], []))
+
+    def test_tags_are_case_insensitive(self):
+        self.assertEqual(tag_index.match(['EASY', 'Quick']), ([self.salad.pk, self.toast.pk], []))
+
+    def test_unknown_tags_are_reported(self):
+        self.assertEqual(tag_index.match(['vegan', 'nope']), ([self.salad.pk, self.curry.pk], ['nope']))
+        self.assertEqual(tag_index.match(['nope']), (None, ['nope']))
+
+    def test_no_tags(self):
+        self.assertEqual(tag_index.match([]), (None, []))
+
+    def test_tag_without_recipes_matches_nothing(self):
+        Tag.objects.create(name='unused')
+        self.assertEqual(tag_index.match(['unused']), ([], []))
+
+    def test_tags_set_updates_postings(self):
+        tag_index.match(['vegan'])
+        self.curry.tags.set(['spicy', 'quick'])
+        self.assertEqual(tag_index.match(['vegan']), ([self.salad.pk], []))
+        self.assertEqual(tag_index.match(['quick', 'spicy']), ([self.curry.pk], []))
+
+    def test_deleted_recipe_is_removed(self):
+        tag_index.match(['vegan'])
+        self.salad.delete()
+        self.assertEqual(tag_index.match(['vegan']), ([self.curry.pk], []))
+
+    def test_deleted_tag_is_removed(self):
+        tag_index.match(['spicy'])
+        Tag.objects.get(name='spicy').delete()
+        self.assertEqual(tag_index.match(['spicy']), (None, ['spicy']))
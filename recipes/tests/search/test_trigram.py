@@ -0,0 +1,78 @@
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import RecipeTrigram
+from recipes.search import trigram
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class TrigramSearchTestCase(TestCase):
+    """Tests for the typo-tolerant trigram search index."""
+
+    def setUp(self):
+        self.author = create_user('@fuzzyauthor')
+        self.spaghetti = create_recipe(self.author, "Spaghetti Bolognese")
+        self.lasagna = create_recipe(self.author, "Beef Lasagna")
+        self.soup = create_recipe(self.author, "Spinach Soup")
+
+    def test_word_trigrams_are_padded(self):
+        self.assertEqual(trigram.word_trigrams('Pie'), {'  p', ' pi', 'pie', 'ie '})
+
+    def test_recipe_trigrams_are_stored_on_save(self):
+        stored = set(self.spaghetti.trigrams.values_list('trigram', flat=True))
+        self.assertEqual(stored, trigram.text_trigrams("Spaghetti Bolognese"))
+
+    def test_misspelled_terms_find_recipes(self):
+        self.assertEqual(trigram.search(['spagetti']), [self.spaghetti.pk])
+        self.assertEqual(trigram.search(['lasgna']), [self.lasagna.pk])
+
+    def test_unrelated_terms_find_nothing(self):
+        self.assertEqual(trigram.search(['tiramisu']), [])
+
+    def test_tag_names_are_indexed(self):
+        self.soup.tags.add('vegetarian')
+        self.assertEqual(trigram.search(['vegitarian']), [self.soup.pk])
+
+    def test_renamed_recipe_is_reindexed(self):
+        self.soup.title = "Tomato Soup"
+        self.soup.save()
+        self.assertEqual(trigram.search(['spinich']), [])
+        self.assertEqual(trigram.search(['tomatoe']), [self.soup.pk])
+
+    def test_unchanged_recipe_keeps_its_trigrams(self):
+        stored = set(self.soup.trigrams.values_list('pk', flat=True))
+        self.soup.description = "Now with nutmeg"
+        self.soup.save()
+        self.assertEqual(set(self.soup.trigrams.values_list('pk', flat=True)), stored)
+
+    def test_common_trigrams(self):
+        with mock.patch.object(trigram, 'COMMON_TRIGRAM_RECIPES', 1):
+            # 'sp' starts Spaghetti and Spinach, 'bo' only Bolognese
+            self.assertEqual(trigram.common_trigrams({' sp', ' bo', 'zzz'}), {' sp'})
+
+    def test_common_trigrams_are_not_searched(self):
+        pie = create_recipe(self.author, "Spinach Pie")
+        with mock.patch.object(trigram, 'COMMON_TRIGRAM_RECIPES', 1):
+            # Both spinach recipes share 'spi', 'pin', ...; only the soup matches 'soup'
+            self.assertEqual(trigram.search(['soup', 'spinich']), [self.soup.pk])
+            # Every trigram of the query is common: all of them are counted
+            self.assertEqual(trigram.search(['spinach']), [pie.pk, self.soup.pk])
+
+    def test_long_query(self):
+        # Well over SQLite's limit of 500 compound SELECT branches in trigrams
+        words = [f"word{n}" for n in range(1000)]
+        self.assertEqual(trigram.search(words + ["spinich"]), [self.soup.pk])
+        self.assertEqual(self.client.get(reverse('search_results'), {'search': " ".join(words), 'mode': 'fuzzy'}).status_code, 200)
+
+    def test_rebuild_index(self):
+        RecipeTrigram.objects.all().delete()
+        self.assertEqual(trigram.rebuild_index(), 3)
+        self.assertEqual(trigram.search(['spagetti']), [self.spaghetti.pk])
+
+    def test_search_view_fuzzy_mode(self):
+        url = reverse('search_results')
+        response = self.client.get(url, {'search': 'spagetti'})
+        self.assertContains(response, 'Check for similar spellings')
+
+        response = self.client.get(url, {'search': 'spagetti', 'mode': 'fuzzy'})
+        self.assertEqual(list(response.context['page_obj']), [self.spaghetti])
@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Recipe, User
+from recipes.search import typeahead_index
+from recipes.search.typeahead import PrefixIndex, title_keys
+
+
+class PrefixIndexTestCase(TestCase):
+    """Tests for the sorted-array prefix structure."""
+
+    def test_title_keys_start_at_each_word(self):
+        self.assertEqual(title_keys("Beef  Lasagna"), ["beef  lasagna", "lasagna"])
+
+    def test_complete_returns_distinct_labels_in_key_order(self):
+        index = PrefixIndex([
+            ("pie", "Pie", 1),
+            ("pizza", "Pizza", 2),
+            ("pizza", "Pizza", 3),
+            ("soup", "Soup", 4),
+        ])
+        self.assertEqual(index.complete("pi", 5), ["Pie", "Pizza"])
+        self.assertEqual(index.complete("pi", 1), ["Pie"])
+
+    def test_replace_and_remove(self):
+        index = PrefixIndex([("pie", "Pie", 1)])
+        index.replace(1, ["tart"], "Tart")
+        self.assertEqual(index.complete("p", 5), [])
+        self.assertEqual(index.complete("t", 5), ["Tart"])
+        index.remove(1)
+        self.assertEqual(len(index), 0)
+
+
+class SearchSuggestionsTestCase(TestCase):
+    """Tests for the search typeahead index and endpoint."""
+
+    def setUp(self):
+        self.url = reverse('search_suggestions')
+        self.author = User.objects.create(username='@janetaylor', email='jane@example.com')
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            title="Spaghetti Bolognese",
+            description="desc",
+            prep_time=10,
+            servings=2,
+        )
+        self.recipe.tags.add('vegan', 'vegetarian')
+
+    def test_suggestions_url(self):
+        self.assertEqual(self.url, '/search/suggest/')
+
+    def test_completes_recipe_titles_from_any_word(self):
+        labels = [s['label'] for s in typeahead_index.suggest("bolo")]
+        self.assertEqual(labels, ["Spaghetti Bolognese"])
+
+    def test_completes_tags(self):
+        suggestions = typeahead_index.suggest("pasta #veg")
+        self.assertEqual([s['label'] for s in suggestions], ['#vegan', '#vegetarian'])
+        self.assertEqual(suggestions[0]['query'], 'pasta #vegan')
+
+    def test_completes_usernames(self):
+        suggestions = typeahead_index.suggest("@jane")
+        self.assertEqual(suggestions, [{'type': 'user', 'label': '@janetaylor', 'query': '@janetaylor'}])
+
+    def test_index_follows_changes(self):
+        self.recipe.title = "Penne Arrabbiata"
+        self.recipe.save()
+        self.assertEqual(typeahead_index.suggest("spag"), [])
+        self.assertEqual([s['label'] for s in typeahead_index.suggest("arra")], ["Penne Arrabbiata"])
+
+        self.recipe.delete()
+        self.assertEqual(typeahead_index.suggest("penne"), [])
+
+    def test_stale_index_is_rebuilt(self):
+        typeahead_index.suggest("spag")
+        Recipe.objects.filter(pk=self.recipe.pk).update(title="Fish Pie")
+        typeahead_index.invalidate()
+        self.assertEqual([s['label'] for s in typeahead_index.suggest("fish")], ["Fish Pie"])
+
+    def test_trailing_space_has_no_suggestions(self):
+        self.assertEqual(typeahead_index.suggest("spaghetti "), [])
+
+    def test_endpoint_returns_json(self):
+        response = self.client.get(self.url, {'q': '#vega', 'limit': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'query': '#vega',
+            'suggestions': [{'type': 'tag', 'label': '#vegan', 'query': '#vegan'}],
+        })
+
+    def test_endpoint_ignores_invalid_limit(self):
+        response = self.client.get(self.url, {'q': 'spag', 'limit': 'lots'})
+        self.assertEqual(len(response.json()['suggestions']), 1)
@@ -0,0 +1,107 @@
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Job, RecipeContentNeighbour, RecipeIngredient
+from recipes.similarity.content import (
+    load_recipe_tokens, tfidf_matrix, update_content_similarity, update_recipe_content_similarity,
+)
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class ContentSimilarityTestCase(TestCase):
+    """Tests for ingredient and tag based recipe neighbours."""
+
+    def setUp(self):
+        self.author = create_user('@contentcook')
+        self.pancakes = create_recipe(self.author, "Pancakes", ['Eggs', 'Flour', 'Milk'], ['breakfast'])
+        self.crepes = create_recipe(self.author, "Crepes", ['eggs', 'flour', 'milk', 'butter'], ['breakfast'])
+        self.omelette = create_recipe(self.author, "Omelette", ['eggs', 'cheese'])
+        self.salad = create_recipe(self.author, "Salad", ['lettuce'], ['vegan'])
+
+    def test_tokens(self):
+        tokens = load_recipe_tokens()
+        self.assertEqual(tokens[self.omelette.pk], ['ingredient:cheese', 'ingredient:egg'])
+        self.assertIn('tag:vegan', tokens[self.salad.pk])
+
+    def test_rows_are_normalized(self):
+        matrix, recipe_ids = tfidf_matrix(load_recipe_tokens())
+        self.assertEqual(len(recipe_ids), 4)
+        for norm in matrix.multiply(matrix).sum(axis=1).A1:
+            self.assertAlmostEqual(norm, 1.0)
+
+    def test_full_build(self):
+        result = update_content_similarity(k=2)
+        self.assertEqual(result['recipes'], 4)
+
+        self.assertEqual(list(self.pancakes.get_content_similar()), [self.crepes, self.omelette])
+        self.assertEqual(list(self.salad.get_content_similar()), [])
+
+    def test_rebuild_picks_up_edits(self):
+        update_content_similarity()
+        RecipeIngredient.objects.create(recipe=self.salad, name='cheese', amount=1, unit='g')
+        update_content_similarity()
+        self.assertEqual(list(self.salad.get_content_similar()), [self.omelette])
+        # The omelette did not change but now has the salad as a neighbour
+        self.assertIn(self.salad, self.omelette.get_content_similar())
+
+    def test_new_recipe_joins_existing_lists(self):
+        update_content_similarity()
+        waffles = create_recipe(self.author, "Waffles", ['eggs', 'flour', 'milk'], ['breakfast'])
+        update_content_similarity()
+        self.assertEqual(list(waffles.get_content_similar(1)), [self.pancakes])
+        self.assertEqual(list(self.pancakes.get_content_similar(1)), [waffles])
+
+    def test_incremental_update_matches_full_build(self):
+        update_content_similarity()
+        RecipeIngredient.objects.create(recipe=self.salad, name='cheese', amount=1, unit='g')
+        update_recipe_content_similarity(self.salad.pk)
+        incremental = {
+            (row.recipe_id, row.neighbour_id): row.score
+            for row in RecipeContentNeighbour.objects.filter(recipe=self.salad)
+        }
+        self.assertEqual(list(self.salad.get_content_similar()), [self.omelette])
+        self.assertIn(self.salad, self.omelette.get_content_similar())
+
+        update_content_similarity()
+        rebuilt = RecipeContentNeighbour.objects.filter(recipe=self.salad)
+        self.assertEqual(len(rebuilt), len(incremental))
+        for row in rebuilt:
+            self.assertAlmostEqual(row.score, incremental[(row.recipe_id, row.neighbour_id)])
+
+    def test_incremental_update_adds_new_recipe_to_lists(self):
+        update_content_similarity()
+        waffles = create_recipe(self.author, "Waffles", ['eggs', 'flour', 'milk'], ['breakfast'])
+        update_recipe_content_similarity(waffles.pk)
+        self.assertEqual(list(waffles.get_content_similar(1)), [self.pancakes])
+        self.assertEqual(list(self.pancakes.get_content_similar(1)), [waffles])
+
+    def test_incremental_update_drops_stale_neighbours(self):
+        update_content_similarity()
+        self.assertIn(self.omelette, self.pancakes.get_content_similar())
+        self.omelette.ingredients.all().delete()
+        update_recipe_content_similarity(self.omelette.pk)
+        self.assertEqual(list(self.omelette.get_content_similar()), [])
+        self.assertNotIn(self.omelette, self.pancakes.get_content_similar())
+
+    def test_incremental_update_keeps_top_k(self):
+        update_content_similarity(k=1)
+        waffles = create_recipe(self.author, "Waffles", ['eggs', 'flour', 'milk'], ['breakfast'])
+        update_recipe_content_similarity(waffles.pk, k=1)
+        self.assertEqual(RecipeContentNeighbour.objects.filter(recipe=self.pancakes).count(), 1)
+
+    def test_changes_queue_one_refresh_job(self):
+        Job.objects.all().delete()
+        RecipeIngredient.objects.create(recipe=self.salad, name='tomato', amount=1, unit='g')
+        self.salad.tags.add('summer')
+        self.assertEqual(Job.objects.filter(key=f'content-similarity:{self.salad.pk}').count(), 1)
+        self.assertEqual(Job.objects.filter(key='content-similarity').count(), 1)
+
+    def test_detail_page_falls_back_to_content_neighbours(self):
+        update_content_similarity()
+        response = self.client.get(reverse('display_recipe', args=[self.pancakes.pk]))
+        self.assertEqual(response.context['similar_recipes'][0], self.crepes)
+        self.assertContains(response, 'Similar recipes')
+
+    def test_deleted_recipe_leaves_neighbour_lists(self):
+        update_content_similarity()
+        self.crepes.delete()
+        self.assertFalse(RecipeContentNeighbour.objects.filter(neighbour_id=self.crepes.pk).exists())
@@ -0,0 +1,94 @@
+import numpy as np
+from django.test import TestCase
+from recipes.models import RecipeReview
+from recipes.models.recipe import RecipeSimilar
+from recipes.similarity.cooccurrence import (
+    interaction_matrix, item_similarity, rebuild_similarities, top_neighbours,
+)
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class CooccurrenceMatrixTestCase(TestCase):
+    """Tests for the vectorized similarity steps."""
+
+    def setUp(self):
+        # Users 1 and 2 like recipes 10 and 20; user 2 also likes 30
+        self.matrix, self.recipes = interaction_matrix(
+            np.array([1, 1, 2, 2, 2, 2]), np.array([10, 20, 10, 20, 30, 30])
+        )
+
+    def _dense(self, similarity):
+        return similarity.toarray().round(3).tolist()
+
+    def test_interaction_matrix_is_binary(self):
+        self.assertEqual(self.recipes.tolist(), [10, 20, 30])
+        self.assertEqual(self.matrix.toarray().tolist(), [[1, 1, 0], [1, 1, 1]])
+
+    def test_cosine(self):
+        similarity = item_similarity(self.matrix, 'cosine')
+        self.assertEqual(self._dense(similarity), [
+            [0, 1.0, 0.707],
+            [1.0, 0, 0.707],
+            [0.707, 0.707, 0],
+        ])
+
+    def test_jaccard(self):
+        similarity = item_similarity(self.matrix, 'jaccard')
+        self.assertEqual(self._dense(similarity), [
+            [0, 1.0, 0.5],
+            [1.0, 0, 0.5],
+            [0.5, 0.5, 0],
+        ])
+
+    def test_min_common(self):
+        similarity = item_similarity(self.matrix, 'cosine', min_common=2)
+        self.assertEqual(self._dense(similarity), [[0, 1.0, 0], [1.0, 0, 0], [0, 0, 0]])
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            item_similarity(self.matrix, 'euclidean')
+
+    def test_top_neighbours(self):
+        rows, cols, scores = top_neighbours(item_similarity(self.matrix), 1)
+        self.assertEqual(list(zip(rows.tolist(), cols.tolist())), [(0, 1), (1, 0), (2, 0)])
+
+
+class RebuildSimilaritiesTestCase(TestCase):
+    """Tests for replacing RecipeSimilar from all likes and saves."""
+
+    def setUp(self):
+        self.users = [
+            create_user(f'@taster{n}') for n in range(3)
+        ]
+        author = self.users[0]
+        self.recipes = [
+            create_recipe(author, f"Dish {n}")
+            for n in range(4)
+        ]
+
+    def _like(self, user, recipe, rating=5):
+        RecipeReview.objects.create(user=user, recipe=recipe, rating=rating)
+
+    def test_rebuild_replaces_pairs(self):
+        a, b, c, d = self.recipes
+        self._like(self.users[0], a)
+        self._like(self.users[0], b)
+        self._like(self.users[1], a)
+        self._like(self.users[1], c, rating=2)
+        self.users[1].saved_recipes.add(b)
+        RecipeSimilar.objects.create(recipe_A=c, recipe_B=d, similarity_score=9)
+
+        result = rebuild_similarities(k=5)
+
+        self.assertEqual(result['pairs'], 1)
+        self.assertEqual(set(result['timings']), {'load', 'matrix', 'similarity', 'top_k', 'write'})
+        pair = RecipeSimilar.objects.get()
+        self.assertEqual((pair.recipe_A, pair.recipe_B), (a, b))
+        # Both users liked or saved a and b: two co-likes, the unit add_similar counts in
+        self.assertEqual(pair.similarity_score, 2)
+
+    def test_rebuild_without_interactions(self):
+        RecipeSimilar.objects.create(recipe_A=self.recipes[0], recipe_B=self.recipes[1])
+        result = rebuild_similarities()
+        self.assertEqual(result['pairs'], 0)
+        self.assertFalse(RecipeSimilar.objects.exists())
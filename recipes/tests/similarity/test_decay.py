@@ -0,0 +1,57 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from recipes.models import Job
+from recipes.models.recipe import RecipeSimilar
+from recipes.similarity.decay import HALF_LIFE, PRUNE_BELOW, decay_similarities, run_decay, schedule_decay
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class SimilarityDecayTestCase(TestCase):
+    """Tests for the batch time decay of similarity scores."""
+
+    def setUp(self):
+        author = create_user('@decay')
+        self.a, self.b, self.c = [
+            create_recipe(author, f"Dish {n}")
+            for n in range(3)
+        ]
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.b, similarity_score=8)
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.c, similarity_score=PRUNE_BELOW * 1.5)
+
+    def _score(self, first, second):
+        return RecipeSimilar.objects.get(recipe_A=first, recipe_B=second).similarity_score
+
+    def test_one_half_life_halves_scores_and_prunes(self):
+        self.assertEqual(decay_similarities(HALF_LIFE), (2, 1))
+        self.assertAlmostEqual(self._score(self.a, self.b), 4)
+        self.assertFalse(RecipeSimilar.objects.filter(recipe_B=self.c).exists())
+
+    def test_decay_is_two_statements(self):
+        with CaptureQueriesContext(connection) as queries:
+            decay_similarities()
+        statements = [query['sql'] for query in queries if 'recipes_recipesimilar' in query['sql']]
+        self.assertEqual(len(statements), 2)
+
+    def test_new_likes_add_to_decayed_score(self):
+        decay_similarities(HALF_LIFE * 2)
+        self.b.add_similar([self.a])
+        self.assertAlmostEqual(self._score(self.a, self.b), 3)
+
+    def test_decay_changes_get_similar(self):
+        self.assertEqual(self.a.get_similar(), [self.b, self.c])
+        decay_similarities(HALF_LIFE)
+        self.assertEqual(self.a.get_similar(), [self.b])
+
+    def test_job_decays_by_elapsed_time_and_reschedules(self):
+        run_decay(last_run=(timezone.now() - HALF_LIFE).isoformat())
+        self.assertAlmostEqual(self._score(self.a, self.b), 4, places=3)
+
+        job = Job.objects.get(key='similarity-decay')
+        self.assertGreater(job.run_at, timezone.now() + timedelta(hours=23))
+
+    def test_schedule_is_idempotent(self):
+        first = schedule_decay()
+        self.assertEqual(schedule_decay().pk, first.pk)
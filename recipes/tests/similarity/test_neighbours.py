@@ -0,0 +1,62 @@
+from django.test import TestCase
+from recipes.models import Job, RecipeNeighbourList
+from recipes.models.recipe import RecipeSimilar
+from recipes.similarity.neighbours import materialize, neighbour_index
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class NeighbourListTestCase(TestCase):
+    """Tests for the materialized neighbour lists behind get_similar."""
+
+    def setUp(self):
+        author = create_user('@neighbour')
+        self.a, self.b, self.c, self.d = [
+            create_recipe(author, f"Dish {n}")
+            for n in range(4)
+        ]
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.b, similarity_score=2)
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.c, similarity_score=5)
+        RecipeSimilar.objects.create(recipe_A=self.b, recipe_B=self.c, similarity_score=2)
+        RecipeSimilar.objects.create(recipe_A=self.b, recipe_B=self.d, similarity_score=2)
+
+    def test_pack_round_trip(self):
+        neighbours = [(3, 10), (1, 2 ** 40)]
+        self.assertEqual(RecipeNeighbourList.unpack(RecipeNeighbourList.pack(neighbours)), neighbours)
+
+    def test_lists_cover_both_directions(self):
+        lists = materialize()
+        self.assertEqual(lists[self.b.pk], [(self.a.pk, 2), (self.c.pk, 2), (self.d.pk, 2)])
+        self.assertEqual(lists[self.c.pk], [(self.a.pk, 5), (self.b.pk, 2)])
+        self.assertEqual(RecipeNeighbourList.objects.count(), 4)
+
+    def test_get_similar(self):
+        self.assertEqual(self.a.get_similar(), [self.c, self.b])
+        self.assertEqual(self.b.get_similar(2), [self.a, self.c])
+        # Lookups never write; the queued job stores the lists
+        self.assertFalse(RecipeNeighbourList.objects.exists())
+        Job.objects.run_pending()
+        self.assertEqual(RecipeNeighbourList.objects.count(), 4)
+        self.assertEqual(self.a.get_similar(), [self.c, self.b])
+
+    def test_materializing_twice_keeps_one_row_per_recipe(self):
+        materialize([self.a.pk])
+        materialize([self.a.pk, self.b.pk])
+        self.assertEqual(RecipeNeighbourList.objects.count(), 2)
+
+    def test_cached_lookup_is_two_queries(self):
+        self.a.get_similar()
+        with self.assertNumQueries(2):
+            # Version check, then in_bulk
+            self.a.get_similar()
+
+    def test_add_similar_invalidates(self):
+        self.assertEqual(self.d.get_similar(), [self.b])
+        self.d.add_similar([self.a, self.a, self.a])
+        self.assertEqual(self.d.get_similar(), [self.a, self.b])
+        self.assertEqual(self.a.get_similar(), [self.c, self.d, self.b])
+
+    def test_deleted_recipe_is_dropped(self):
+        self.assertEqual(self.b.get_similar(), [self.a, self.c, self.d])
+        self.c.delete()
+        self.assertEqual(self.b.get_similar(), [self.a, self.d])
+        self.assertEqual(neighbour_index.neighbours(self.a.pk), [(self.b.pk, 2)])
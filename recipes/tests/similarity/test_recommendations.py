@@ -0,0 +1,43 @@
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import RecipeReview
+from recipes.models.recipe import RecipeSimilar
+from recipes.similarity.recommendations import recommend, seed_recipe_ids
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class RecommendationsTestCase(TestCase):
+    """Tests for batched recommendations from seed recipes."""
+
+    def setUp(self):
+        self.user = create_user('@recommend', password='Password123')
+        self.a, self.b, self.c, self.d, self.e = [
+            create_recipe(self.user, f"Dish {n}")
+            for n in range(5)
+        ]
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.c, similarity_score=2)
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.d, similarity_score=1)
+        RecipeSimilar.objects.create(recipe_A=self.b, recipe_B=self.d, similarity_score=3)
+        RecipeSimilar.objects.create(recipe_A=self.a, recipe_B=self.b, similarity_score=9)
+
+    def test_scores_are_aggregated_across_seeds(self):
+        self.assertEqual(recommend([self.a.pk, self.b.pk]), [(self.d.pk, 4), (self.c.pk, 2)])
+
+    def test_per_seed_and_limit(self):
+        self.assertEqual(recommend([self.a.pk], per_seed=2), [(self.b.pk, 9), (self.c.pk, 2)])
+        self.assertEqual(recommend([self.a.pk], limit=1), [(self.b.pk, 9)])
+
+    def test_no_seeds(self):
+        self.assertEqual(recommend([]), [])
+
+    def test_seeds_come_from_saves_and_likes(self):
+        self.user.saved_recipes.add(self.a)
+        RecipeReview.objects.create(recipe=self.b, user=self.user, rating=5)
+        RecipeReview.objects.create(recipe=self.c, user=self.user, rating=2)
+        self.assertCountEqual(seed_recipe_ids(self.user), [self.a.pk, self.b.pk])
+
+    def test_feed_shows_recommendations(self):
+        self.user.saved_recipes.add(self.a)
+        self.client.login(username='@recommend', password='Password123')
+        response = self.client.get(reverse('display_user_feed'))
+        self.assertEqual(set(response.context['feed_data']), {self.b, self.c, self.d})
@@ -7,9 +7,10 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from io import BytesIO
 from PIL import Image
 from django.core.exceptions import NON_FIELD_ERRORS
+from recipes.tests.helpers import TemporaryMediaMixin
 
 
-class RecipeCreateViewTestCase(TestCase):
+class RecipeCreateViewTestCase(TemporaryMediaMixin, TestCase):
     """
     Tests the recipe creation view, including GET/POST behaviours,
     redirects for anonymous users, and validation on the main RecipeForm.
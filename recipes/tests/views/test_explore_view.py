@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Recipe, User
+from recipes.pagination import KeysetPaginator, decode_cursor, encode_cursor
+
+
+class ExploreViewTestCase(TestCase):
+    """Tests for the explore page and its keyset pagination."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.url = reverse('explore')
+        self.user = User.objects.get(username='@johndoe')
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.recipes = []
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                author=self.user,
+                title=f"Recipe {i}",
+                description="desc",
+                prep_time=10,
+                servings=2,
+            )
+            # Two recipes share a timestamp to exercise the id tie-break
+            Recipe.objects.filter(pk=recipe.pk).update(created_at=start + timedelta(days=min(i, 3)))
+            self.recipes.append(recipe)
+        # Newest first, ties broken by highest id
+        self.ordered = self.recipes[::-1]
+
+    def test_explore_url(self):
+        self.assertEqual(self.url, '/explore/')
+
+    def test_get_explore(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'explore.html')
+        self.assertEqual(list(response.context['page_obj']), self.ordered)
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor('next', datetime(2025, 1, 2, tzinfo=timezone.utc), 7)
+        self.assertEqual(decode_cursor(token), ('next', (datetime(2025, 1, 2, tzinfo=timezone.utc), 7)))
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        self.assertEqual(decode_cursor('not-a-cursor'), ('next', None))
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(list(response.context['page_obj']), self.ordered)
+
+    def test_pages_forward_and_back(self):
+        paginator = KeysetPaginator(Recipe.objects.all(), 2)
+
+        first = paginator.get_page()
+        self.assertEqual(list(first), self.ordered[:2])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual(list(second), self.ordered[2:4])
+
+        third = paginator.get_page(second.next_cursor)
+        self.assertEqual(list(third), self.ordered[4:])
+        self.assertFalse(third.has_next())
+
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(list(back), self.ordered[2:4])
+        self.assertEqual(list(paginator.get_page(back.previous_cursor)), self.ordered[:2])
+        self.assertFalse(paginator.get_page(back.previous_cursor).has_previous())
+
+    def test_approximate_count(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['page_obj'].approximate_count, 5)
+        self.assertContains(response, 'About 5 recipes')
+
+
+class TagLookupViewTestCase(TestCase):
+    """Tests for the tag page's keyset pagination."""
+
+    fixtures = ['recipes/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(username='@johndoe')
+        self.url = reverse('display_tag', kwargs={'tag': 'pasta'})
+        self.tagged = []
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                author=self.user,
+                title=f"Pasta {i}",
+                description="desc",
+                prep_time=10,
+                servings=2,
+            )
+            recipe.tags.add('pasta')
+            self.tagged.append(recipe)
+        Recipe.objects.create(author=self.user, title="Soup", description="desc", prep_time=5, servings=1)
+
+    def test_lists_tagged_recipes_by_last_update(self):
+        response = self.client.get(self.url)
+        self.assertEqual(list(response.context['page_obj']), self.tagged[::-1])
+        self.assertEqual(response.context['page_obj'].approximate_count, 3)
+
+    def test_unknown_tag(self):
+        response = self.client.get(reverse('display_tag', kwargs={'tag': 'nope'}))
+        self.assertIsNone(response.context['page_obj'])
+        self.assertContains(response, 'No results')
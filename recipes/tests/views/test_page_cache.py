@@ -0,0 +1,128 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipes.models import RecipeReview
+from recipes.page_cache import _page_key
+from recipes.tests.helpers import create_recipe, create_user
+
+
+class AnonymousPageCacheTestCase(TestCase):
+    """Tests for the page cache of explore and tag pages."""
+
+    def setUp(self):
+        cache.clear()
+        self.explore_url = reverse('explore')
+        self.tag_url = reverse('display_tag', kwargs={'tag': 'soup'})
+        self.author = create_user('@cook', password='Password123')
+        self.recipe = create_recipe(self.author, "Leek soup", tags=["soup"])
+
+    def _queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, len(queries)
+
+    def test_repeat_visits_are_served_from_cache(self):
+        # The only query checks the page's version tokens
+        self.client.get(self.explore_url)
+        response, queries = self._queries(self.explore_url)
+        self.assertEqual(queries, 1)
+        self.assertContains(response, "Leek soup")
+
+        self.client.get(self.tag_url)
+        response, queries = self._queries(self.tag_url)
+        self.assertEqual(queries, 1)
+        self.assertContains(response, "Leek soup")
+
+    def test_pages_vary_on_tag_and_query(self):
+        create_recipe(self.author, "Pasta", tags=["pasta"])
+        self.client.get(self.tag_url)
+        response = self.client.get(reverse('display_tag', kwargs={'tag': 'pasta'}))
+        self.assertContains(response, "Pasta")
+        self.assertNotContains(response, "Leek soup")
+
+        self.client.get(self.explore_url)
+        response, queries = self._queries(self.explore_url, diet='vegan')
+        self.assertGreater(queries, 0)
+
+    def test_logged_in_visitors_are_not_cached(self):
+        self.client.login(username='@cook', password='Password123')
+        self.client.get(self.explore_url)
+        response, queries = self._queries(self.explore_url)
+        self.assertGreater(queries, 0)
+
+    def test_recipe_changes_refresh_pages_showing_it(self):
+        self.client.get(self.explore_url)
+        self.client.get(self.tag_url)
+
+        self.recipe.title = "Potato soup"
+        self.recipe.save()
+        self.assertContains(self.client.get(self.explore_url), "Potato soup")
+        self.assertContains(self.client.get(self.tag_url), "Potato soup")
+
+    def test_rating_changes_refresh_pages(self):
+        self.client.get(self.explore_url)
+        reviewer = create_user('@reviewer')
+        RecipeReview.objects.create(recipe=self.recipe, user=reviewer, rating=5)
+        self.assertContains(self.client.get(self.explore_url), 'bi-star-fill', count=5)
+
+    def test_new_recipes_refresh_listings(self):
+        self.client.get(self.explore_url)
+        self.client.get(self.tag_url)
+        create_recipe(self.author, "Onion soup", tags=["soup"])
+        self.assertContains(self.client.get(self.explore_url), "Onion soup")
+        self.assertContains(self.client.get(self.tag_url), "Onion soup")
+
+    def test_unrelated_changes_keep_the_page(self):
+        self.client.get(self.tag_url)
+        create_recipe(self.author, "Pasta", tags=["pasta"])
+        response, queries = self._queries(self.tag_url)
+        self.assertEqual(queries, 1)
+
+    def test_stale_page_is_served_while_another_request_renders(self):
+        response = self.client.get(self.explore_url)
+        self.recipe.title = "Potato soup"
+        self.recipe.save()
+
+        key = _page_key(response.wsgi_request)
+        cache.add(f'{key}:lock', 1)
+        response, queries = self._queries(self.explore_url)
+        self.assertContains(response, "Leek soup")
+        self.assertEqual(queries, 1)
+
+        cache.delete(f'{key}:lock')
+        self.assertContains(self.client.get(self.explore_url), "Potato soup")
+
+    def test_uncached_page_waits_for_the_request_rendering_it(self):
+        response = self.client.get(self.explore_url)
+        key = _page_key(response.wsgi_request)
+        entry = cache.get(key)
+        cache.clear()
+        cache.add(f'{key}:lock', 1)
+
+        # The other request's copy shows up while this one waits
+        with patch('recipes.page_cache.time.sleep', side_effect=lambda seconds: cache.set(key, entry)):
+            response, queries = self._queries(self.explore_url)
+        self.assertContains(response, "Leek soup")
+        self.assertEqual(queries, 0)
+
+        # Without one it renders the page itself, but leaves storing it to the lock holder
+        cache.clear()
+        cache.add(f'{key}:lock', 1)
+        with patch('recipes.page_cache.LOCK_WAIT', 0):
+            self.assertContains(self.client.get(self.explore_url), "Leek soup")
+        self.assertIsNone(cache.get(key))
+
+    def test_versions_are_not_lost_with_the_cache(self):
+        response = self.client.get(self.explore_url)
+        key = _page_key(response.wsgi_request)
+        entry = cache.get(key)
+        self.recipe.title = "Potato soup"
+        self.recipe.save()
+
+        # Another process still holding the old page sees the change too
+        cache.clear()
+        cache.set(key, entry)
+        self.assertContains(self.client.get(self.explore_url), "Potato soup")
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Recipe, RecipeIngredient, User
+
+
+class PantrySearchViewTests(TestCase):
+    """Tests for the pantry_search view."""
+
+    def setUp(self):
+        self.url = reverse('pantry_search')
+        author = User.objects.create(username='@cook', email='cook@example.com')
+        self.pancakes = Recipe.objects.create(
+            author=author, title="Pancakes", description="desc", prep_time=10, servings=2,
+        )
+        for name in ['eggs', 'flour', 'milk']:
+            RecipeIngredient.objects.create(recipe=self.pancakes, name=name, amount=1, unit='g')
+
+    def test_url(self):
+        self.assertEqual(self.url, '/search/pantry/')
+
+    def test_empty_pantry(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'pantry_search.html')
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_covered_recipe_is_listed(self):
+        response = self.client.get(self.url, {'ingredients': 'Eggs, flour, milk, salt'})
+        self.assertEqual(list(response.context['page_obj']), [self.pancakes])
+        self.assertContains(response, 'You have 3 of 3 ingredients')
+
+    def test_missing_ingredients(self):
+        response = self.client.get(self.url, {'ingredients': 'eggs, flour'})
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+        response = self.client.get(self.url, {'ingredients': 'eggs, flour', 'missing': '1'})
+        self.assertEqual(list(response.context['page_obj']), [self.pancakes])
+        self.assertContains(response, 'need milk')
+
+    def test_invalid_missing_defaults_to_zero(self):
+        response = self.client.get(self.url, {'ingredients': 'eggs', 'missing': 'lots'})
+        self.assertEqual(response.context['max_missing'], 0)
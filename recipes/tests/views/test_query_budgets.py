@@ -0,0 +1,107 @@
+from unittest import mock
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, get_resolver, reverse
+from recipes.models import Recipe, RecipeIngredient, RecipeInstruction, RecipeReview, User
+from recipes.query_budget import QueryBudgetExceeded, QueryRecorder, fingerprint
+from recipes.tests.helpers import QueryBudgetTesterMixin
+from recipes.views import RecipeDetailView
+
+# Placeholder routes whose view is not implemented yet
+PLACEHOLDERS = {'drafts', 'update_filters'}
+
+RECIPES_PER_USER = 8
+
+
+def named_pages():
+    """
+    Every named route of the project's own urlconf (not admin or static
+    files) that answers GET requests.
+    """
+
+    for pattern in get_resolver().url_patterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in PLACEHOLDERS:
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is None or hasattr(view_class, 'get'):
+            yield pattern
+
+
+class QueryBudgetTestCase(QueryBudgetTesterMixin, TestCase):
+    """Every page stays within its query budget on a seeded dataset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            User.objects.create_user(username=f'@cook{n}', email=f'cook{n}@example.com', password='Password123')
+            for n in range(4)
+        ]
+        cls.viewer, cls.other = users[0], users[1]
+        recipes = []
+        for author in users:
+            for n in range(RECIPES_PER_USER):
+                recipe = Recipe.objects.create(
+                    author=author, title=f"Dish {author.pk}-{n}", description="desc", prep_time=5, servings=2
+                )
+                recipe.tags.add("dinner", f"tag{n}")
+                RecipeIngredient.objects.create(recipe=recipe, name="tomatoes", amount=2)
+                RecipeIngredient.objects.create(recipe=recipe, name=f"spice {n}", amount=1)
+                RecipeInstruction.objects.create(recipe=recipe, step_number=1, text="Cook it")
+                recipes.append(recipe)
+
+        for reviewer in users:
+            reviewer.saved_recipes.add(*recipes[::3])
+            for recipe in recipes[::2]:
+                if recipe.author != reviewer:
+                    RecipeReview.objects.create(recipe=recipe, user=reviewer, rating=5, comment="Lovely")
+            for author in users:
+                if author != reviewer:
+                    reviewer.follow(author)
+        cls.recipe = next(recipe for recipe in recipes if recipe.author == cls.other)
+
+    def _sample_url(self, pattern):
+        kwargs = {}
+        for name in pattern.pattern.converters:
+            if name == 'pk':
+                route = str(pattern.pattern)
+                kwargs[name] = self.other.pk if route.startswith('users/') else self.recipe.pk
+            elif name == 'username':
+                kwargs[name] = self.other.username
+            elif name == 'tag':
+                kwargs[name] = 'dinner'
+        return reverse(pattern.name, kwargs=kwargs)
+
+    def test_every_page_has_a_budget(self):
+        for pattern in named_pages():
+            with self.subTest(pattern.name):
+                self.client.force_login(self.viewer)
+                self.assert_within_query_budget(self._sample_url(pattern))
+
+    def test_anonymous_pages_stay_within_budget(self):
+        for pattern in named_pages():
+            with self.subTest(pattern.name):
+                self.client.logout()
+                self.assert_within_query_budget(self._sample_url(pattern))
+
+    def test_over_budget_page_raises(self):
+        with override_settings(QUERY_BUDGET_ENFORCE=True), mock.patch.object(RecipeDetailView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('display_recipe', kwargs={'pk': self.recipe.pk}))
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM recipe WHERE id IN (%s, %s, %s) AND title = 'Soup'"),
+            fingerprint("SELECT * FROM recipe WHERE id IN (%s) AND title = 'Stew'"),
+        )
+
+    def test_report_names_the_template_line(self):
+        template = engines['django'].from_string(
+            "{% for recipe in recipes %}\n{{ recipe.author.username }}\n{% endfor %}"
+        )
+        with QueryRecorder() as recorder:
+            template.render({'recipes': Recipe.objects.filter(author=self.other)})
+
+        (shape, count, origins), = recorder.duplicates()
+        self.assertEqual(count, RECIPES_PER_USER)
+        self.assertEqual(list(origins), ['<unknown source>:2'])
+        self.assertIn(f"{RECIPES_PER_USER} from <unknown source>:2", recorder.report())
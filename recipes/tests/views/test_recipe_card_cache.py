@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from recipes.models import Recipe, User
+from recipes.tag_names import attach_tag_names
+
+
+class RecipeCardCacheTestCase(TestCase):
+    """Tests for the shared fragment cache of recipe cards."""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('explore')
+        self.author = User.objects.create(username='@cook', email='cook@example.com')
+        self.author.set_password('Password123')
+        self.author.save()
+        self.other = User.objects.create(username='@other', email='other@example.com')
+        self.other.set_password('Password123')
+        self.other.save()
+        self.recipe = Recipe.objects.create(
+            author=self.author, title="Soup", description="desc", prep_time=5, servings=1
+        )
+        self.recipe.tags.add("winter")
+
+    def _load(self):
+        (recipe,) = attach_tag_names([Recipe.objects.get(pk=self.recipe.pk)])
+        return recipe
+
+    def test_version_follows_card_contents(self):
+        recipe = self._load()
+        version = recipe.card_version
+
+        Recipe.objects.filter(pk=recipe.pk).update(rating_sum=F('rating_sum') + 5, rating_count=F('rating_count') + 1)
+        recipe = self._load()
+        self.assertNotEqual(recipe.card_version, version)
+
+        version = recipe.card_version
+        recipe.tags.add("easy")
+        recipe = self._load()
+        self.assertNotEqual(recipe.card_version, version)
+
+    def test_version_requires_attached_tag_names(self):
+        with self.assertRaises(ImproperlyConfigured):
+            Recipe.objects.get(pk=self.recipe.pk).card_version
+
+    def test_cards_are_reused_until_the_recipe_changes(self):
+        self.assertContains(self.client.get(self.url), '#winter')
+
+        # A change behind the ORM's back leaves the cached card in place
+        Recipe.objects.filter(pk=self.recipe.pk).update(title="Stew", updated_at=self.recipe.updated_at)
+        self.assertContains(self.client.get(self.url), 'Soup')
+
+        self.recipe.refresh_from_db()
+        self.recipe.save()
+        self.assertContains(self.client.get(self.url), 'Stew')
+
+    def test_rating_and_tag_changes_show(self):
+        self.client.get(self.url)
+        Recipe.objects.filter(pk=self.recipe.pk).update(rating_sum=5, rating_count=1)
+        self.recipe.tags.add("easy")
+        response = self.client.get(self.url)
+        self.assertContains(response, 'bi-star-fill', count=5)
+        self.assertContains(response, '#easy')
+
+    def test_bookmark_is_rendered_per_viewer(self):
+        self.other.saved_recipes.add(self.recipe)
+
+        self.client.login(username='@cook', password='Password123')
+        self.assertNotContains(self.client.get(self.url), 'bi-bookmark-fill')
+
+        self.client.login(username='@other', password='Password123')
+        self.assertContains(self.client.get(self.url), 'bi-bookmark-fill', count=1)
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from recipes import feed_ranking
+from recipes.feed_ranking import decode_feed_cursor, rank_feed
+from recipes.models import FeedEntry, Recipe, RecipeReview
+from recipes.tests.helpers import create_recipe, create_user
+
+NOW = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+
+
+class UserFeedViewTestCase(TestCase):
+    """Tests for the ranked, cursor paged home feed."""
+
+    def setUp(self):
+        self.url = reverse('display_user_feed')
+        self.reader = create_user('@reader', password='Password123')
+        self.chef = create_user('@chef')
+        self.baker = create_user('@baker')
+        self.reader.follow(self.chef)
+        self.reader.follow(self.baker)
+
+    def _post(self, author, title, hours_ago):
+        recipe = create_recipe(author, title)
+        created_at = NOW - timedelta(hours=hours_ago)
+        Recipe.objects.filter(pk=recipe.pk).update(created_at=created_at)
+        FeedEntry.objects.create(user=self.reader, recipe=recipe, author=author, created_at=created_at)
+        return recipe
+
+    def _review(self, recipe, user, hours_ago):
+        review = RecipeReview.objects.create(recipe=recipe, user=user, rating=3)
+        RecipeReview.objects.filter(pk=review.pk).update(created_at=NOW - timedelta(hours=hours_ago))
+        return review
+
+    def _objects(self, page):
+        return [item.obj for item in page.items]
+
+    def test_sources_are_merged_newest_first(self):
+        old = self._post(self.chef, "Old", 10)
+        new = self._post(self.baker, "New", 1)
+        stranger = create_user('@stranger')
+        dish = create_recipe(stranger, "Dish")
+        self._review(dish, self.reader, 50)
+        review = self._review(dish, stranger, 5)
+
+        page = rank_feed(self.reader, 10, None)
+        self.assertEqual(self._objects(page), [new, review, old])
+        self.assertIsNone(page.next_cursor)
+
+    def test_affinity_boosts_authors_the_user_engages_with(self):
+        chef_post = self._post(self.chef, "Chef", 10)
+        baker_post = self._post(self.baker, "Baker", 1)
+        self.reader.saved_recipes.add(chef_post)
+        self.assertEqual(self._objects(rank_feed(self.reader, 10)), [chef_post, baker_post])
+
+    def test_followed_reviewers_are_boosted(self):
+        dish = self._post(self.chef, "Dish", 100)
+        self._review(dish, self.reader, 100)
+        stranger = create_user('@stranger')
+        by_stranger = self._review(dish, stranger, 1)
+        by_chef = self._review(dish, self.chef, 10)
+        self.assertEqual(self._objects(rank_feed(self.reader, 2)), [by_chef, by_stranger])
+
+    def test_cursor_pages_cover_the_feed_once(self):
+        recipes = [self._post(self.chef if n % 2 else self.baker, f"Dish {n}", n % 7) for n in range(20)]
+        self.reader.saved_recipes.add(recipes[3])
+        everything = self._objects(rank_feed(self.reader, 100))
+
+        seen, cursor = [], None
+        with mock.patch.object(feed_ranking, 'CHUNK_SIZE', 3):
+            while True:
+                page = rank_feed(self.reader, 6, cursor)
+                seen += self._objects(page)
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+        self.assertEqual(seen, everything)
+        self.assertEqual(len(seen), 20)
+
+    def test_bad_cursor_starts_from_the_top(self):
+        self.assertEqual(decode_feed_cursor('not a cursor'), (None, None))
+        post = self._post(self.chef, "Dish", 1)
+        self.assertEqual(self._objects(rank_feed(self.reader, 10, 'not a cursor')), [post])
+
+    def test_feed_page_loads_more(self):
+        for n in range(4):
+            self._post(self.chef, f"Dish {n}", n)
+        self.client.login(username='@reader', password='Password123')
+        with mock.patch('recipes.views.user_feed_detail_view.FEED_PAGE_SIZE', 3):
+            response = self.client.get(self.url)
+            self.assertEqual(len(response.context['feed_data']), 3)
+            self.assertContains(response, 'Load more')
+
+            response = self.client.get(self.url, {'cursor': response.context['next_cursor']})
+        self.assertEqual([recipe.title for recipe in response.context['feed_data']], ["Dish 3"])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_empty_feed(self):
+        self.client.login(username='@reader', password='Password123')
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['pages'])
+        self.assertContains(response, 'Explore recipes')
@@ -12,6 +12,8 @@ from .profile_detail_view import *
 from .recipe_create_view import *
 from .tag_lookup import *
 from .search_results_view import *
+from .search_suggestions_view import *
+from .pantry_search_view import *
 from .recipe_delete_view import *
 from .recipe_save_unsave_view import *
 from .saved_recipes_view import *
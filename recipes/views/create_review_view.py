@@ -1,12 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
-from django.db.models import Avg
 from django.contrib import messages
 from recipes.models import Recipe, RecipeReview
 from recipes.forms import ReviewForm
 
 class RecipeReviewsView(View):
     """Display and handle reviews for a specific recipe"""
+
+    query_budget = 12
     
     def get(self, request, pk):
         """Display the recipe review page"""
@@ -21,15 +22,13 @@ class RecipeReviewsView(View):
 
         form = ReviewForm()
 
-        avg_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-
         context = {
             'recipe': recipe,
             'reviews': reviews,
             'user_review': user_review,
             'review_form': form,
-            'avg_rating': avg_rating,
-            'review_count': reviews.count(),
+            'avg_rating': recipe.avg_rating,
+            'review_count': recipe.rating_count,
         }
 
         return render(request, "recipe_reviews.html", context)
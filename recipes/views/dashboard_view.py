@@ -1,7 +1,9 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
+from recipes.query_budget import query_budget
 
 
+@query_budget(4)
 @login_required
 def dashboard(request):
     """
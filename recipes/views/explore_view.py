@@ -1,15 +1,48 @@
 from django.shortcuts import render
-from django.core.paginator import Paginator
+from recipes.dietary import DIET_LABELS, DIETARY_FLAGS, dietary_filter, requested_diet
 from recipes.models import Recipe
-from django.db.models import Avg
+from recipes.page_cache import cache_anonymous_page, depends_on
+from recipes.pagination import KeysetPaginator
+from recipes.query_budget import query_budget
+from recipes.tag_names import attach_tag_names
 
+@query_budget(10)
+@cache_anonymous_page
 def explore(request):
-    """Display home page, which shows x number of most recent recipes from db."""
+    """
+    Display home page, which shows x number of most recent recipes from db.
+
+    ?diet= limits recipes to a dietary style; signed in users are offered
+    their own as a toggle. Pages are cached for logged-out visitors.
+    """
 
     cards_per_page = 100
+    diet = requested_diet(request)
+    recipes = Recipe.objects.filter(dietary_filter(diet))
+    own_diet = request.user.dietary_style if request.user.is_authenticated else None
     
-    paginator = Paginator(Recipe.objects.annotate(avg_rating=Avg("reviews__rating")).order_by('-created_at'), cards_per_page)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(
+        recipes.select_related('author').for_viewer(request.user),
+        cards_per_page,
+        order_field='created_at',
+        count_queryset=recipes,
+    )
+    page_obj = paginator.get_page(request.GET.get("cursor"))
+    attach_tag_names(page_obj.object_list)
+
+    # New recipes only change the newest page; diet pages change with ingredients
+    listings = [] if page_obj.has_previous() else ["explore"]
+    if diet:
+        listings.append("explore:diet")
+    depends_on(request, recipes=page_obj, listings=listings)
 
-    return render(request, "explore.html", {"page_obj": page_obj})
+    context = {
+        "page_obj": page_obj,
+        "diet": diet,
+        "diet_label": DIET_LABELS.get(diet),
+        # The viewer's own diet is offered, never applied unasked
+        "own_diet": own_diet if own_diet in DIETARY_FLAGS and own_diet != diet else None,
+        "own_diet_label": DIET_LABELS.get(own_diet),
+        "diet_param": request.GET.get("diet", ""),
+    }
+    return render(request, "explore.html", context)
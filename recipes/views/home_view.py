@@ -1,6 +1,8 @@
 from django.shortcuts import render
+from recipes.query_budget import query_budget
 
 #@login_prohibited
+@query_budget(4)
 def home(request):
     """Display the application's start/home screen."""
 
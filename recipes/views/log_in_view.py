@@ -18,6 +18,7 @@ class LogInView(LoginProhibitedMixin, View):
 
     http_method_names = ['get', 'post']
     redirect_when_logged_in_url = settings.REDIRECT_URL_WHEN_LOGGED_IN
+    query_budget = 6
 
     def get(self, request):
         """
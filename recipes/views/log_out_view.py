@@ -1,7 +1,9 @@
 from django.contrib.auth import logout
 from django.shortcuts import redirect
+from recipes.query_budget import query_budget
 
 
+@query_budget(8)
 def log_out(request):
     """Log out the current user"""
 
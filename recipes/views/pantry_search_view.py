@@ -0,0 +1,50 @@
+from django.shortcuts import render
+from django.core.paginator import Paginator
+from recipes.models.recipe import annotate_viewer
+from recipes.search import ingredient_index, load_recipes, parse_pantry
+from recipes.tag_names import attach_tag_names
+from recipes.query_budget import query_budget
+
+MAX_MISSING = 5
+
+
+@query_budget(10)
+def pantry_search(request):
+    """
+    Find recipes that can be cooked from the ingredients you have.
+
+    ?ingredients= is a comma separated list (e.g. "eggs, flour, milk").
+    ?missing= allows recipes needing up to that many other ingredients
+    (0 - 5, default 0). Recipes are ranked by how much of their ingredient
+    list the pantry covers and paginated (15 per page) in pantry_search.html.
+    """
+
+    text = request.GET.get('ingredients', '')
+    pantry = parse_pantry(text)
+
+    try:
+        max_missing = min(max(int(request.GET.get('missing', 0)), 0), MAX_MISSING)
+    except ValueError:
+        max_missing = 0
+
+    matches = ingredient_index.pantry(pantry, max_missing) if pantry else []
+
+    paginator = Paginator(matches, 15)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_matches = {match.recipe_id: match for match in page_obj.object_list}
+    page_obj.object_list = attach_tag_names(annotate_viewer(load_recipes(list(page_matches)), request.user))
+    for recipe in page_obj.object_list:
+        recipe.pantry_match = page_matches[recipe.pk]
+
+    params = request.GET.copy()
+    params.pop('page', None)
+
+    context = {
+        'page_obj': page_obj,
+        'ingredients': text,
+        'pantry': pantry,
+        'max_missing': max_missing,
+        'missing_choices': range(MAX_MISSING + 1),
+        'page_query_string': params.urlencode(),
+    }
+    return render(request, 'pantry_search.html', context)
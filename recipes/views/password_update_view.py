@@ -17,6 +17,7 @@ class PasswordUpdateView(LoginRequiredMixin, FormView):
 
     template_name = 'update_password.html'
     form_class = PasswordForm
+    query_budget = 6
 
     def get_form_kwargs(self, **kwargs):
         """
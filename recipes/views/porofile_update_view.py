@@ -15,6 +15,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     template_name = "update_profile.html"
     form_class = UserForm
+    query_budget = 6
 
     def get_object(self):
         """
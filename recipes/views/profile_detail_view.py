@@ -1,8 +1,8 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import DetailView
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404
 from recipes.models import User, Recipe, RecipeReview
+from recipes.tag_names import attach_tag_names
 
 class ProfileDetailView(LoginRequiredMixin, DetailView):
     """
@@ -11,6 +11,7 @@ class ProfileDetailView(LoginRequiredMixin, DetailView):
     model = User 
     template_name = "display_user_profile.html"
     context_object_name = "profile_user"
+    query_budget = 12
 
     def get_object(self):
         """
@@ -35,16 +36,12 @@ class ProfileDetailView(LoginRequiredMixin, DetailView):
         - Date the user joined 
         """
         context = super().get_context_data(**kwargs)
-        user = self.get_object()
+        user = self.object
 
-        user_recipes = (
-            Recipe.objects
-            .filter(author=user)
-            .annotate(avg_rating=Avg("reviews__rating"))
-        )
+        user_recipes = Recipe.objects.filter(author=user).select_related("author").for_viewer(self.request.user)
 
         # Recipes written by the user
-        context["user_recipes"] = user_recipes
+        context["user_recipes"] = attach_tag_names(user_recipes)
         context["recipe_count"] = user_recipes.count()
         context["date_joined"] = user.date_joined
         context["saved_count"] = user.saved_recipes.count()
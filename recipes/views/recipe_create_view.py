@@ -11,6 +11,7 @@ class RecipeCreateView(LoginRequiredMixin, CreateView):
     template_name = 'create_recipe.html'
     form_class = RecipeForm
     model = Recipe 
+    query_budget = 6
 
     def get_context_data(self, **kwargs):
         data = super().get_context_data(**kwargs)
@@ -74,7 +75,8 @@ class RecipeCreateView(LoginRequiredMixin, CreateView):
             instructions.instance = self.object
             instructions.save()
             
-        return super().form_valid(form)
+        # The form is already saved; CreateView.form_valid would save it again
+        return redirect(self.get_success_url())
 
     def form_invalid(self, form, ingredients, instructions):
         return self.render_to_response(
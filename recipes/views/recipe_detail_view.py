@@ -1,13 +1,17 @@
 from django.shortcuts import render, get_object_or_404
 from django.views import View
-from recipes.models.recipe import Recipe
+from recipes.models.recipe import Recipe, annotate_viewer
 from recipes.forms import ReviewForm
+from recipes.tag_names import attach_tag_names
 
+SIMILAR_RECIPES = 6
 
 
 class RecipeDetailView(View):
     """Display a recipe"""
 
+    query_budget = 14
+
     def get(self, request, pk):
         """Handle GET requests by displaying the recipe page"""
 
@@ -19,12 +23,19 @@ class RecipeDetailView(View):
 
         if request.user.is_authenticated:
             user_review = recipe.reviews.filter(user=request.user).first()
+
+        # Recipes liked by the same people, or with similar ingredients and
+        # tags when nobody has liked this one yet
+        similar_recipes = list(recipe.get_similar(SIMILAR_RECIPES)) or list(recipe.get_content_similar(SIMILAR_RECIPES))
+        annotate_viewer(similar_recipes, request.user)
+        attach_tag_names(similar_recipes)
         
         context = {
             "recipe": recipe,
             "reviews": reviews,
             "review_form": review_form,
             "user_review": user_review,
+            "similar_recipes": similar_recipes,
         }
 
 
@@ -11,6 +11,7 @@ class RecipeUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'update_recipe.html'
     form_class = RecipeForm
     model = Recipe 
+    query_budget = 8
     
     def get_queryset(self):
         """Only allow the logged-in user to update their own recipes."""
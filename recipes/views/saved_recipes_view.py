@@ -11,6 +11,7 @@ class SavedRecipesView(ListView):
     model = Recipe
     template_name = 'saved_recipes.html'
     context_object_name = 'saved_recipes'
+    query_budget = 10
 
     def get_queryset(self):
         """
@@ -18,7 +19,7 @@ class SavedRecipesView(ListView):
         """
 
         self.profile_user = get_object_or_404(User, pk=self.kwargs['pk'])
-        return self.profile_user.saved_recipes.all()
+        return self.profile_user.saved_recipes.select_related('author').for_viewer(self.request.user)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
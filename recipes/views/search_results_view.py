@@ -1,72 +1,75 @@
+import time
 from django.shortcuts import render
 from django.core.paginator import Paginator
-from django.db.models import Q
-from recipes.models import Recipe
-from taggit.models import Tag as TagModel
-from django.db.models import Avg
+from recipes.dietary import requested_diet
+from recipes.models.recipe import annotate_viewer
+from recipes.tag_names import attach_tag_names
+from recipes.search import SearchQuery, search_cache, search_log, search_recipe_ids, load_recipes
+from recipes.search.facets import apply_facets
+from recipes.query_budget import query_budget
 
 
+@query_budget(10)
 def search_results(request):
     """
     Search recipes by:
-    - title 
+    - title, description, ingredients and tags (full-text)
     - author username 
     - tags (using #tag format)
 
-    Normal terms use OR logic and support both full-phrase and individual-word matches.
+    Normal terms use OR logic and are ranked by relevance (best match first).
     Tags use AND logic and must match exactly.
+    With mode=fuzzy, normal terms are matched by trigram similarity so
+    misspellings such as "spagetti" still find recipes.
+
+    Results can be narrowed by prep time, servings and rating facets
+    (?prep=, ?servings=, ?rating=); counts for every facet are shown alongside.
+    ?diet= limits them to recipes suiting a dietary style.
 
     Result are paginated (15 per page) and displayed in search_results.html.
+    Each search is timed and logged for the search_query_stats command.
     """
 
+    started = time.perf_counter()
     query = request.GET.get('search', '')
-    
-    if query:
-        words = query.split()
-
-        #Extract tags (#tag) and normal terms 
-        tags = [word[1:].strip() for word in words if word.startswith('#')]
-        normal_terms = [word.strip() for word in words if not word.startswith('#')]
-
-        recipes = Recipe.objects.all()
-
-        if normal_terms:
-            query_filter = Q()
-            normal_query = " ".join(normal_terms)
-            query_filter |= Q(title__icontains=normal_query) | Q(author__username__icontains=normal_query)
-
-            # individual word match
-            for term in normal_terms:
-                query_filter |= Q(title__icontains=term) | Q(author__username__icontains=term)
+    fuzzy = request.GET.get('mode') == 'fuzzy'
+    search_query = SearchQuery(query, fuzzy=fuzzy)
+    parsed = time.perf_counter()
 
-            recipes = recipes.filter(query_filter)
+    # Matching ids are cached per normalized query; only the page is loaded
+    recipe_ids = search_cache.get_or_compute(search_query, search_recipe_ids)
 
-        for tag in tags:
-            matching_tags = TagModel.objects.filter(name__iexact=tag)
-            if matching_tags.exists():
-                recipes = recipes.filter(tags__name__iexact=tag)
-
-            elif not normal_terms:
-                recipes = Recipe.objects.none()
-                break
-
-        recipes = (
-            recipes
-            .annotate(avg_rating=Avg("reviews__rating"))
-            .distinct()
-            .order_by('-created_at')
-        )
-    else:
-        recipes = Recipe.objects.none()
+    facets = []
+    if recipe_ids:
+        recipe_ids, facets = apply_facets(search_query, recipe_ids, request.GET, requested_diet(request))
 
     # Pagination
-    paginator = Paginator(recipes, 15)
+    paginator = Paginator(recipe_ids, 15)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = attach_tag_names(annotate_viewer(load_recipes(page_obj.object_list), request.user))
+    loaded = time.perf_counter()
+
+    # Links to other pages keep the query, mode and facet selections
+    params = request.GET.copy()
+    params.pop('page', None)
 
     # Pass paginated recipes and search query to the template 
     context = {
         'page_obj': page_obj,
         'query': query,
+        'fuzzy': fuzzy,
+        'facets': facets,
+        'page_query_string': params.urlencode(),
     }
-    return render(request, 'search_results.html', context)
+    response = render(request, 'search_results.html', context)
+    rendered = time.perf_counter()
+
+    search_log.record(
+        search_query,
+        result_count=paginator.count,
+        parse_ms=(parsed - started) * 1000,
+        db_ms=(loaded - parsed) * 1000,
+        render_ms=(rendered - loaded) * 1000,
+    )
+    return response
@@ -0,0 +1,25 @@
+from django.http import JsonResponse
+from recipes.search import typeahead_index
+from recipes.query_budget import query_budget
+
+MAX_SUGGESTIONS = 20
+
+
+@query_budget(6)
+def search_suggestions(request):
+    """
+    Return autocomplete suggestions for the search box as JSON.
+
+    Completes the last word of ?q=: '#' for tags, '@' for usernames and
+    recipe titles otherwise. ?limit= sets how many to return (at most 20).
+    """
+
+    text = request.GET.get('q', '')
+
+    try:
+        limit = min(int(request.GET.get('limit', 8)), MAX_SUGGESTIONS)
+    except ValueError:
+        limit = 8
+
+    suggestions = typeahead_index.suggest(text, max(limit, 1))
+    return JsonResponse({'query': text, 'suggestions': suggestions})
@@ -14,6 +14,8 @@ class ShoppingListView(LoginRequiredMixin, View):
     Aggregate ingredients from all recipes saved by the current user.
     """
 
+    query_budget = 6
+
     def get(self, request, pk, *args, **kwargs):
         """Get all recipes this user has saved"""
 
@@ -1,30 +1,37 @@
 from django.shortcuts import render
-from django.core.paginator import Paginator
-from django.db.models import Avg
 from taggit.models import Tag
 from recipes.models import Recipe
+from recipes.page_cache import cache_anonymous_page, depends_on, tag_listing
+from recipes.pagination import KeysetPaginator
+from recipes.query_budget import query_budget
+from recipes.tag_names import attach_tag_names
 
 
+@query_budget(11)
+@cache_anonymous_page
 def tag_lookup(request, tag):
-    """Display all recipes associated with a tag, with pagination."""
+    """
+    Display all recipes associated with a tag, with cursor pagination.
+    Pages are cached for logged-out visitors.
+    """
 
     # Check if tag exists
     try: 
         tag_obj = Tag.objects.get(name=tag)
     except Tag.DoesNotExist:
+        depends_on(request, listings=[tag_listing(tag)])
         return render(request, "tag_lookup.html", {"page_obj": None, "tag": tag})
 
-    # Filter recipes by tag, newest first
-    filtered_recipes = (
-        Recipe.objects.filter(tags=tag_obj)
-        .annotate(avg_rating=Avg("reviews__rating"))
-        .order_by('-updated_at')
-        .distinct()
+    # Filter recipes by tag, most recently updated first
+    paginator = KeysetPaginator(
+        Recipe.objects.filter(tags=tag_obj).select_related('author').for_viewer(request.user),
+        50,
+        order_field='updated_at',
+        count_queryset=Recipe.objects.filter(tags=tag_obj),
     )
-
-    paginator = Paginator(filtered_recipes, 50)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator.get_page(request.GET.get("cursor"))
+    attach_tag_names(page_obj.object_list)
+    depends_on(request, recipes=page_obj, listings=[tag_listing(tag_obj.name)])
 
     return render(request, "tag_lookup.html", 
-                  {"page_obj": page_obj, "tag": tag_obj})
\ No newline at end of file
+                  {"page_obj": page_obj, "tag": tag_obj})
@@ -1,8 +1,8 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
-from django.core.paginator import Paginator
-from recipes.models import User, Recipe, RecipeReview
-import random
+from recipes.dietary import DIET_LABELS, DIETARY_FLAGS, requested_diet
+from recipes.feed_ranking import rank_feed
+from recipes.models.recipe import Recipe, annotate_viewer
 
 """
 "what you saved, friends, tags from what you saved"
@@ -12,60 +12,43 @@ new posts from people you follow-
 new posts from tags you follow- 
 """
 
+FEED_PAGE_SIZE = 30
+
 
 class UserFeedDetailView(LoginRequiredMixin, TemplateView):
     """ 
     Display the logged in user's home feed 
+
+    ?diet= limits posts and recommendations to a dietary style, as on the
+    explore page; the user's own is offered as a toggle.
     """
     template_name = "user_feed.html"
     context_object_name = "data"
+    query_budget = 20
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
 
-        #find recipes user enjoyed to generate recs from
-        recs = set()
-        saves = user.saved_recipes.order_by('?')[:10]
-        pos_reviewed = Recipe.objects.filter(
-            reviews__user = user,
-            reviews__rating__gte=4,
-        )[:10]
+        # Posts, reviews and recommendations ranked together, one page at a time
+        diet = requested_diet(self.request)
+        page = rank_feed(user, FEED_PAGE_SIZE, self.request.GET.get("cursor"), diet)
+        feed_data = [item.obj for item in page.items]
+        annotate_viewer([obj for obj in feed_data if isinstance(obj, Recipe)], user)
 
-        for recipe in saves: recs.update(recipe.get_similar(10))
-        for recipe in pos_reviewed: recs.update(recipe.get_similar(10))
-        print(recs)
-        
-        
-        unseen_reviews = list(RecipeReview.objects.filter(
-            recipe__in=RecipeReview.objects.filter(user=user).values("recipe"),
-        ).exclude(user=user).order_by("-created_at"))[:50]
-        
-        
-        unseen_posts = list(Recipe.objects.filter(
-            author__followers=user,
-        ).order_by("-created_at"))[:200]
+        # Deal the ranked items across the three columns so each row reads best first
+        context["col1"] = feed_data[0::3]
+        context["col2"] = feed_data[1::3]
+        context["col3"] = feed_data[2::3]
 
-        print(len(recs))
-        print(len(unseen_reviews))
-        print(len(unseen_posts))
-        feed_data = list(recs) + unseen_reviews + unseen_posts
-        random.shuffle(feed_data)
-        random.shuffle(feed_data)
-        print(len(feed_data))
-
-        try: 
-            p = Paginator(feed_data, len(feed_data)/3)
-            context["col1"] = p.get_page(1)
-            context["col2"] = p.get_page(2)
-            context["col3"] = p.get_page(3)
-            pages = True
-        
-        except ZeroDivisionError: 
-            pages = False
-   
         context["user"] = user
         context["feed_data"] = feed_data
-        context["pages"] = pages
-
-        return context
\ No newline at end of file
+        context["pages"] = bool(feed_data)
+        context["next_cursor"] = page.next_cursor
+        context["diet"] = diet
+        context["diet_label"] = DIET_LABELS.get(diet)
+        own_diet = user.dietary_style
+        context["own_diet"] = own_diet if own_diet in DIETARY_FLAGS and own_diet != diet else None
+        context["own_diet_label"] = DIET_LABELS.get(own_diet)
+
+        return context
@@ -1,12 +1,14 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView
 from recipes.models import Recipe
 
-class MyRecipesView(ListView):
+class MyRecipesView(LoginRequiredMixin, ListView):
     """Display a list of recipes created by the logged-in user"""
 
     model = Recipe
     template_name = 'user_recipes.html'
     context_object_name = 'user_recipes'
+    query_budget = 6
 
     def get_queryset(self):
         """Return the user's recipes ordered from newest to oldest"""
@@ -1,14 +1,16 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView
 from recipes.models import RecipeReview
 
-class MyReviewsView(ListView):
+class MyReviewsView(LoginRequiredMixin, ListView):
     """Display a list of reviews written by the logged-in user"""
 
     model = RecipeReview
     template_name = 'user_reviews.html'
     context_object_name = 'user_reviews'
+    query_budget = 6
 
     def get_queryset(self):
         """Return the user's reviews ordered from newest to oldest"""
         
-        return RecipeReview.objects.filter(user=self.request.user).order_by('-created_at')
\ No newline at end of file
+        return RecipeReview.objects.filter(user=self.request.user).select_related('recipe').order_by('-created_at')
\ No newline at end of file
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'recipes.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,6 +55,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Fail requests that run more queries than their view's query_budget
+# (see recipes.query_budget); on whenever DEBUG is, including under tests
+QUERY_BUDGET_ENFORCE = DEBUG
+
 ROOT_URLCONF = 'recipify.urls'
 
 TEMPLATES = [
@@ -85,6 +90,32 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Search results, recipe tag names and recipe card fragments are cached here.
+# Use a shared backend (e.g. Redis or Memcached) when running more than one
+# process, so invalidation reaches all of them.
+# There are a few entries per recipe (tag names, one card per version), so
+# MAX_ENTRIES has to cover several times the number of recipes; LocMem's
+# default of 300 evicts cards before they are ever reused.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recipify',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    }
+}
+
+# Run background jobs (similarity updates, feed fan-out, ...) in the request
+# that queues them instead of leaving them to `manage.py run_jobs`. Only for
+# development without a worker: it slows down the requests that queue jobs,
+# and delayed jobs only run once a later job is queued after they fall due.
+JOBS_RUN_INLINE = False
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -31,6 +31,8 @@ urlpatterns = [
 
     path('explore/', views.explore, name='explore'),
     path('search/', views.search_results, name='search_results'),
+    path('search/suggest/', views.search_suggestions, name='search_suggestions'),
+    path('search/pantry/', views.pantry_search, name='pantry_search'),
 
     path('dashboard/', views.dashboard, name='dashboard'), 
     path('dashboard/drafts/', views.pass_, name='drafts'), 
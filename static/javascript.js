@@ -0,0 +1,31 @@
+// Search box autocompletion: fills the datalist from the suggestions endpoint
+document.querySelectorAll('input[data-suggest-url]').forEach(function (input) {
+  var list = document.getElementById(input.getAttribute('list'));
+  var pending = null;
+
+  input.addEventListener('input', function () {
+    if (pending) {
+      pending.abort();
+    }
+    if (!input.value.trim()) {
+      list.innerHTML = '';
+      return;
+    }
+
+    pending = new AbortController();
+    var url = input.dataset.suggestUrl + '?q=' + encodeURIComponent(input.value);
+
+    fetch(url, { signal: pending.signal })
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        list.innerHTML = '';
+        data.suggestions.forEach(function (suggestion) {
+          var option = document.createElement('option');
+          option.value = suggestion.query;
+          option.label = suggestion.label;
+          list.appendChild(option);
+        });
+      })
+      .catch(function () {});
+  });
+});